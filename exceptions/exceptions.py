@@ -13,3 +13,17 @@ class EmailSendFailedError(Exception):
     """Custom exception for email sending failures."""
 
     pass
+
+
+class LazyLoadDuringRenderError(Exception):
+    """
+    A template read an ORM attribute that wasn't loaded while strict render
+    mode was on (see utils.core.templating).
+    """
+
+    def __init__(self, statement: str):
+        self.statement = statement
+        super().__init__(
+            "Template rendering triggered a lazy load; eager-load it in the "
+            f"route or pass a view object instead:\n{statement}"
+        )
@@ -253,3 +253,27 @@ class CsrfError(HTTPException):
 
     def __init__(self):
         super().__init__(status_code=403, detail="CSRF validation failed")
+
+
+class InvalidPaginationCursorError(HTTPException):
+    """Raised when a keyset pagination cursor cannot be decoded."""
+
+    def __init__(self):
+        super().__init__(status_code=400, detail="Invalid pagination cursor")
+
+
+class OrganizationResourceNotFoundError(HTTPException):
+    """Raised when an organization resource does not exist."""
+
+    def __init__(self):
+        super().__init__(status_code=404, detail="Resource not found")
+
+
+class InvalidResourceImportError(HTTPException):
+    """Raised when a bulk resource import file cannot be parsed or validated."""
+
+    def __init__(self, message: str, line: int | None = None):
+        super().__init__(
+            status_code=400,
+            detail=f"Line {line}: {message}" if line is not None else message,
+        )
@@ -1,10 +1,11 @@
 import logging
+import time
 from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 from fastapi import FastAPI, Request, Depends, status
 from fastapi.responses import RedirectResponse, Response
 from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
+from utils.core.templating import create_templates
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from routers.core import (
@@ -15,13 +16,16 @@ from routers.core import (
     user,
     static_pages,
     invitation,
+    metrics,
 )
+from routers.app import resources
 from utils.core.dependencies import (
     get_user_from_request,
     require_unauthenticated_client,
 )
 from utils.core.auth import refresh_token_is_persistent, set_auth_cookies
 from utils.core.rate_limit import get_trusted_proxy_hosts
+from utils.core.compression import CompressionMiddleware
 from utils.core.csrf import (
     CSRF_COOKIE_NAME,
     UNSAFE_HTTP_METHODS,
@@ -32,6 +36,7 @@ from utils.core.csrf import (
     validate_csrf_token,
 )
 from utils.core.htmx import (
+    is_boosted_fragment_request,
     is_htmx_request,
     toast_response,
     get_flash_cookie,
@@ -47,6 +52,25 @@ from exceptions.http_exceptions import (
 )
 from exceptions.exceptions import NeedsNewTokens
 from utils.core.db import set_up_db
+from utils.core.maintenance import maintenance_enabled, scheduler_from_env
+from utils.core.metrics import (
+    REQUEST_DURATION,
+    REQUESTS_IN_FLIGHT,
+    flusher_from_env,
+    route_template,
+)
+from utils.core.slow_queries import slow_query_request
+from utils.core.profiling import (
+    RequestProfiler,
+    profile_interval_seconds,
+    profile_trigger,
+    save_profile,
+)
+from utils.core.query_stats import (
+    n_plus_one_threshold,
+    request_query_stats,
+    server_timing_enabled,
+)
 
 logger = logging.getLogger("uvicorn.error")
 logger.setLevel(logging.DEBUG)
@@ -57,8 +81,18 @@ async def lifespan(app: FastAPI):
     # Optional startup logic
     load_dotenv()
     set_up_db()
+    scheduler = scheduler_from_env() if maintenance_enabled() else None
+    if scheduler:
+        scheduler.start()
+    metrics_flusher = flusher_from_env()
+    if metrics_flusher:
+        metrics_flusher.start()
     yield
     # Optional shutdown logic
+    if scheduler:
+        scheduler.stop()
+    if metrics_flusher:
+        metrics_flusher.stop()
 
 
 # Initialize the FastAPI app
@@ -72,7 +106,7 @@ if trusted_proxy_hosts:
 
 # Mount static files (e.g., CSS, JS) and initialize Jinja2 templates
 app.mount("/static", StaticFiles(directory="static"), name="static")
-templates = Jinja2Templates(directory="templates")
+templates = create_templates()
 
 
 # --- Flash cookie middleware ---
@@ -90,6 +124,22 @@ async def flash_cookie_middleware(request: Request, call_next):
     return response
 
 
+# --- Fragment rendering middleware ---
+# Boosted navigations only swap #main-content, so base.html renders just the
+# title and content blocks for them. The same URL then returns different HTML
+# depending on htmx headers, which caches must key on.
+
+
+@app.middleware("http")
+async def fragment_rendering_middleware(request: Request, call_next):
+    request.state.render_fragment = is_boosted_fragment_request(request)
+    response = await call_next(request)
+    if response.headers.get("content-type", "").startswith("text/html"):
+        response.headers.add_vary_header("HX-Request")
+        response.headers.add_vary_header("HX-Target")
+    return response
+
+
 @app.middleware("http")
 async def csrf_middleware(request: Request, call_next):
     token = request.cookies.get(CSRF_COOKIE_NAME) or generate_csrf_token()
@@ -106,6 +156,90 @@ async def csrf_middleware(request: Request, call_next):
     return response
 
 
+# --- Query stats middleware ---
+# Counts and times the SQL each request runs (utils/core/query_stats.py),
+# logs it, warns about statements repeated often enough to be an N+1, and
+# reports the database time in a Server-Timing header when enabled. Slow
+# statements (utils/core/slow_queries.py) are attributed to the request's route.
+
+
+@app.middleware("http")
+async def query_stats_middleware(request: Request, call_next):
+    with request_query_stats() as stats, slow_query_request(request.scope):
+        request.state.query_stats = stats
+        response = await call_next(request)
+    logger.debug(
+        f"{request.method} {request.url.path} {response.status_code}: "
+        f"{stats.count} queries in {stats.seconds * 1000:.1f} ms"
+    )
+    for statement, times in stats.repeated(n_plus_one_threshold()):
+        logger.warning(
+            f"Possible N+1 in {request.method} {request.url.path}: "
+            f"statement ran {times} times: {statement}"
+        )
+    if server_timing_enabled():
+        response.headers.append("Server-Timing", stats.server_timing())
+    return response
+
+
+# --- Request metrics middleware ---
+# Records in-flight requests and a latency histogram keyed by route template
+# (not the raw path, which would give every id its own series) for /metrics.
+
+
+@app.middleware("http")
+async def request_metrics_middleware(request: Request, call_next):
+    started = time.perf_counter()
+    status_code = 500
+    with REQUESTS_IN_FLIGHT.track_in_progress():
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+        finally:
+            REQUEST_DURATION.observe(
+                time.perf_counter() - started,
+                route_template(request.scope),
+                request.method,
+                status_code,
+            )
+    return response
+
+
+# --- Profiling middleware ---
+# Samples the stacks of requests picked by PROFILE_SAMPLE_RATE or carrying a
+# signed X-Profile-Token (utils/core/profiling.py) and saves a flamegraph-ready
+# profile per request under PROFILE_DIR, grouped by route template.
+
+
+@app.middleware("http")
+async def profiling_middleware(request: Request, call_next):
+    trigger = profile_trigger(request.headers)
+    if trigger is None:
+        return await call_next(request)
+    profiler = RequestProfiler(request.scope, profile_interval_seconds())
+    profiler.start()
+    try:
+        response = await call_next(request)
+    finally:
+        profiler.stop()
+    route = route_template(request.scope)
+    path = save_profile(profiler, route, request.method, response.status_code)
+    logger.info(
+        f"Profiled {request.method} {route} ({trigger}): {profiler.samples} "
+        f"samples by category {profiler.categories()}, saved to {path}"
+    )
+    if trigger == "token":
+        response.headers["X-Profile-Path"] = str(path)
+    return response
+
+
+# --- Response compression ---
+# Added last so it is the outermost middleware and compresses every response,
+# including error pages and static files.
+
+app.add_middleware(CompressionMiddleware)
+
+
 # --- Include Routers ---
 
 
@@ -114,8 +248,11 @@ app.include_router(dashboard.router)
 app.include_router(invitation.router)
 app.include_router(organization.router)
 app.include_router(role.router)
+# Before static_pages, whose /{page_name} route would otherwise match /metrics
+app.include_router(metrics.router)
 app.include_router(static_pages.router)
 app.include_router(user.router)
+app.include_router(resources.router)
 
 
 # --- Exception Handling Middlewares ---
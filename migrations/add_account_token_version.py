@@ -0,0 +1,104 @@
+"""
+Add the token_version column to the private.account table.
+
+Required when upgrading a database created before account-wide logout. The
+column is bumped whenever all of an account's sessions are revoked, and
+access tokens carrying an older version are rejected. SQLModel create_all()
+does not alter existing tables, so run this against any local or deployed
+database that predates the column. Existing access tokens have no version
+claim and are read as version 0, so nobody is logged out by the upgrade.
+
+Usage:
+    uv run python -m migrations.add_account_token_version .env
+    uv run python -m migrations.add_account_token_version .env --apply
+"""
+
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass
+
+from dotenv import load_dotenv
+from sqlalchemy import text
+from sqlmodel import Session, create_engine
+
+from utils.core.db import get_connection_url
+
+
+@dataclass
+class MigrationStats:
+    already_present: bool = False
+
+
+def _column_exists(session: Session) -> bool:
+    result = session.connection().execute(
+        text(
+            """
+            SELECT 1
+            FROM information_schema.columns
+            WHERE table_schema = 'private'
+              AND table_name = 'account'
+              AND column_name = 'token_version'
+            """
+        )
+    )
+    return result.first() is not None
+
+
+def add_account_token_version(env_file: str, apply: bool) -> MigrationStats:
+    load_dotenv(env_file, override=True)
+    engine = create_engine(get_connection_url())
+    stats = MigrationStats()
+
+    try:
+        with Session(engine) as session:
+            stats.already_present = _column_exists(session)
+
+            if apply and not stats.already_present:
+                session.connection().execute(
+                    text(
+                        """
+                        ALTER TABLE private.account
+                          ADD COLUMN IF NOT EXISTS token_version INTEGER NOT NULL DEFAULT 0
+                        """
+                    )
+                )
+                session.commit()
+            else:
+                session.rollback()
+    finally:
+        engine.dispose()
+
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Add token_version to the private.account table. "
+            "Without --apply, runs in dry-run mode."
+        )
+    )
+    parser.add_argument("env", help="Env file to use (e.g. .env)")
+    parser.add_argument(
+        "--apply",
+        action="store_true",
+        help="Apply the schema change (default is dry-run).",
+    )
+    args = parser.parse_args()
+
+    stats = add_account_token_version(env_file=args.env, apply=args.apply)
+    mode = "APPLY" if args.apply else "DRY-RUN"
+    if stats.already_present:
+        print(f"[{mode}] account.token_version already exists.")
+        return
+
+    print(f"[{mode}] missing_columns=['token_version']")
+    if args.apply:
+        print(f"[{mode}] Column added successfully.")
+    else:
+        print("Dry-run only. Re-run with --apply to add the column.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""
+Make email identity case-insensitive with unique indexes on lower(email).
+
+Required when upgrading a database that predates them. Emails keep the case
+they were entered in, and every lookup compares lower() of both sides (see
+email_matches in utils/core/models.py), so these indexes both enforce
+uniqueness regardless of case and serve the lookups:
+
+- private.account: lower(email)
+- private.accountemail: lower(email)
+- invitation: (organization_id, lower(invitee_email), used)
+
+They are built CONCURRENTLY to avoid blocking writes. Building one fails if
+the table already holds addresses that differ only in case, so those are
+checked first and listed; merge or delete them by hand and re-run. Once an
+index is in place, the case-sensitive unique constraint and the plain email
+index it supersedes are dropped, since no lookup can use them any more.
+
+An interrupted CONCURRENTLY build leaves an invalid index behind; it is
+dropped and rebuilt on the next --apply.
+
+Usage:
+    uv run python -m migrations.add_case_insensitive_email_indexes .env
+    uv run python -m migrations.add_case_insensitive_email_indexes .env --apply
+"""
+
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass, field
+
+from dotenv import load_dotenv
+from sqlalchemy import text
+from sqlmodel import create_engine
+
+from utils.core.db import get_connection_url
+
+
+@dataclass(frozen=True)
+class EmailIndex:
+    schema: str
+    table: str
+    name: str
+    key: str
+    # Constraints and indexes the new index makes redundant
+    superseded_constraints: tuple[str, ...] = ()
+    superseded_indexes: tuple[str, ...] = ()
+
+
+INDEXES: tuple[EmailIndex, ...] = (
+    EmailIndex(
+        schema="private",
+        table="account",
+        name="uq_account_lower_email",
+        key="lower(email)",
+        superseded_indexes=("ix_private_account_email",),
+    ),
+    EmailIndex(
+        schema="private",
+        table="accountemail",
+        name="uq_accountemail_lower_email",
+        key="lower(email)",
+        superseded_constraints=("uq_account_email_email",),
+        superseded_indexes=("ix_private_accountemail_email",),
+    ),
+    EmailIndex(
+        schema="public",
+        table="invitation",
+        name="uq_invitation_org_lower_email_used",
+        key="organization_id, lower(invitee_email), used",
+        superseded_constraints=("uq_invitation_org_email_used",),
+        superseded_indexes=("ix_invitation_invitee_email",),
+    ),
+)
+
+
+@dataclass
+class MigrationStats:
+    missing_tables: list[str] = field(default_factory=list)
+    existing_indexes: list[str] = field(default_factory=list)
+    invalid_indexes: list[str] = field(default_factory=list)
+    created_indexes: list[str] = field(default_factory=list)
+    # index name -> rows of the key that occur more than once
+    conflicts: dict[str, list[str]] = field(default_factory=dict)
+    dropped: list[str] = field(default_factory=list)
+
+
+def add_case_insensitive_email_indexes(env_file: str, apply: bool) -> MigrationStats:
+    load_dotenv(env_file, override=True)
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    engine = create_engine(get_connection_url(), isolation_level="AUTOCOMMIT")
+    stats = MigrationStats()
+
+    try:
+        with engine.connect() as connection:
+            for index in INDEXES:
+                qualified_table = f"{index.schema}.{index.table}"
+                if (
+                    connection.execute(
+                        text("SELECT to_regclass(:table)"),
+                        {"table": qualified_table},
+                    ).scalar()
+                    is None
+                ):
+                    stats.missing_tables.append(qualified_table)
+                    continue
+
+                valid = connection.execute(
+                    text(
+                        """
+                        SELECT index.indisvalid
+                        FROM pg_index AS index
+                        WHERE index.indexrelid = to_regclass(:index)
+                        """
+                    ),
+                    {"index": f"{index.schema}.{index.name}"},
+                ).scalar()
+                if valid:
+                    stats.existing_indexes.append(index.name)
+                else:
+                    duplicates = connection.execute(
+                        text(
+                            f"SELECT concat_ws(', ', {index.key}) "
+                            f"FROM {qualified_table} "
+                            f"GROUP BY {index.key} HAVING count(*) > 1 "
+                            f"ORDER BY 1"
+                        )
+                    ).scalars()
+                    conflicts = list(duplicates)
+                    if conflicts:
+                        stats.conflicts[index.name] = conflicts
+                        continue
+
+                    if valid is False:
+                        stats.invalid_indexes.append(index.name)
+                        if apply:
+                            connection.execute(
+                                text(
+                                    "DROP INDEX CONCURRENTLY IF EXISTS "
+                                    f"{index.schema}.{index.name}"
+                                )
+                            )
+                    if apply:
+                        connection.execute(
+                            text(
+                                f"CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS "
+                                f"{index.name} ON {qualified_table} ({index.key})"
+                            )
+                        )
+                    stats.created_indexes.append(index.name)
+
+                for constraint in index.superseded_constraints:
+                    if (
+                        connection.execute(
+                            text(
+                                "SELECT 1 FROM pg_constraint "
+                                "WHERE conname = :name "
+                                "AND conrelid = to_regclass(:table)"
+                            ),
+                            {"name": constraint, "table": qualified_table},
+                        ).scalar()
+                        is None
+                    ):
+                        continue
+                    if apply:
+                        connection.execute(
+                            text(
+                                f"ALTER TABLE {qualified_table} "
+                                f"DROP CONSTRAINT IF EXISTS {constraint}"
+                            )
+                        )
+                    stats.dropped.append(constraint)
+                for superseded in index.superseded_indexes:
+                    if (
+                        connection.execute(
+                            text("SELECT to_regclass(:index)"),
+                            {"index": f"{index.schema}.{superseded}"},
+                        ).scalar()
+                        is None
+                    ):
+                        continue
+                    if apply:
+                        connection.execute(
+                            text(
+                                "DROP INDEX CONCURRENTLY IF EXISTS "
+                                f"{index.schema}.{superseded}"
+                            )
+                        )
+                    stats.dropped.append(superseded)
+    finally:
+        engine.dispose()
+
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Add unique indexes on lower(email) for case-insensitive email "
+            "identity. Without --apply, runs in dry-run mode."
+        )
+    )
+    parser.add_argument("env", help="Env file to use (e.g. .env)")
+    parser.add_argument(
+        "--apply",
+        action="store_true",
+        help="Apply the schema change (default is dry-run).",
+    )
+    args = parser.parse_args()
+
+    stats = add_case_insensitive_email_indexes(env_file=args.env, apply=args.apply)
+    mode = "APPLY" if args.apply else "DRY-RUN"
+    for table in stats.missing_tables:
+        print(f"[{mode}] {table} table does not exist; skipped.")
+    for name, conflicts in stats.conflicts.items():
+        print(
+            f"[{mode}] {name} cannot be built; these keys occur more than once "
+            "ignoring case:"
+        )
+        for conflict in conflicts:
+            print(f"    {conflict}")
+    for name in stats.invalid_indexes:
+        print(f"[{mode}] {name} is invalid (interrupted build); rebuilding.")
+    if not stats.created_indexes and not stats.dropped:
+        if not stats.conflicts:
+            print(f"[{mode}] All indexes already exist.")
+        return
+
+    if stats.created_indexes:
+        print(f"[{mode}] indexes to create: {', '.join(stats.created_indexes)}")
+    if stats.dropped:
+        print(f"[{mode}] superseded to drop: {', '.join(stats.dropped)}")
+    if args.apply:
+        print(f"[{mode}] Schema change applied successfully.")
+    else:
+        print("Dry-run only. Re-run with --apply to apply the schema change.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Add the partial indexes behind hot lookups to an existing database.
+
+Required when upgrading a database that predates them. SQLModel create_all()
+creates them for new databases but does not add indexes to existing tables,
+so they are built here CONCURRENTLY to avoid blocking writes. Each index only
+covers the rows its lookup reads:
+
+- invitation (organization_id, created_at) WHERE used IS FALSE:
+  an org's pending invitations, newest first
+- refreshtoken (account_id) WHERE revoked IS FALSE:
+  revoking every live token of an account
+- organization (name) WHERE deleting_at IS NULL:
+  the name-taken check on create and rename
+- accountemail (account_id) WHERE verified:
+  an account's verified addresses, checked on invitation login
+
+Role (organization_id, name) lookups are already served by the unique index
+behind uq_role_organization_name.
+
+An interrupted CONCURRENTLY build leaves an invalid index behind; it is
+dropped and rebuilt on the next --apply.
+
+Usage:
+    uv run python -m migrations.add_hot_lookup_indexes .env
+    uv run python -m migrations.add_hot_lookup_indexes .env --apply
+"""
+
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass, field
+
+from dotenv import load_dotenv
+from sqlalchemy import text
+from sqlmodel import create_engine
+
+from utils.core.db import get_connection_url
+
+# (schema, table, index name, column list and predicate)
+INDEXES: tuple[tuple[str, str, str, str], ...] = (
+    (
+        "public",
+        "invitation",
+        "ix_invitation_pending_organization_id_created_at",
+        "(organization_id, created_at) WHERE used IS FALSE",
+    ),
+    (
+        "private",
+        "refreshtoken",
+        "ix_refreshtoken_live_account_id",
+        "(account_id) WHERE revoked IS FALSE",
+    ),
+    (
+        "public",
+        "organization",
+        "ix_organization_live_name",
+        "(name) WHERE deleting_at IS NULL",
+    ),
+    (
+        "private",
+        "accountemail",
+        "ix_accountemail_verified_account_id",
+        "(account_id) WHERE verified",
+    ),
+)
+
+
+@dataclass
+class MigrationStats:
+    missing_tables: list[str] = field(default_factory=list)
+    existing_indexes: list[str] = field(default_factory=list)
+    invalid_indexes: list[str] = field(default_factory=list)
+    created_indexes: list[str] = field(default_factory=list)
+
+
+def add_hot_lookup_indexes(env_file: str, apply: bool) -> MigrationStats:
+    load_dotenv(env_file, override=True)
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    engine = create_engine(get_connection_url(), isolation_level="AUTOCOMMIT")
+    stats = MigrationStats()
+
+    try:
+        with engine.connect() as connection:
+            for schema, table, name, definition in INDEXES:
+                if (
+                    connection.execute(
+                        text("SELECT to_regclass(:table)"),
+                        {"table": f"{schema}.{table}"},
+                    ).scalar()
+                    is None
+                ):
+                    stats.missing_tables.append(f"{schema}.{table}")
+                    continue
+
+                valid = connection.execute(
+                    text(
+                        """
+                        SELECT index.indisvalid
+                        FROM pg_index AS index
+                        WHERE index.indexrelid = to_regclass(:index)
+                        """
+                    ),
+                    {"index": f"{schema}.{name}"},
+                ).scalar()
+                if valid:
+                    stats.existing_indexes.append(name)
+                    continue
+                if valid is False:
+                    stats.invalid_indexes.append(name)
+                    if apply:
+                        connection.execute(
+                            text(f"DROP INDEX CONCURRENTLY IF EXISTS {schema}.{name}")
+                        )
+
+                if apply:
+                    connection.execute(
+                        text(
+                            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} "
+                            f"ON {schema}.{table} {definition}"
+                        )
+                    )
+                stats.created_indexes.append(name)
+    finally:
+        engine.dispose()
+
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Add the partial indexes behind hot lookups. "
+            "Without --apply, runs in dry-run mode."
+        )
+    )
+    parser.add_argument("env", help="Env file to use (e.g. .env)")
+    parser.add_argument(
+        "--apply",
+        action="store_true",
+        help="Apply the schema change (default is dry-run).",
+    )
+    args = parser.parse_args()
+
+    stats = add_hot_lookup_indexes(env_file=args.env, apply=args.apply)
+    mode = "APPLY" if args.apply else "DRY-RUN"
+    for table in stats.missing_tables:
+        print(f"[{mode}] {table} table does not exist; skipped.")
+    for name in stats.invalid_indexes:
+        print(f"[{mode}] {name} is invalid (interrupted build); rebuilding.")
+    if not stats.created_indexes:
+        print(f"[{mode}] All indexes already exist.")
+        return
+
+    print(f"[{mode}] indexes to create: {', '.join(stats.created_indexes)}")
+    if args.apply:
+        print(f"[{mode}] Indexes created successfully.")
+    else:
+        print("Dry-run only. Re-run with --apply to create the indexes.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Add the deleting_at column to the organization table.
+
+Required when upgrading a database created before large organizations were
+deleted in the background. The column is set when deletion of such an
+organization is requested and hides it from its members until a background
+task has removed its rows. SQLModel create_all() does not alter existing
+tables, so run this against any local or deployed database that predates the
+column. Existing organizations get NULL, i.e. not being deleted.
+
+Usage:
+    uv run python -m migrations.add_organization_deleting_at .env
+    uv run python -m migrations.add_organization_deleting_at .env --apply
+"""
+
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass
+
+from dotenv import load_dotenv
+from sqlalchemy import text
+from sqlmodel import Session, create_engine
+
+from utils.core.db import get_connection_url
+
+
+@dataclass
+class MigrationStats:
+    already_present: bool = False
+
+
+def _column_exists(session: Session) -> bool:
+    result = session.connection().execute(
+        text(
+            """
+            SELECT 1
+            FROM information_schema.columns
+            WHERE table_schema = 'public'
+              AND table_name = 'organization'
+              AND column_name = 'deleting_at'
+            """
+        )
+    )
+    return result.first() is not None
+
+
+def add_organization_deleting_at(env_file: str, apply: bool) -> MigrationStats:
+    load_dotenv(env_file, override=True)
+    engine = create_engine(get_connection_url())
+    stats = MigrationStats()
+
+    try:
+        with Session(engine) as session:
+            stats.already_present = _column_exists(session)
+
+            if apply and not stats.already_present:
+                session.connection().execute(
+                    text(
+                        """
+                        ALTER TABLE organization
+                          ADD COLUMN IF NOT EXISTS deleting_at TIMESTAMP WITHOUT TIME ZONE
+                        """
+                    )
+                )
+                session.commit()
+            else:
+                session.rollback()
+    finally:
+        engine.dispose()
+
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Add deleting_at to the organization table. "
+            "Without --apply, runs in dry-run mode."
+        )
+    )
+    parser.add_argument("env", help="Env file to use (e.g. .env)")
+    parser.add_argument(
+        "--apply",
+        action="store_true",
+        help="Apply the schema change (default is dry-run).",
+    )
+    args = parser.parse_args()
+
+    stats = add_organization_deleting_at(env_file=args.env, apply=args.apply)
+    mode = "APPLY" if args.apply else "DRY-RUN"
+    if stats.already_present:
+        print(f"[{mode}] organization.deleting_at already exists.")
+        return
+
+    print(f"[{mode}] missing_columns=['deleting_at']")
+    if args.apply:
+        print(f"[{mode}] Column added successfully.")
+    else:
+        print("Dry-run only. Re-run with --apply to add the column.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Add the composite (organization_id, created_at, id) index to organizationresource.
+
+Required when upgrading a database whose organizationresource table predates
+dashboard keyset pagination. SQLModel create_all() creates the index for new
+databases but does not add indexes to existing tables. The index is built
+CONCURRENTLY so writes to the table are not blocked while it builds, and the
+old single-column organization_id index is dropped afterwards because the
+composite index's leading column covers it.
+
+Usage:
+    uv run python -m migrations.add_resource_pagination_index .env
+    uv run python -m migrations.add_resource_pagination_index .env --apply
+"""
+
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass
+
+from dotenv import load_dotenv
+from sqlalchemy import text
+from sqlmodel import create_engine
+
+from utils.core.db import get_connection_url
+
+INDEX_NAME = "ix_organizationresource_organization_id_created_at_id"
+LEGACY_INDEX_NAME = "ix_organizationresource_organization_id"
+
+
+@dataclass
+class MigrationStats:
+    table_exists: bool = False
+    index_exists: bool = False
+    legacy_index_exists: bool = False
+
+
+def add_resource_pagination_index(env_file: str, apply: bool) -> MigrationStats:
+    load_dotenv(env_file, override=True)
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    engine = create_engine(get_connection_url(), isolation_level="AUTOCOMMIT")
+    stats = MigrationStats()
+
+    try:
+        with engine.connect() as connection:
+            stats.table_exists = (
+                connection.execute(
+                    text("SELECT to_regclass('public.organizationresource')")
+                ).scalar()
+                is not None
+            )
+            if not stats.table_exists:
+                return stats
+
+            existing = set(
+                connection.execute(
+                    text(
+                        """
+                        SELECT indexname
+                        FROM pg_indexes
+                        WHERE schemaname = 'public'
+                          AND tablename = 'organizationresource'
+                        """
+                    )
+                ).scalars()
+            )
+            stats.index_exists = INDEX_NAME in existing
+            stats.legacy_index_exists = LEGACY_INDEX_NAME in existing
+
+            if apply and not stats.index_exists:
+                connection.execute(
+                    text(
+                        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {INDEX_NAME} "
+                        "ON organizationresource (organization_id, created_at, id)"
+                    )
+                )
+            if apply and stats.legacy_index_exists:
+                connection.execute(
+                    text(f"DROP INDEX CONCURRENTLY IF EXISTS {LEGACY_INDEX_NAME}")
+                )
+    finally:
+        engine.dispose()
+
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Add the organizationresource pagination index. "
+            "Without --apply, runs in dry-run mode."
+        )
+    )
+    parser.add_argument("env", help="Env file to use (e.g. .env)")
+    parser.add_argument(
+        "--apply",
+        action="store_true",
+        help="Apply the schema change (default is dry-run).",
+    )
+    args = parser.parse_args()
+
+    stats = add_resource_pagination_index(env_file=args.env, apply=args.apply)
+    mode = "APPLY" if args.apply else "DRY-RUN"
+    if not stats.table_exists:
+        print(f"[{mode}] organizationresource table does not exist; nothing to do.")
+        return
+    if stats.index_exists:
+        print(f"[{mode}] Pagination index {INDEX_NAME} already exists.")
+    elif args.apply:
+        print(f"[{mode}] Pagination index {INDEX_NAME} created.")
+    else:
+        print(f"[{mode}] Pagination index {INDEX_NAME} would be created.")
+
+    if not stats.legacy_index_exists:
+        print(f"[{mode}] Legacy index {LEGACY_INDEX_NAME} is already gone.")
+    elif args.apply:
+        print(f"[{mode}] Legacy index {LEGACY_INDEX_NAME} dropped.")
+    else:
+        print(f"[{mode}] Legacy index {LEGACY_INDEX_NAME} would be dropped.")
+
+    if not args.apply and not (stats.index_exists and not stats.legacy_index_exists):
+        print("Dry-run only. Re-run with --apply to apply the schema change.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Add the full-text and trigram search indexes to an existing database.
+
+Required when upgrading a database that predates dashboard resource search.
+SQLModel create_all() creates the organizationresource full-text index for new
+databases but does not add indexes to existing tables, so it is built here
+CONCURRENTLY to avoid blocking writes. The pg_trgm indexes behind member
+name/email search are optional: they are created only where the extension is
+installed or can be created, and search works (unindexed) without them.
+
+Usage:
+    uv run python -m migrations.add_search_indexes .env
+    uv run python -m migrations.add_search_indexes .env --apply
+"""
+
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass, field
+
+from dotenv import load_dotenv
+from sqlalchemy import text
+from sqlmodel import create_engine
+
+from utils.app.models import RESOURCE_SEARCH_DOCUMENT
+from utils.core.db import get_connection_url
+from utils.core.search import TRIGRAM_INDEXES
+
+INDEX_NAME = "ix_organizationresource_search"
+
+
+@dataclass
+class MigrationStats:
+    table_exists: bool = False
+    index_exists: bool = False
+    trigram_available: bool = False
+    missing_trigram_indexes: list[str] = field(default_factory=list)
+
+
+def add_search_indexes(env_file: str, apply: bool) -> MigrationStats:
+    load_dotenv(env_file, override=True)
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    engine = create_engine(get_connection_url(), isolation_level="AUTOCOMMIT")
+    stats = MigrationStats()
+
+    try:
+        with engine.connect() as connection:
+            stats.table_exists = (
+                connection.execute(
+                    text("SELECT to_regclass('public.organizationresource')")
+                ).scalar()
+                is not None
+            )
+            if not stats.table_exists:
+                return stats
+
+            existing = set(
+                connection.execute(
+                    text(
+                        "SELECT indexname FROM pg_indexes "
+                        "WHERE schemaname IN ('public', 'private')"
+                    )
+                ).scalars()
+            )
+            stats.index_exists = INDEX_NAME in existing
+            stats.trigram_available = (
+                connection.execute(
+                    text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+                ).scalar()
+                is not None
+            )
+            stats.missing_trigram_indexes = [
+                name for name in TRIGRAM_INDEXES if name not in existing
+            ]
+
+            if apply and not stats.index_exists:
+                connection.execute(
+                    text(
+                        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {INDEX_NAME} "
+                        f"ON organizationresource USING gin ({RESOURCE_SEARCH_DOCUMENT})"
+                    )
+                )
+            if apply and stats.trigram_available and stats.missing_trigram_indexes:
+                connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+                for name in stats.missing_trigram_indexes:
+                    connection.execute(
+                        text(
+                            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} "
+                            f"ON {TRIGRAM_INDEXES[name]}"
+                        )
+                    )
+    finally:
+        engine.dispose()
+
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Add the resource full-text and member trigram search indexes. "
+            "Without --apply, runs in dry-run mode."
+        )
+    )
+    parser.add_argument("env", help="Env file to use (e.g. .env)")
+    parser.add_argument(
+        "--apply",
+        action="store_true",
+        help="Apply the schema change (default is dry-run).",
+    )
+    args = parser.parse_args()
+
+    stats = add_search_indexes(env_file=args.env, apply=args.apply)
+    mode = "APPLY" if args.apply else "DRY-RUN"
+    if not stats.table_exists:
+        print(f"[{mode}] organizationresource table does not exist; nothing to do.")
+        return
+
+    print(
+        f"[{mode}] index_exists={stats.index_exists} "
+        f"trigram_available={stats.trigram_available} "
+        f"missing_trigram_indexes={stats.missing_trigram_indexes}"
+    )
+    if not stats.trigram_available:
+        print(f"[{mode}] pg_trgm is not installed; member search stays unindexed.")
+    if args.apply:
+        print(f"[{mode}] Indexes created successfully.")
+    else:
+        print("Dry-run only. Re-run with --apply to create the indexes.")
+
+
+if __name__ == "__main__":
+    main()
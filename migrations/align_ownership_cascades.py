@@ -6,6 +6,11 @@ UserAvatar, or OrganizationResource tables were created without ON DELETE
 CASCADE. SQLModel create_all() applies this for new databases but does not
 alter existing constraints.
 
+Also required before deploying set-based account and organization deletion:
+account tokens, users, roles, role links and invitations now rely on ON
+DELETE CASCADE (and invitation.accepted_by_user_id on ON DELETE SET NULL)
+instead of the ORM loading and deleting each dependent row.
+
 Usage:
     uv run python -m migrations.align_ownership_cascades .env
     uv run python -m migrations.align_ownership_cascades .env --apply
@@ -32,6 +37,7 @@ class ForeignKeyTarget:
     target_table: str
     target_column: str
     constraint_name: str
+    delete_rule: str = "CASCADE"
 
     @property
     def label(self) -> str:
@@ -73,6 +79,124 @@ TARGETS = (
         target_column="id",
         constraint_name="fk_organizationresource_organization_id_organization",
     ),
+    ForeignKeyTarget(
+        source_schema="private",
+        source_table="passwordresettoken",
+        source_column="account_id",
+        target_schema="private",
+        target_table="account",
+        target_column="id",
+        constraint_name="fk_passwordresettoken_account_id_account",
+    ),
+    ForeignKeyTarget(
+        source_schema="private",
+        source_table="emailverificationtoken",
+        source_column="account_id",
+        target_schema="private",
+        target_table="account",
+        target_column="id",
+        constraint_name="fk_emailverificationtoken_account_id_account",
+    ),
+    ForeignKeyTarget(
+        source_schema="private",
+        source_table="accountrecoverytoken",
+        source_column="account_id",
+        target_schema="private",
+        target_table="account",
+        target_column="id",
+        constraint_name="fk_accountrecoverytoken_account_id_account",
+    ),
+    ForeignKeyTarget(
+        source_schema="private",
+        source_table="refreshtoken",
+        source_column="account_id",
+        target_schema="private",
+        target_table="account",
+        target_column="id",
+        constraint_name="fk_refreshtoken_account_id_account",
+    ),
+    ForeignKeyTarget(
+        source_schema="public",
+        source_table="user",
+        source_column="account_id",
+        target_schema="private",
+        target_table="account",
+        target_column="id",
+        constraint_name="fk_user_account_id_account",
+    ),
+    ForeignKeyTarget(
+        source_schema="public",
+        source_table="userrolelink",
+        source_column="user_id",
+        target_schema="public",
+        target_table="user",
+        target_column="id",
+        constraint_name="fk_userrolelink_user_id_user",
+    ),
+    ForeignKeyTarget(
+        source_schema="public",
+        source_table="userrolelink",
+        source_column="role_id",
+        target_schema="public",
+        target_table="role",
+        target_column="id",
+        constraint_name="fk_userrolelink_role_id_role",
+    ),
+    ForeignKeyTarget(
+        source_schema="public",
+        source_table="rolepermissionlink",
+        source_column="role_id",
+        target_schema="public",
+        target_table="role",
+        target_column="id",
+        constraint_name="fk_rolepermissionlink_role_id_role",
+    ),
+    ForeignKeyTarget(
+        source_schema="public",
+        source_table="rolepermissionlink",
+        source_column="permission_id",
+        target_schema="public",
+        target_table="permission",
+        target_column="id",
+        constraint_name="fk_rolepermissionlink_permission_id_permission",
+    ),
+    ForeignKeyTarget(
+        source_schema="public",
+        source_table="role",
+        source_column="organization_id",
+        target_schema="public",
+        target_table="organization",
+        target_column="id",
+        constraint_name="fk_role_organization_id_organization",
+    ),
+    ForeignKeyTarget(
+        source_schema="public",
+        source_table="invitation",
+        source_column="organization_id",
+        target_schema="public",
+        target_table="organization",
+        target_column="id",
+        constraint_name="fk_invitation_organization_id_organization",
+    ),
+    ForeignKeyTarget(
+        source_schema="public",
+        source_table="invitation",
+        source_column="role_id",
+        target_schema="public",
+        target_table="role",
+        target_column="id",
+        constraint_name="fk_invitation_role_id_role",
+    ),
+    ForeignKeyTarget(
+        source_schema="public",
+        source_table="invitation",
+        source_column="accepted_by_user_id",
+        target_schema="public",
+        target_table="user",
+        target_column="id",
+        constraint_name="fk_invitation_accepted_by_user_id_user",
+        delete_rule="SET NULL",
+    ),
 )
 
 
@@ -138,7 +262,7 @@ def _matching_foreign_keys(
     return [(row.constraint_name, row.delete_rule) for row in result]
 
 
-def _replace_foreign_key_with_cascade(
+def _replace_foreign_key_with_delete_rule(
     session: Session, target: ForeignKeyTarget, existing_names: list[str]
 ) -> None:
     source_table = _qualified_table(target.source_schema, target.source_table)
@@ -158,7 +282,7 @@ def _replace_foreign_key_with_cascade(
             f"ADD CONSTRAINT {_quote_identifier(target.constraint_name)} "
             f"FOREIGN KEY ({_quote_identifier(target.source_column)}) "
             f"REFERENCES {target_table} ({_quote_identifier(target.target_column)}) "
-            "ON DELETE CASCADE"
+            f"ON DELETE {target.delete_rule}"
         )
     )
 
@@ -182,13 +306,13 @@ def align_ownership_cascades(env_file: str, apply: bool) -> MigrationStats:
                     continue
 
                 existing = _matching_foreign_keys(session, target)
-                if len(existing) == 1 and existing[0][1] == "CASCADE":
+                if len(existing) == 1 and existing[0][1] == target.delete_rule:
                     already_cascading.append(target.label)
                     continue
 
                 updated.append(target.label)
                 if apply:
-                    _replace_foreign_key_with_cascade(
+                    _replace_foreign_key_with_delete_rule(
                         session, target, [name for name, _ in existing]
                     )
 
@@ -209,7 +333,7 @@ def align_ownership_cascades(env_file: str, apply: bool) -> MigrationStats:
 def main() -> None:
     parser = argparse.ArgumentParser(
         description=(
-            "Recreate ownership-style foreign keys with ON DELETE CASCADE. "
+            "Recreate ownership-style foreign keys with their ON DELETE rules. "
             "Without --apply, runs in dry-run mode."
         )
     )
@@ -0,0 +1,147 @@
+"""
+Convert private.ratelimitattempt into an hourly range-partitioned table.
+
+Required when upgrading a database created before rate-limit attempts were
+partitioned. SQLModel create_all() will not repartition an existing table, so
+this recreates it: attempts still inside a limiter window are copied aside,
+the old table is dropped, the partitioned table and its partitions are
+created and the copied attempts are put back, all in one transaction. Older
+attempts can no longer affect any limit and are discarded.
+
+Set RATE_LIMIT_UNLOGGED=1 in the env file to create the partitions UNLOGGED.
+
+Usage:
+    uv run python -m migrations.partition_rate_limit_attempts .env
+    uv run python -m migrations.partition_rate_limit_attempts .env --apply
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+from dataclasses import dataclass, field
+
+from dotenv import load_dotenv
+from sqlalchemy import inspect, text
+from sqlmodel import create_engine
+
+from utils.core.db import get_connection_url
+from utils.core.models import RateLimitAttempt, utc_naive_now
+from utils.core.partitions import (
+    PARTITION_INTERVAL,
+    create_partitions,
+    is_partitioned,
+)
+
+
+@dataclass
+class MigrationStats:
+    table_exists: bool = False
+    already_partitioned: bool = False
+    rows_to_keep: int = 0
+    partitions_created: list[str] = field(default_factory=list)
+
+
+def partition_rate_limit_attempts(env_file: str, apply: bool) -> MigrationStats:
+    load_dotenv(env_file, override=True)
+    # Imported after loading the env file: limiter windows come from it
+    from utils.core.rate_limit import rate_limit_retention
+
+    retention = rate_limit_retention()
+    cutoff = utc_naive_now() - retention
+    engine = create_engine(get_connection_url())
+    stats = MigrationStats()
+
+    try:
+        with engine.begin() as connection:
+            stats.table_exists = (
+                connection.execute(
+                    text("SELECT to_regclass('private.ratelimitattempt')")
+                ).scalar()
+                is not None
+            )
+            if not stats.table_exists:
+                return stats
+            stats.already_partitioned = is_partitioned(connection)
+            if stats.already_partitioned:
+                return stats
+
+            if not apply:
+                # A plain count takes no lock that blocks the app's inserts
+                stats.rows_to_keep = connection.execute(
+                    text(
+                        "SELECT count(*) FROM private.ratelimitattempt "
+                        "WHERE attempted_at > :cutoff"
+                    ),
+                    {"cutoff": cutoff},
+                ).scalar_one()
+                connection.rollback()
+                return stats
+
+            # Held until commit so no attempt is recorded between the copy
+            # and the drop
+            connection.execute(
+                text("LOCK TABLE private.ratelimitattempt IN ACCESS EXCLUSIVE MODE")
+            )
+            stats.rows_to_keep = connection.execute(
+                text(
+                    "CREATE TEMPORARY TABLE kept_attempts ON COMMIT DROP AS "
+                    "SELECT scope, key, attempted_at FROM private.ratelimitattempt "
+                    "WHERE attempted_at > :cutoff"
+                ),
+                {"cutoff": cutoff},
+            ).rowcount
+            # Dropping frees the index and sequence names for the new table
+            connection.execute(text("DROP TABLE private.ratelimitattempt"))
+            inspect(RateLimitAttempt).local_table.create(connection)
+            stats.partitions_created = create_partitions(
+                connection, behind=math.ceil(retention / PARTITION_INTERVAL)
+            )
+            connection.execute(
+                text(
+                    "INSERT INTO private.ratelimitattempt (scope, key, attempted_at) "
+                    "SELECT scope, key, attempted_at FROM kept_attempts"
+                )
+            )
+    finally:
+        engine.dispose()
+
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Partition private.ratelimitattempt by hour of attempted_at. "
+            "Without --apply, runs in dry-run mode."
+        )
+    )
+    parser.add_argument("env", help="Env file to use (e.g. .env)")
+    parser.add_argument(
+        "--apply",
+        action="store_true",
+        help="Apply the schema change (default is dry-run).",
+    )
+    args = parser.parse_args()
+
+    stats = partition_rate_limit_attempts(env_file=args.env, apply=args.apply)
+    mode = "APPLY" if args.apply else "DRY-RUN"
+    if not stats.table_exists:
+        print(f"[{mode}] ratelimitattempt table does not exist; nothing to do.")
+        return
+    if stats.already_partitioned:
+        print(f"[{mode}] ratelimitattempt is already partitioned.")
+        return
+
+    print(f"[{mode}] rows_to_keep={stats.rows_to_keep}")
+    if args.apply:
+        print(
+            f"[{mode}] Table partitioned; created {len(stats.partitions_created)} "
+            "partitions."
+        )
+    else:
+        print("Dry-run only. Re-run with --apply to partition the table.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,354 @@
+"""
+Example CRUD, bulk import and export routes for OrganizationResource.
+Replace these with routes for your own application models.
+"""
+
+from typing import Annotated, Literal, Optional
+from urllib.parse import urlencode
+
+from fastapi import APIRouter, Depends, File, Form, Request, UploadFile
+from fastapi.responses import RedirectResponse, Response, StreamingResponse
+from utils.core.templating import create_templates
+from sqlmodel import Session
+
+from exceptions.http_exceptions import (
+    InsufficientPermissionsError,
+    InvalidResourceImportError,
+    OrganizationResourceNotFoundError,
+)
+from utils.app.enums import AppPermissions
+from utils.app.models import OrganizationResource
+from utils.app.resources import (
+    ResourceListItem,
+    bulk_insert_resources,
+    detect_import_format,
+    has_resources,
+    iter_resource_export,
+    load_resource_page,
+    parse_resource_import,
+    search_resources,
+)
+from utils.core.dependencies import get_session, get_user_with_relations
+from utils.core.htmx import (
+    FragmentResponse,
+    is_htmx_request,
+    oob_only,
+    set_flash_cookie,
+)
+from utils.core.models import User, utc_now
+from utils.core.search import prefix_tsquery, run_with_latency_budget
+
+router = APIRouter(prefix="/resources", tags=["resources"])
+templates = create_templates()
+
+EXPORT_MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+ResourceTitle = Annotated[
+    str,
+    Form(
+        min_length=1,
+        strip_whitespace=True,
+        pattern=r"\S+",
+        title="Title",
+        description="Resource title cannot be empty or contain only whitespace",
+    ),
+]
+
+
+# --- Helpers ---
+
+
+def _require_permission(
+    user: User, permission: AppPermissions, organization_id: int
+) -> None:
+    if not user.has_permission(permission, organization_id):
+        raise InsufficientPermissionsError()
+
+
+def _get_resource(
+    session: Session, user: User, resource_id: int, permission: AppPermissions
+) -> OrganizationResource:
+    resource = session.get(OrganizationResource, resource_id)
+    if resource is None:
+        raise OrganizationResourceNotFoundError()
+    _require_permission(user, permission, resource.organization_id)
+    return resource
+
+
+def _item_context(user: User, organization_id: int) -> dict:
+    return {
+        "can_write": user.has_permission(
+            AppPermissions.WRITE_ORGANIZATION_RESOURCES, organization_id
+        ),
+        "can_delete": user.has_permission(
+            AppPermissions.DELETE_ORGANIZATION_RESOURCES, organization_id
+        ),
+    }
+
+
+def _dashboard_redirect(request: Request, message: str | None = None) -> Response:
+    response = RedirectResponse(url=request.url_for("read_dashboard"), status_code=303)
+    if message:
+        set_flash_cookie(response, message)
+    return response
+
+
+# --- Routes ---
+
+
+@router.post("/create", response_class=RedirectResponse)
+def create_resource(
+    request: Request,
+    title: ResourceTitle,
+    organization_id: Annotated[int, Form()],
+    description: Annotated[Optional[str], Form()] = None,
+    user: User = Depends(get_user_with_relations),
+    session: Session = Depends(get_session),
+) -> Response:
+    _require_permission(
+        user, AppPermissions.WRITE_ORGANIZATION_RESOURCES, organization_id
+    )
+
+    resource = OrganizationResource(
+        organization_id=organization_id,
+        title=title,
+        description=description or None,
+    )
+    session.add(resource)
+    session.commit()
+    session.refresh(resource)
+
+    if is_htmx_request(request):
+        response = FragmentResponse(
+            request,
+            templates,
+            "dashboard/partials/resource_oob.html",
+            {
+                **_item_context(user, organization_id),
+                "resource_event": "created",
+                "resource": ResourceListItem.from_resource(resource),
+            },
+        )
+        response.headers["HX-Trigger"] = "modalDismiss"
+        oob_only(response)
+        return response.add_toast("Resource created successfully.")
+    return _dashboard_redirect(request, "Resource created successfully.")
+
+
+@router.get("/export")
+def export_resources(
+    organization_id: int,
+    format: Literal["csv", "ndjson"] = "csv",
+    user: User = Depends(get_user_with_relations),
+) -> StreamingResponse:
+    """Stream every resource in the organization as a CSV or NDJSON download."""
+    _require_permission(
+        user, AppPermissions.READ_ORGANIZATION_RESOURCES, organization_id
+    )
+    return StreamingResponse(
+        iter_resource_export(organization_id, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="resources-{organization_id}.{format}"'
+            )
+        },
+    )
+
+
+@router.get("/search")
+def search_organization_resources(
+    request: Request,
+    organization_id: int,
+    q: str = "",
+    user: User = Depends(get_user_with_relations),
+    session: Session = Depends(get_session),
+) -> Response:
+    """
+    Typeahead results for the dashboard search box, swapped into
+    #resource-list. An empty query restores the first page of the list.
+    """
+    _require_permission(
+        user, AppPermissions.READ_ORGANIZATION_RESOURCES, organization_id
+    )
+    if not is_htmx_request(request):
+        return RedirectResponse(
+            url=f"{request.url_for('read_dashboard')}?{urlencode({'q': q})}",
+            status_code=303,
+        )
+
+    context = _item_context(user, organization_id)
+    tsquery = prefix_tsquery(q)
+    if tsquery is None:
+        return templates.TemplateResponse(
+            request,
+            "dashboard/partials/resource_page.html",
+            {**context, "resource_page": load_resource_page(session, organization_id)},
+        )
+    return templates.TemplateResponse(
+        request,
+        "dashboard/partials/resource_search_results.html",
+        {
+            **context,
+            "search_query": q,
+            "search_results": run_with_latency_budget(
+                session, lambda: search_resources(session, organization_id, tsquery)
+            ),
+        },
+    )
+
+
+@router.post("/import", response_class=RedirectResponse)
+def import_resources(
+    request: Request,
+    organization_id: Annotated[int, Form()],
+    import_file: Annotated[UploadFile, File()],
+    user: User = Depends(get_user_with_relations),
+    session: Session = Depends(get_session),
+) -> Response:
+    """
+    Bulk-create resources from a CSV (with a title header) or NDJSON upload.
+    The file is parsed as it is read and inserted with batched COPY in one
+    transaction, so an invalid row rejects the whole import.
+    """
+    _require_permission(
+        user, AppPermissions.WRITE_ORGANIZATION_RESOURCES, organization_id
+    )
+    import_format = detect_import_format(import_file.filename, import_file.content_type)
+    if import_format is None:
+        raise InvalidResourceImportError("Upload a .csv or .ndjson file")
+
+    try:
+        imported = bulk_insert_resources(
+            session,
+            organization_id,
+            parse_resource_import(import_file.file, import_format),
+        )
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+
+    message = f"Imported {imported} resource{'s' if imported != 1 else ''}."
+    if is_htmx_request(request):
+        response = FragmentResponse(
+            request,
+            templates,
+            "dashboard/partials/resource_page.html",
+            {
+                **_item_context(user, organization_id),
+                "resource_page": load_resource_page(session, organization_id),
+            },
+        )
+        response.headers["HX-Trigger"] = "modalDismiss"
+        return response.add_toast(message)
+    return _dashboard_redirect(request, message)
+
+
+@router.get("/{resource_id}")
+def read_resource(
+    request: Request,
+    resource_id: int,
+    user: User = Depends(get_user_with_relations),
+    session: Session = Depends(get_session),
+) -> Response:
+    """A single list item; cancelling an inline edit swaps it back in."""
+    resource = _get_resource(
+        session, user, resource_id, AppPermissions.READ_ORGANIZATION_RESOURCES
+    )
+    if not is_htmx_request(request):
+        return _dashboard_redirect(request)
+    return templates.TemplateResponse(
+        request,
+        "dashboard/partials/resource_item.html",
+        {
+            **_item_context(user, resource.organization_id),
+            "resource": ResourceListItem.from_resource(resource),
+        },
+    )
+
+
+@router.get("/{resource_id}/edit")
+def edit_resource_form(
+    request: Request,
+    resource_id: int,
+    user: User = Depends(get_user_with_relations),
+    session: Session = Depends(get_session),
+) -> Response:
+    """
+    The edit form, swapped over the list item for HTMX requests or rendered as
+    a page otherwise. Loads the full description, which the list omits.
+    """
+    resource = _get_resource(
+        session, user, resource_id, AppPermissions.WRITE_ORGANIZATION_RESOURCES
+    )
+    return templates.TemplateResponse(
+        request,
+        "dashboard/partials/resource_form.html"
+        if is_htmx_request(request)
+        else "dashboard/resource_edit.html",
+        {"user": user, "resource": resource, "inline": is_htmx_request(request)},
+    )
+
+
+@router.post("/update", response_class=RedirectResponse)
+def update_resource(
+    request: Request,
+    resource_id: Annotated[int, Form()],
+    title: ResourceTitle,
+    description: Annotated[Optional[str], Form()] = None,
+    user: User = Depends(get_user_with_relations),
+    session: Session = Depends(get_session),
+) -> Response:
+    resource = _get_resource(
+        session, user, resource_id, AppPermissions.WRITE_ORGANIZATION_RESOURCES
+    )
+    resource.title = title
+    resource.description = description or None
+    resource.updated_at = utc_now()
+    session.add(resource)
+    session.commit()
+    session.refresh(resource)
+
+    if is_htmx_request(request):
+        response = FragmentResponse(
+            request,
+            templates,
+            "dashboard/partials/resource_item.html",
+            {
+                **_item_context(user, resource.organization_id),
+                "resource": ResourceListItem.from_resource(resource),
+            },
+        )
+        return response.add_toast("Resource updated successfully.")
+    return _dashboard_redirect(request, "Resource updated successfully.")
+
+
+@router.post("/delete", response_class=RedirectResponse)
+def delete_resource(
+    request: Request,
+    resource_id: Annotated[int, Form()],
+    user: User = Depends(get_user_with_relations),
+    session: Session = Depends(get_session),
+) -> Response:
+    resource = _get_resource(
+        session, user, resource_id, AppPermissions.DELETE_ORGANIZATION_RESOURCES
+    )
+    organization_id = resource.organization_id
+    session.delete(resource)
+    session.commit()
+
+    if is_htmx_request(request):
+        response = FragmentResponse(
+            request,
+            templates,
+            "dashboard/partials/resource_oob.html",
+            {
+                "resource_event": "deleted",
+                "resource_id": resource_id,
+                "has_resources": has_resources(session, organization_id),
+            },
+        )
+        oob_only(response)
+        return response.add_toast("Resource deleted successfully.")
+    return _dashboard_redirect(request, "Resource deleted successfully.")
@@ -5,10 +5,10 @@ from typing import Optional, Tuple
 from urllib.parse import urlparse
 from fastapi import APIRouter, Depends, BackgroundTasks, Form, Request, Query
 from fastapi.responses import RedirectResponse, Response
-from fastapi.templating import Jinja2Templates
+from utils.core.templating import create_templates
 from starlette.datastructures import URLPath
 from pydantic import EmailStr
-from sqlmodel import Session, col, select
+from sqlmodel import Session, col, delete, select
 from utils.core.models import (
     User,
     DataIntegrityError,
@@ -16,8 +16,8 @@ from utils.core.models import (
     AccountEmail,
     Invitation,
     Organization,
-    Role,
-    UserRoleLink,
+    email_matches,
+    same_email,
 )
 from utils.core.dependencies import get_session
 from utils.core.models import RefreshToken
@@ -79,6 +79,12 @@ from utils.core.rate_limit import (
     login_email_limiter,
 )
 from utils.core.htmx import is_htmx_request, toast_response, set_flash_cookie
+from utils.core.organizations import (
+    delete_organizations_task,
+    is_large_organization_deletion,
+    mark_organizations_deleting,
+    sole_member_organization_ids,
+)
 from utils.core.communication_preferences import (
     parse_communication_preferences,
     apply_communication_preferences,
@@ -87,43 +93,12 @@ from utils.core.communication_preferences import (
 logger = getLogger("uvicorn.error")
 
 router = APIRouter(prefix="/account", tags=["account"])
-templates = Jinja2Templates(directory="templates")
+templates = create_templates()
 
 
 # --- Route-specific dependencies ---
 
 
-def _delete_organizations_where_user_is_only_member(
-    session: Session, user: User
-) -> None:
-    """Delete organizations that would have no remaining users after user deletion."""
-    if user.id is None:
-        return
-
-    organization_ids = session.exec(
-        select(Role.organization_id)
-        .join(UserRoleLink, col(UserRoleLink.role_id) == col(Role.id))
-        .where(UserRoleLink.user_id == user.id)
-        .distinct()
-    ).all()
-
-    for organization_id in organization_ids:
-        user_ids = {
-            user_id
-            for user_id in session.exec(
-                select(UserRoleLink.user_id)
-                .join(Role, col(Role.id) == col(UserRoleLink.role_id))
-                .where(Role.organization_id == organization_id)
-                .distinct()
-            ).all()
-            if user_id is not None
-        }
-        if user_ids == {user.id}:
-            organization = session.get(Organization, organization_id)
-            if organization is not None:
-                session.delete(organization)
-
-
 def validate_password_strength_and_match(
     password: str = Form(..., title="Password", description="Account password"),
     confirm_password: str = Form(
@@ -187,6 +162,24 @@ def logout(
     return response
 
 
+@router.post("/logout_everywhere", response_class=RedirectResponse)
+def logout_everywhere(
+    account: Account = Depends(get_authenticated_account),
+    session: Session = Depends(get_session),
+):
+    """
+    Log the account out of every session by revoking all of its refresh tokens
+    and bumping its token version, which voids outstanding access tokens too.
+    """
+    assert account.id is not None
+    revoke_all_refresh_tokens(account.id, session)
+    session.commit()
+
+    response = RedirectResponse(url="/", status_code=303)
+    clear_auth_cookies(response)
+    return response
+
+
 @router.get("/login")
 async def read_login(
     request: Request,
@@ -292,21 +285,35 @@ async def read_reset_password(
 
 @router.post("/delete", response_class=RedirectResponse)
 async def delete_account(
+    background_tasks: BackgroundTasks,
     account: Account = Depends(get_verified_account),
     session: Session = Depends(get_session),
 ):
     """
-    Delete a user account after verifying credentials.
+    Delete a user account after verifying credentials, along with any
+    organizations it leaves without members. Those are deleted in the same
+    transaction unless they hold many rows, in which case a background task
+    removes them in batches after the response.
     """
     user = account.user
     if user is None:
         session.refresh(account, attribute_names=["user"])
         user = account.user
 
-    if user is not None:
-        _delete_organizations_where_user_is_only_member(session, user)
+    organization_ids: list[int] = []
+    if user is not None and user.id is not None:
+        organization_ids = sole_member_organization_ids(session, user.id)
 
+    # The account's user, tokens, emails and memberships go by ON DELETE CASCADE
     session.delete(account)
+    session.flush()
+    if organization_ids and is_large_organization_deletion(session, organization_ids):
+        mark_organizations_deleting(session, organization_ids)
+        background_tasks.add_task(delete_organizations_task, organization_ids)
+    elif organization_ids:
+        session.exec(
+            delete(Organization).where(col(Organization.id).in_(organization_ids))
+        )
     session.commit()
 
     # Log out the user
@@ -347,7 +354,7 @@ async def register(
         pending_invitation = require_active_invitation_by_token(
             session, invitation_token
         )
-        if email != pending_invitation.invitee_email:
+        if not same_email(email, pending_invitation.invitee_email):
             logger.warning(
                 f"Invitation email mismatch for token {invitation_token} during registration. "
                 f"Account: {email}, Invitation: {pending_invitation.invitee_email}"
@@ -356,7 +363,7 @@ async def register(
 
     # Check if the email is already registered
     existing_account: Optional[Account] = session.exec(
-        select(Account).where(Account.email == email)
+        select(Account).where(email_matches(Account.email, email))
     ).one_or_none()
 
     if existing_account:
@@ -450,7 +457,9 @@ async def register(
     # session.refresh(new_user) # Let's assume process_invitation only modifies the invitation object for now
 
     # Create access token using the committed account's email
-    access_token = create_access_token(data={"sub": account.email, "fresh": True})
+    access_token = create_access_token(
+        data={"sub": account.email, "fresh": True}, token_version=account.token_version
+    )
     refresh_token = create_tracked_refresh_token(
         account.id, account.email, session, persistent=False
     )
@@ -512,7 +521,10 @@ async def login(
                 AccountEmail.verified == True,  # noqa: E712
             )
         ).all()
-        if invitation.invitee_email not in account_emails:
+        if not any(
+            same_email(invitation.invitee_email, account_email)
+            for account_email in account_emails
+        ):
             logger.warning(
                 f"Invitation email mismatch for token {invitation_token}. "
                 f"Account: {account.email}, Invitation: {invitation.invitee_email}"
@@ -564,7 +576,9 @@ async def login(
     # Create access token
     assert account.id is not None
     persistent = remember == "on"
-    access_token = create_access_token(data={"sub": account.email, "fresh": True})
+    access_token = create_access_token(
+        data={"sub": account.email, "fresh": True}, token_version=account.token_version
+    )
     refresh_token = create_tracked_refresh_token(
         account.id, account.email, session, persistent=persistent
     )
@@ -618,7 +632,7 @@ async def refresh_token(
 
     user_email = decoded_token.get("sub")
     account = session.exec(
-        select(Account).where(Account.email == user_email)
+        select(Account).where(email_matches(Account.email, user_email))
     ).one_or_none()
     if not account:
         return RedirectResponse(url=router.url_path_for("read_login"), status_code=303)
@@ -646,7 +660,9 @@ async def refresh_token(
     # Revoke current token and issue new ones
     db_token.revoked = True
     persistent = bool(decoded_token.get("persistent", False))
-    new_access_token = create_access_token(data={"sub": account.email, "fresh": False})
+    new_access_token = create_access_token(
+        data={"sub": account.email, "fresh": False}, token_version=account.token_version
+    )
     new_refresh_token = create_tracked_refresh_token(
         account.id, account.email, session, persistent=persistent
     )
@@ -677,7 +693,9 @@ async def forgot_password(
     Send a password reset email to the user.
     """
     # TODO: Make this a dependency?
-    account = session.exec(select(Account).where(Account.email == email)).one_or_none()
+    account = session.exec(
+        select(Account).where(email_matches(Account.email, email))
+    ).one_or_none()
 
     if account:
         background_tasks.add_task(send_reset_email_task, email)
@@ -738,7 +756,8 @@ async def reset_password(
 
     # Auto-login: issue new auth cookies so the user doesn't have to re-enter credentials
     access_token = create_access_token(
-        data={"sub": authorized_account.email, "fresh": True}
+        data={"sub": authorized_account.email, "fresh": True},
+        token_version=authorized_account.token_version,
     )
     refresh_token = create_tracked_refresh_token(
         authorized_account.id, authorized_account.email, session, persistent=False
@@ -866,7 +885,7 @@ async def add_email(
     """
     # Check email not already registered on any account
     existing = session.exec(
-        select(AccountEmail).where(AccountEmail.email == new_email)
+        select(AccountEmail).where(email_matches(AccountEmail.email, new_email))
     ).first()
     if existing:
         raise EmailAlreadyRegisteredError()
@@ -927,7 +946,9 @@ async def verify_email(
 
     # Race condition guard: check email not already taken
     existing = session.exec(
-        select(AccountEmail).where(AccountEmail.email == verification_token.new_email)
+        select(AccountEmail).where(
+            email_matches(AccountEmail.email, verification_token.new_email)
+        )
     ).first()
     if existing:
         raise EmailAlreadyRegisteredError()
@@ -1016,7 +1037,9 @@ async def promote_email(
     session.commit()
 
     # Issue new tokens with the new primary email
-    access_token = create_access_token(data={"sub": account.email, "fresh": True})
+    access_token = create_access_token(
+        data={"sub": account.email, "fresh": True}, token_version=account.token_version
+    )
     refresh_token = create_tracked_refresh_token(
         account.id, account.email, session, persistent=False
     )
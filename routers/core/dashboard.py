@@ -1,14 +1,47 @@
 from typing import Optional, List
+from urllib.parse import urlencode
 from fastapi import APIRouter, Depends, Request, Response
-from fastapi.templating import Jinja2Templates
-from sqlmodel import Session, select, col
+from fastapi.responses import RedirectResponse
+from utils.core.templating import create_templates
+from sqlmodel import Session
+from exceptions.http_exceptions import InsufficientPermissionsError
 from utils.core.dependencies import get_user_with_relations, get_session
+from utils.core.htmx import is_htmx_request
 from utils.core.models import User, Organization
 from utils.app.enums import AppPermissions
-from utils.app.models import OrganizationResource
+from utils.app.resources import (
+    ResourceListItem,
+    ResourcePage,
+    load_resource_page,
+    search_resources,
+)
+from utils.core.search import prefix_tsquery, run_with_latency_budget
 
 router = APIRouter(prefix="/dashboard", tags=["dashboard"])
-templates = Jinja2Templates(directory="templates")
+templates = create_templates()
+
+
+# --- Helpers ---
+
+
+def _selected_organization(
+    request: Request, organizations: List[Organization]
+) -> Optional[Organization]:
+    """Read the selected org from its cookie, falling back to the first org."""
+    if not organizations:
+        return None
+    selected_org_id_str = request.cookies.get("selected_organization_id")
+    if selected_org_id_str:
+        try:
+            selected_org_id = int(selected_org_id_str)
+            selected_org = next(
+                (o for o in organizations if o.id == selected_org_id), None
+            )
+            if selected_org:
+                return selected_org
+        except ValueError:
+            pass
+    return organizations[0]
 
 
 # --- Authenticated Routes ---
@@ -17,49 +50,39 @@ templates = Jinja2Templates(directory="templates")
 @router.get("/")
 async def read_dashboard(
     request: Request,
+    after: Optional[str] = None,
+    q: str = "",
     user: User = Depends(get_user_with_relations),
     session: Session = Depends(get_session),
 ):
     organizations = user.organizations
-    selected_org: Optional[Organization] = None
-    resources: List[OrganizationResource] = []
+    selected_org = _selected_organization(request, organizations)
+    resource_page: Optional[ResourcePage] = None
+    search_results: Optional[List[ResourceListItem]] = None
+    tsquery = prefix_tsquery(q)
     can_read = False
     can_write = False
     can_delete = False
 
-    if organizations:
-        # Read selected org from cookie, fall back to first org
-        selected_org_id_str = request.cookies.get("selected_organization_id")
-        if selected_org_id_str:
-            try:
-                selected_org_id = int(selected_org_id_str)
-                selected_org = next(
-                    (o for o in organizations if o.id == selected_org_id), None
-                )
-            except ValueError:
-                pass
-
-        if not selected_org:
-            selected_org = organizations[0]
-
-        # Load organization resources for the selected org
-        if selected_org and selected_org.id is not None:
-            resources = list(
-                session.exec(
-                    select(OrganizationResource)
-                    .where(OrganizationResource.organization_id == selected_org.id)
-                    .order_by(col(OrganizationResource.created_at).desc())
-                ).all()
-            )
-            can_read = user.has_permission(
-                AppPermissions.READ_ORGANIZATION_RESOURCES, selected_org
-            )
-            can_write = user.has_permission(
-                AppPermissions.WRITE_ORGANIZATION_RESOURCES, selected_org
-            )
-            can_delete = user.has_permission(
-                AppPermissions.DELETE_ORGANIZATION_RESOURCES, selected_org
+    if selected_org and selected_org.id is not None:
+        can_read = user.has_permission(
+            AppPermissions.READ_ORGANIZATION_RESOURCES, selected_org
+        )
+        can_write = user.has_permission(
+            AppPermissions.WRITE_ORGANIZATION_RESOURCES, selected_org
+        )
+        can_delete = user.has_permission(
+            AppPermissions.DELETE_ORGANIZATION_RESOURCES, selected_org
+        )
+        # Load the first page (or the page after the cursor, or search
+        # results, for no-JS clients)
+        if can_read and tsquery:
+            org_id = selected_org.id
+            search_results = run_with_latency_budget(
+                session, lambda: search_resources(session, org_id, tsquery)
             )
+        elif can_read:
+            resource_page = load_resource_page(session, selected_org.id, after)
 
     return templates.TemplateResponse(
         request,
@@ -68,7 +91,9 @@ async def read_dashboard(
             "user": user,
             "organizations": organizations,
             "selected_org": selected_org,
-            "resources": resources,
+            "resource_page": resource_page,
+            "search_query": q if tsquery else "",
+            "search_results": search_results,
             "can_read": can_read,
             "can_write": can_write,
             "can_delete": can_delete,
@@ -76,6 +101,49 @@ async def read_dashboard(
     )
 
 
+@router.get("/resources")
+async def read_dashboard_resources(
+    request: Request,
+    after: Optional[str] = None,
+    user: User = Depends(get_user_with_relations),
+    session: Session = Depends(get_session),
+) -> Response:
+    """
+    The next page of resource rows for the dashboard list, fetched by its
+    load-more row when it scrolls into view.
+    """
+    if not is_htmx_request(request):
+        url = str(request.url_for("read_dashboard"))
+        return RedirectResponse(
+            url=f"{url}?{urlencode({'after': after})}" if after else url,
+            status_code=303,
+        )
+
+    selected_org = _selected_organization(request, user.organizations)
+    if (
+        not selected_org
+        or selected_org.id is None
+        or not user.has_permission(
+            AppPermissions.READ_ORGANIZATION_RESOURCES, selected_org
+        )
+    ):
+        raise InsufficientPermissionsError()
+
+    return templates.TemplateResponse(
+        request,
+        "dashboard/partials/resource_page.html",
+        {
+            "resource_page": load_resource_page(session, selected_org.id, after),
+            "can_write": user.has_permission(
+                AppPermissions.WRITE_ORGANIZATION_RESOURCES, selected_org
+            ),
+            "can_delete": user.has_permission(
+                AppPermissions.DELETE_ORGANIZATION_RESOURCES, selected_org
+            ),
+        },
+    )
+
+
 @router.post("/select-organization/{org_id}")
 async def select_organization(
     request: Request,
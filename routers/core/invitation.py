@@ -3,7 +3,7 @@ from uuid import uuid4
 from typing import Optional
 from fastapi import APIRouter, Depends, Form, Query, Request, status
 from fastapi.responses import RedirectResponse, Response
-from fastapi.templating import Jinja2Templates
+from utils.core.templating import create_templates
 from fastapi.exceptions import HTTPException
 from pydantic import EmailStr
 from sqlmodel import Session, select
@@ -14,9 +14,16 @@ from utils.core.dependencies import (
     get_optional_user,
     get_session,
 )
-from utils.core.models import User, Role, Account, Invitation, Organization, utc_now
+from utils.core.models import (
+    User,
+    Role,
+    Account,
+    Invitation,
+    Organization,
+    email_matches,
+    utc_now,
+)
 from utils.core.enums import ValidPermissions
-from utils.app.enums import AppPermissions
 from utils.core.invitations import (
     send_invitation_email,
     process_invitation,
@@ -32,14 +39,14 @@ from exceptions.http_exceptions import (
     RoleNotFoundError,
 )
 from exceptions.exceptions import EmailSendFailedError
-from utils.core.htmx import is_htmx_request, append_toast
-from utils.core.organizations import load_org_for_members_partial
+from utils.core.htmx import FragmentResponse, is_htmx_request, oob_only
+from utils.core.organizations import count_pending_invitations, user_permissions_for_org
 from routers.core.account import router as account_router
 from routers.core.organization import router as org_router
 
 logger = getLogger("uvicorn.error")
 
-templates = Jinja2Templates(directory="templates")
+templates = create_templates()
 
 router = APIRouter(
     prefix="/invitations",
@@ -62,7 +69,9 @@ def _redirect_for_inactive_invitation(
     """Send user to register/login so invitation_token_warning banners can display."""
     if invitation:
         existing_account = session.exec(
-            select(Account).where(Account.email == invitation.invitee_email)
+            select(Account).where(
+                email_matches(Account.email, invitation.invitee_email)
+            )
         ).first()
         if existing_account:
             login_url = account_router.url_path_for("read_login")
@@ -80,30 +89,30 @@ def _redirect_for_inactive_invitation(
     return RedirectResponse(url=redirect_url, status_code=status.HTTP_303_SEE_OTHER)
 
 
-def _members_table_response(
+def _invitation_rows_response(
     request: Request,
-    session: Session,
-    organization_id: int,
+    organization: Organization,
     current_user: User,
-    toast_message: str | None = None,
+    template_name: str,
+    context: dict,
+    toast_message: str,
 ) -> Response:
-    organization, user_permissions, pending_invitations = load_org_for_members_partial(
-        session, organization_id, current_user
-    )
-    response = templates.TemplateResponse(
+    """Swap only the invitation rows a mutation touched, not the whole members card."""
+    assert organization.id is not None
+    response = FragmentResponse(
         request,
-        "organization/partials/members_table.html",
+        templates,
+        template_name,
         {
             "organization": organization,
-            "pending_invitations": pending_invitations,
             "user": current_user,
-            "user_permissions": user_permissions,
+            "user_permissions": user_permissions_for_org(current_user, organization.id),
             "ValidPermissions": ValidPermissions,
-            "all_permissions": list(ValidPermissions) + list(AppPermissions),
+            "show_invitation_cancel": True,
+            **context,
         },
-    )
-    if toast_message:
-        response = append_toast(response, request, templates, toast_message)
+    ).add_toast(toast_message)
+    oob_only(response)
     return response
 
 
@@ -140,7 +149,7 @@ async def create_invitation(
         raise InvalidRoleForOrganizationError()
 
     existing_account = session.exec(
-        select(Account).where(Account.email == invitee_email)
+        select(Account).where(email_matches(Account.email, invitee_email))
     ).first()
     if existing_account:
         existing_user = session.exec(
@@ -152,7 +161,12 @@ async def create_invitation(
             ):
                 raise UserIsAlreadyMemberError()
 
-    Invitation.invalidate_pending_for_email(session, organization_id, invitee_email)
+    replaced_invitation_ids = [
+        pending.id
+        for pending in Invitation.invalidate_pending_for_email(
+            session, organization_id, invitee_email
+        )
+    ]
     session.flush()
 
     token = str(uuid4())
@@ -175,6 +189,8 @@ async def create_invitation(
         send_invitation_email(invitation, session)
         session.commit()
         session.refresh(invitation)
+        # The invitation row shows its role's name
+        session.refresh(invitation, attribute_names=["role"])
 
     except EmailSendFailedError as e:
         logger.error(
@@ -192,11 +208,16 @@ async def create_invitation(
         raise HTTPException(status_code=500, detail="An unexpected error occurred.")
 
     if is_htmx_request(request):
-        response = _members_table_response(
+        response = _invitation_rows_response(
             request,
-            session,
-            organization_id,
+            organization,
             current_user,
+            "organization/partials/invitation_oob.html",
+            {
+                "invitation_event": "created",
+                "inv": invitation,
+                "replaced_invitation_ids": replaced_invitation_ids,
+            },
             "Invitation sent successfully.",
         )
         response.headers["HX-Trigger"] = "modalDismiss"
@@ -248,6 +269,8 @@ async def resend_invitation(
         send_invitation_email(invitation, session)
         session.commit()
         session.refresh(invitation)
+        # The invitation row shows its role's name
+        session.refresh(invitation, attribute_names=["role"])
 
     except EmailSendFailedError as e:
         logger.error(
@@ -266,11 +289,12 @@ async def resend_invitation(
         raise HTTPException(status_code=500, detail="An unexpected error occurred.")
 
     if is_htmx_request(request):
-        return _members_table_response(
+        return _invitation_rows_response(
             request,
-            session,
-            organization_id,
+            organization,
             current_user,
+            "organization/partials/invitation_item.html",
+            {"inv": invitation, "oob": True},
             "Invitation resent.",
         )
     return RedirectResponse(url=f"/organizations/{organization_id}", status_code=303)
@@ -307,11 +331,18 @@ async def delete_invitation(
     session.commit()
 
     if is_htmx_request(request):
-        return _members_table_response(
+        return _invitation_rows_response(
             request,
-            session,
-            organization_id,
+            organization,
             current_user,
+            "organization/partials/invitation_oob.html",
+            {
+                "invitation_event": "deleted",
+                "invitation_id": invitation_id,
+                "pending_invitation_count": count_pending_invitations(
+                    session, organization_id
+                ),
+            },
             "Invitation cancelled successfully.",
         )
     return RedirectResponse(url=f"/organizations/{organization_id}", status_code=303)
@@ -331,7 +362,9 @@ async def accept_invitation(
     if not invitation or not invitation.is_active():
         return _redirect_for_inactive_invitation(invitation, token, session)
 
-    account_statement = select(Account).where(Account.email == invitation.invitee_email)
+    account_statement = select(Account).where(
+        email_matches(Account.email, invitation.invitee_email)
+    )
     existing_account = session.exec(account_statement).first()
 
     if existing_account:
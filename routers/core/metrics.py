@@ -0,0 +1,24 @@
+import secrets
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response
+from utils.core.metrics import CONTENT_TYPE, collect, metrics_token, render
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", name="read_metrics", include_in_schema=False)
+def read_metrics(request: Request) -> Response:
+    """
+    Prometheus scrape endpoint. Disabled (404) unless METRICS_TOKEN is set, in
+    which case the scraper must send it as a bearer token.
+
+    Raises:
+        HTTPException: 404 when disabled, 401 for a missing or wrong token.
+    """
+    token = metrics_token()
+    if token is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+    supplied = request.headers.get("Authorization", "")
+    if not secrets.compare_digest(supplied.encode(), f"Bearer {token}".encode()):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return Response(render(collect()), media_type=CONTENT_TYPE)
@@ -1,9 +1,10 @@
 from logging import getLogger
-from typing import Annotated
-from fastapi import APIRouter, Depends, Form, Request
+from typing import Annotated, Optional
+from urllib.parse import urlencode
+from fastapi import APIRouter, BackgroundTasks, Depends, Form, Request
 from fastapi.responses import RedirectResponse, Response
-from fastapi.templating import Jinja2Templates
-from sqlmodel import Session, select
+from utils.core.templating import create_templates
+from sqlmodel import Session, col, select
 from sqlalchemy.orm import selectinload
 from utils.core.db import create_default_roles
 from utils.core.dependencies import (
@@ -11,7 +12,21 @@ from utils.core.dependencies import (
     get_user_with_relations,
     get_session,
 )
-from utils.core.models import Organization, User, Role, Account, utc_now, Invitation
+from utils.core.models import (
+    Organization,
+    User,
+    Role,
+    Account,
+    email_matches,
+    utc_now,
+)
+from utils.core.organizations import (
+    delete_organizations_task,
+    is_large_organization_deletion,
+    load_member_page,
+    load_org_for_members_partial,
+    mark_organizations_deleting,
+)
 from utils.core.enums import ValidPermissions
 from utils.app.enums import AppPermissions
 from exceptions.http_exceptions import (
@@ -29,16 +44,24 @@ from utils.core.htmx import is_htmx_request, set_flash_cookie
 logger = getLogger("uvicorn.error")
 
 router = APIRouter(prefix="/organizations", tags=["organizations"])
-templates = Jinja2Templates(directory="templates")
+templates = create_templates()
 
 
 # --- Routes ---
 
 
+def _member_filters(q: str, role_id: str) -> tuple[str, int | None]:
+    """Normalise the members search form; an empty role select means all roles."""
+    return q.strip(), int(role_id) if role_id.isdigit() else None
+
+
 @router.get("/{org_id}")
 async def read_organization(
     org_id: int,
     request: Request,
+    q: str = "",
+    role_id: str = "",
+    after: Optional[str] = None,
     user: User = Depends(get_user_with_relations),
     session: Session = Depends(get_session),
 ):
@@ -47,30 +70,15 @@ async def read_organization(
     if not org:
         raise OrganizationNotFoundError()
 
-    # Calculate the user's permissions for this organization
-    user_permissions = set()
-    for role in user.roles:
-        if role.organization_id == org_id:
-            for permission in role.permissions:
-                user_permissions.add(permission.name)
-
-    # Load the organization with fully loaded roles and users
-    organization = session.exec(
-        select(Organization)
-        .where(Organization.id == org_id)
-        .options(
-            selectinload(Organization.roles)
-            .selectinload(Role.users)
-            .selectinload(User.account),
-            selectinload(Organization.roles)
-            .selectinload(Role.users)
-            .selectinload(User.roles),
-            selectinload(Organization.roles).selectinload(Role.permissions),
-        )
-    ).first()
-
-    # Fetch pending invitations for the organization
-    pending_invitations = Invitation.get_pending_for_org(session, org_id)
+    # Load the organization's roles, invitations and member counts in one
+    # query; members are paged separately so large orgs don't load every user
+    organization, user_permissions, pending_invitations = load_org_for_members_partial(
+        session, org_id, user
+    )
+    if organization is None:
+        raise OrganizationNotFoundError()
+    search, filter_role_id = _member_filters(q, role_id)
+    member_page = load_member_page(session, org_id, search, filter_role_id, after)
 
     # Pass all required context to the template
     return templates.TemplateResponse(
@@ -83,6 +91,53 @@ async def read_organization(
             "ValidPermissions": ValidPermissions,
             "all_permissions": list(ValidPermissions) + list(AppPermissions),
             "pending_invitations": pending_invitations,
+            "member_page": member_page,
+            "member_count": organization.member_count,
+            "member_counts": organization.member_counts,
+        },
+    )
+
+
+@router.get("/{org_id}/members")
+async def read_organization_members(
+    org_id: int,
+    request: Request,
+    q: str = "",
+    role_id: str = "",
+    after: Optional[str] = None,
+    user: User = Depends(get_user_with_relations),
+    session: Session = Depends(get_session),
+) -> Response:
+    """
+    One page of member rows for the members table: the search form swaps the
+    first page into #members-table-body and the load-more row fetches the next.
+    """
+    if not any(org.id == org_id for org in user.organizations):
+        raise OrganizationNotFoundError()
+
+    if not is_htmx_request(request):
+        query = urlencode(
+            {key: value for key, value in request.query_params.items() if value}
+        )
+        url = str(router.url_path_for("read_organization", org_id=org_id))
+        return RedirectResponse(url=f"{url}?{query}" if query else url, status_code=303)
+
+    organization, user_permissions, _ = load_org_for_members_partial(
+        session, org_id, user
+    )
+    search, filter_role_id = _member_filters(q, role_id)
+    return templates.TemplateResponse(
+        request,
+        "organization/partials/member_page.html",
+        {
+            "organization": organization,
+            "user": user,
+            "user_permissions": user_permissions,
+            "ValidPermissions": ValidPermissions,
+            "member_page": load_member_page(
+                session, org_id, search, filter_role_id, after
+            ),
+            "standalone": True,
         },
     )
 
@@ -105,7 +160,11 @@ def create_organization(
     logger.debug(f"Received organization name: '{name}' (length: {len(name)})")
 
     # Check if organization already exists
-    db_org = session.exec(select(Organization).where(Organization.name == name)).first()
+    db_org = session.exec(
+        select(Organization).where(
+            Organization.name == name, col(Organization.deleting_at).is_(None)
+        )
+    ).first()
     if db_org:
         raise OrganizationNameTakenError()
 
@@ -122,23 +181,21 @@ def create_organization(
 
     # Use the utility function to create default roles and assign permissions
     # This also handles committing the roles and permissions
+    org_id = db_org.id
     try:
-        create_default_roles(session, db_org.id, check_first=False)
+        roles = create_default_roles(session, org_id, check_first=False)
     except Exception as e:
-        logger.exception(f"Failed to create default roles for org ID {db_org.id}")
+        logger.exception(f"Failed to create default roles for org ID {org_id}")
         # Rollback might be needed if create_default_roles doesn't handle it
         session.rollback()
         raise OrganizationSetupError("Failed during role creation") from e
 
-    # Refresh the org object to load the roles relationship
-    session.refresh(db_org)
-
     # Get owner role for user assignment (roles should now exist)
-    owner_role = next((role for role in db_org.roles if role.name == "Owner"), None)
+    owner_role = next((role for role in roles if role.name == "Owner"), None)
 
     if owner_role is None:
         logger.error(
-            f"'Owner' role not found for newly created org ID {db_org.id} after create_default_roles call."
+            f"'Owner' role not found for newly created org ID {org_id} after create_default_roles call."
         )
         # Rollback might be needed
         session.rollback()
@@ -151,19 +208,17 @@ def create_organization(
     try:
         session.commit()
         logger.info(
-            f"Successfully created organization '{db_org.name}' (ID: {db_org.id}) and assigned owner (User ID: {user.id})."
+            f"Successfully created organization '{name}' (ID: {org_id}) and assigned owner (User ID: {user.id})."
         )
     except Exception as e:
         logger.exception(
-            f"Failed to commit user-owner role link for org ID {db_org.id} and user ID {user.id}"
+            f"Failed to commit user-owner role link for org ID {org_id} and user ID {user.id}"
         )
         session.rollback()
         raise OrganizationSetupError("Failed to assign owner role") from e
 
-    session.refresh(db_org)  # Refresh again to be safe before redirect
-
     return RedirectResponse(
-        url=router.url_path_for("read_organization", org_id=db_org.id), status_code=303
+        url=router.url_path_for("read_organization", org_id=org_id), status_code=303
     )
 
 
@@ -200,6 +255,7 @@ def update_organization(
         select(Organization)
         .where(Organization.name == name)
         .where(Organization.id != org_id)
+        .where(col(Organization.deleting_at).is_(None))
     ).first()
     if existing_org:
         raise OrganizationNameTakenError()
@@ -228,9 +284,15 @@ def update_organization(
 def delete_organization(
     request: Request,
     org_id: int,
+    background_tasks: BackgroundTasks,
     user: User = Depends(get_user_with_relations),
     session: Session = Depends(get_session),
 ) -> Response:
+    """
+    Delete an organization. A small one goes at once in a single cascading
+    DELETE; a large one is marked deleting, which hides it immediately, and
+    emptied in batches by a background task after the response.
+    """
     # Find the organization the user belongs to
     organization: Organization | None = next(
         (org for org in user.organizations if org.id == org_id), None
@@ -249,7 +311,11 @@ def delete_organization(
     logger.info(
         f"User {user.id} deleting organization {org_id} ('{organization.name}')."
     )
-    session.delete(organization)
+    if is_large_organization_deletion(session, [org_id]):
+        mark_organizations_deleting(session, [org_id])
+        background_tasks.add_task(delete_organizations_task, [org_id])
+    else:
+        session.delete(organization)
     session.commit()
 
     if is_htmx_request(request):
@@ -291,7 +357,7 @@ def invite_member(
     # Find the account and associated user by email
     account = session.exec(
         select(Account)
-        .where(Account.email == email)
+        .where(email_matches(Account.email, email))
         .options(selectinload(Account.user))
     ).first()
 
@@ -1,22 +1,24 @@
 # TODO: User with permission to create/edit roles can only assign permissions
 # they themselves have.
-from typing import Annotated, List, Sequence, Optional
+from typing import Annotated, List, Optional
 from logging import getLogger
 from fastapi import APIRouter, Depends, Form, Request
 from fastapi.responses import RedirectResponse
-from fastapi.templating import Jinja2Templates
-from sqlmodel import Session, select, col
+from utils.core.templating import create_templates
+from sqlmodel import Session, delete, select, col
 from sqlalchemy.orm import selectinload
 from sqlalchemy.exc import IntegrityError
+from utils.core.db import get_permission_ids, insert_role_permission_links
 from utils.core.dependencies import get_authenticated_user, get_session
 from utils.core.models import (
     Role,
-    Permission,
+    RolePermissionLink,
     utc_now,
     User,
     DataIntegrityError,
+    Organization,
 )
-from utils.core.organizations import load_org_for_roles_partial
+from utils.core.organizations import load_org_for_roles_partial, load_roles_for_rows
 from utils.core.enums import ValidPermissions
 from utils.app.enums import AppPermissions
 from exceptions.http_exceptions import (
@@ -28,12 +30,94 @@ from exceptions.http_exceptions import (
     CannotModifyDefaultRoleError,
 )
 from routers.core.organization import router as organization_router
-from utils.core.htmx import is_htmx_request, append_toast
+from utils.core.htmx import FragmentResponse, is_htmx_request, oob_only
 
 logger = getLogger("uvicorn.error")
 
 router = APIRouter(prefix="/roles", tags=["roles"])
-templates = Jinja2Templates(directory="templates")
+templates = create_templates()
+
+
+# --- Helpers ---
+
+
+def _roles_table_response(
+    request: Request, session: Session, organization_id: int, user: User
+) -> FragmentResponse:
+    organization, user_permissions = load_org_for_roles_partial(
+        session, organization_id, user
+    )
+    return FragmentResponse(
+        request,
+        templates,
+        "organization/partials/roles_table.html",
+        {
+            "organization": organization,
+            "user": user,
+            "user_permissions": user_permissions,
+            "ValidPermissions": ValidPermissions,
+            "all_permissions": list(ValidPermissions) + list(AppPermissions),
+        },
+    )
+
+
+def _role_rows_response(
+    request: Request,
+    session: Session,
+    organization_id: int,
+    user: User,
+    role_id: int | None,
+    role_event: str | None = None,
+) -> FragmentResponse:
+    """
+    Swap only the role's row and edit modal, plus the members-card elements
+    that show the role (see role_refs_oob.html), instead of re-rendering the
+    roles table.
+    """
+    roles, member_counts, user_permissions = load_roles_for_rows(
+        session, organization_id, {role_id}, user
+    )
+    if not roles:
+        return _roles_table_response(request, session, organization_id, user)
+    context = {
+        "organization": session.get(Organization, organization_id),
+        "role": roles[0],
+        "member_counts": member_counts,
+        "role_event": role_event,
+        "user": user,
+        "user_permissions": user_permissions,
+        "ValidPermissions": ValidPermissions,
+        "all_permissions": list(ValidPermissions) + list(AppPermissions),
+    }
+    if role_event == "created":
+        response = FragmentResponse(
+            request, templates, "organization/partials/role_refs_oob.html", context
+        )
+    else:
+        response = FragmentResponse(
+            request,
+            templates,
+            "organization/partials/role_row.html",
+            {**context, "oob": True},
+        ).add("organization/partials/role_modal.html", {**context, "oob": True})
+        if role_event == "renamed":
+            response.add("organization/partials/role_refs_oob.html", context)
+    oob_only(response)
+    return response
+
+
+def _resolve_permission_ids(session: Session, permissions: List[str]) -> set[int]:
+    """Map user-selected permission names to ids via the cached permission map."""
+    all_valid = {str(p) for p in ValidPermissions} | {str(p) for p in AppPermissions}
+    permission_ids = get_permission_ids(session)
+    resolved = set()
+    for permission in permissions:
+        if permission not in all_valid:
+            raise InvalidPermissionError(permission)
+        if permission not in permission_ids:
+            raise DataIntegrityError(resource=f"Permission: {permission}")
+        resolved.add(permission_ids[permission])
+    return resolved
 
 
 # --- Routes ---
@@ -74,42 +158,28 @@ def create_role(
     if not user.has_permission(ValidPermissions.CREATE_ROLE, organization_id):
         raise InsufficientPermissionsError()
 
-    # Create role
+    permission_ids = _resolve_permission_ids(session, permissions)
+
+    # Create role, then link its permissions with one multi-row INSERT
     db_role = Role(name=name, organization_id=organization_id)
     session.add(db_role)
-
-    # Select Permission records corresponding to the user-selected permissions
-    # and associate them with the newly created role
-    if permissions:
-        db_permissions: Sequence[Permission] = session.exec(
-            select(Permission).where(col(Permission.name).in_(permissions))
-        ).all()
-        db_role.permissions.extend(db_permissions)
-
-    # Commit transaction
     try:
+        session.flush()
+        assert db_role.id is not None
+        insert_role_permission_links(
+            session, [(db_role.id, permission_id) for permission_id in permission_ids]
+        )
         session.commit()
     except IntegrityError:
         session.rollback()
         raise RoleAlreadyExistsError()
 
     if is_htmx_request(request):
-        organization, user_permissions = load_org_for_roles_partial(
-            session, organization_id, user
-        )
-        response = templates.TemplateResponse(
-            request,
-            "organization/partials/roles_table.html",
-            {
-                "organization": organization,
-                "user": user,
-                "user_permissions": user_permissions,
-                "ValidPermissions": ValidPermissions,
-                "all_permissions": list(ValidPermissions) + list(AppPermissions),
-            },
+        response = _role_rows_response(
+            request, session, organization_id, user, db_role.id, "created"
         )
         response.headers["HX-Trigger"] = "modalDismiss"
-        return append_toast(response, request, templates, "Role created successfully.")
+        return response.add_toast("Role created successfully.")
     return RedirectResponse(
         url=organization_router.url_path_for(
             "read_organization", org_id=organization_id
@@ -146,10 +216,8 @@ def update_role(
     if not user.has_permission(ValidPermissions.EDIT_ROLE, organization_id):
         raise InsufficientPermissionsError()
 
-    # Select db_role to update, along with its permissions, by ID
-    db_role: Optional[Role] = session.exec(
-        select(Role).where(Role.id == id).options(selectinload(Role.permissions))
-    ).first()
+    # Select db_role to update by ID
+    db_role: Optional[Role] = session.get(Role, id)
 
     if not db_role:
         raise RoleNotFoundError()
@@ -158,27 +226,27 @@ def update_role(
     if db_role.name in ["Owner", "Administrator", "Member"]:
         raise CannotModifyDefaultRoleError(action="update")
 
-    # If any user-selected permissions are not valid, raise an error
-    all_valid = {str(p) for p in ValidPermissions} | {str(p) for p in AppPermissions}
-    for permission in permissions:
-        if permission not in all_valid:
-            raise InvalidPermissionError(permission)
-
-    # Add any user-selected permissions that are not already associated with the role
-    for permission in permissions:
-        if permission not in [p.name for p in db_role.permissions]:
-            db_permission: Optional[Permission] = session.exec(
-                select(Permission).where(Permission.name == permission)
-            ).first()
-            if db_permission:
-                db_role.permissions.append(db_permission)
-            else:
-                raise DataIntegrityError(resource=f"Permission: {permission}")
-
-    # Remove any permissions that are not user-selected
-    for db_permission in db_role.permissions:
-        if db_permission.name not in permissions:
-            db_role.permissions.remove(db_permission)
+    # Diff the user-selected permissions against the role's current links and
+    # apply the difference with one bulk INSERT and one bulk DELETE
+    selected_ids = _resolve_permission_ids(session, permissions)
+    current_ids = set(
+        session.exec(
+            select(RolePermissionLink.permission_id).where(
+                RolePermissionLink.role_id == id
+            )
+        ).all()
+    )
+    insert_role_permission_links(
+        session, [(id, permission_id) for permission_id in selected_ids - current_ids]
+    )
+    removed_ids = current_ids - selected_ids
+    if removed_ids:
+        session.connection().execute(
+            delete(RolePermissionLink).where(
+                col(RolePermissionLink.role_id) == id,
+                col(RolePermissionLink.permission_id).in_(removed_ids),
+            )
+        )
 
     # Check that no existing organization role has the same name but a different ID
     if session.exec(
@@ -189,6 +257,7 @@ def update_role(
         raise RoleAlreadyExistsError()
 
     # Update role name and updated_at timestamp
+    previous_name = db_role.name
     db_role.name = name
     db_role.updated_at = utc_now()
 
@@ -201,22 +270,21 @@ def update_role(
     session.refresh(db_role)
 
     if is_htmx_request(request):
-        organization, user_permissions = load_org_for_roles_partial(
-            session, organization_id, user
-        )
-        response = templates.TemplateResponse(
-            request,
-            "organization/partials/roles_table.html",
-            {
-                "organization": organization,
-                "user": user,
-                "user_permissions": user_permissions,
-                "ValidPermissions": ValidPermissions,
-                "all_permissions": list(ValidPermissions) + list(AppPermissions),
-            },
-        )
+        if any(role.id == id for role in user.roles):
+            # Your own permissions may have changed, which affects the action
+            # buttons on every row.
+            response = _roles_table_response(request, session, organization_id, user)
+        else:
+            response = _role_rows_response(
+                request,
+                session,
+                organization_id,
+                user,
+                id,
+                "renamed" if name != previous_name else None,
+            )
         response.headers["HX-Trigger"] = "modalDismiss"
-        return append_toast(response, request, templates, "Role updated successfully.")
+        return response.add_toast("Role updated successfully.")
     return RedirectResponse(
         url=organization_router.url_path_for(
             "read_organization", org_id=organization_id
@@ -262,21 +330,14 @@ def delete_role(
     session.commit()
 
     if is_htmx_request(request):
-        organization, user_permissions = load_org_for_roles_partial(
-            session, organization_id, user
-        )
-        response = templates.TemplateResponse(
+        response = FragmentResponse(
             request,
-            "organization/partials/roles_table.html",
-            {
-                "organization": organization,
-                "user": user,
-                "user_permissions": user_permissions,
-                "ValidPermissions": ValidPermissions,
-                "all_permissions": list(ValidPermissions) + list(AppPermissions),
-            },
+            templates,
+            "organization/partials/role_refs_oob.html",
+            {"role_event": "deleted", "role_id": id},
         )
-        return append_toast(response, request, templates, "Role deleted successfully.")
+        oob_only(response)
+        return response.add_toast("Role deleted successfully.")
     return RedirectResponse(
         url=organization_router.url_path_for(
             "read_organization", org_id=organization_id
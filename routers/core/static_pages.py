@@ -1,11 +1,11 @@
 from typing import Optional
 from fastapi import APIRouter, Depends, Request, HTTPException
-from fastapi.templating import Jinja2Templates
+from utils.core.templating import create_templates
 from utils.core.dependencies import get_optional_user
 from utils.core.models import User
 
 router = APIRouter(tags=["static_pages"])
-templates = Jinja2Templates(directory="templates")
+templates = create_templates()
 
 # Define valid static pages to prevent arbitrary template access
 VALID_PAGES = {
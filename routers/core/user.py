@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, Form, UploadFile, File, Request, HTTPExc
 from fastapi.responses import RedirectResponse, Response
 from sqlmodel import Session, select, col
 from typing import Optional, List
-from fastapi.templating import Jinja2Templates
+from utils.core.templating import create_templates
 from sqlalchemy.orm import selectinload
 import os
 from utils.core.models import (
@@ -12,7 +12,13 @@ from utils.core.models import (
     DataIntegrityError,
     Organization,
 )
-from utils.core.organizations import load_org_for_members_partial
+from utils.core.organizations import (
+    count_org_members,
+    load_member_for_row,
+    load_member_page,
+    load_org_for_members_partial,
+    load_roles_for_rows,
+)
 from utils.core.auth import MAX_EMAILS_PER_ACCOUNT
 from utils.core.dependencies import (
     get_authenticated_user,
@@ -37,14 +43,19 @@ from exceptions.http_exceptions import (
     OrganizationNotFoundError,
 )
 from routers.core.organization import router as organization_router
-from utils.core.htmx import is_htmx_request, append_toast, toast_response
+from utils.core.htmx import (
+    FragmentResponse,
+    is_htmx_request,
+    oob_only,
+    toast_response,
+)
 from utils.core.communication_preferences import (
     parse_communication_preferences,
     apply_communication_preferences,
 )
 
 router = APIRouter(prefix="/user", tags=["user"])
-templates = Jinja2Templates(directory="templates")
+templates = create_templates()
 
 
 # --- Routes ---
@@ -161,26 +172,13 @@ async def update_profile(
     session.refresh(user)
 
     if is_htmx_request(request):
-        response = templates.TemplateResponse(
-            request,
-            "users/partials/profile_display.html",
-            {"user": user},
+        response = FragmentResponse(
+            request, templates, "users/partials/profile_display.html", {"user": user}
         )
         if avatar_changed:
             # Avatar also appears in the navbar — append an OOB swap for it.
-            navbar_html = bytes(
-                templates.TemplateResponse(
-                    request,
-                    "base/partials/navbar_avatar_oob.html",
-                    {"user": user},
-                ).body
-            ).decode()
-            original = bytes(response.body).decode()
-            response.body = (original + navbar_html).encode()
-            response.headers["content-length"] = str(len(response.body))
-        return append_toast(
-            response, request, templates, "Profile updated successfully."
-        )
+            response.add("base/partials/navbar_avatar_oob.html", {"user": user})
+        return response.add_toast("Profile updated successfully.")
     return RedirectResponse(url=router.url_path_for("read_profile"), status_code=303)
 
 
@@ -220,6 +218,100 @@ async def get_avatar(user: User = Depends(get_authenticated_user)):
     )
 
 
+def _members_table_response(
+    request: Request, session: Session, organization_id: int, user: User
+) -> FragmentResponse:
+    organization, user_permissions, pending_invitations = load_org_for_members_partial(
+        session, organization_id, user
+    )
+    return FragmentResponse(
+        request,
+        templates,
+        "organization/partials/members_table.html",
+        {
+            "organization": organization,
+            "pending_invitations": pending_invitations,
+            "member_page": load_member_page(session, organization_id),
+            "member_count": organization.member_count if organization else 0,
+            "user": user,
+            "user_permissions": user_permissions,
+            "ValidPermissions": ValidPermissions,
+            "all_permissions": list(ValidPermissions) + list(AppPermissions),
+        },
+    )
+
+
+def _member_rows_response(
+    request: Request,
+    session: Session,
+    organization_id: int,
+    user: User,
+    member_id: int,
+    changed_role_ids: set[int | None],
+) -> FragmentResponse:
+    """
+    Swap only the member's row and edit modal, plus the rows of roles whose
+    member counts changed, instead of re-rendering the members table.
+    """
+    organization, member, user_permissions = load_member_for_row(
+        session, organization_id, member_id, user
+    )
+    roles, member_counts, _ = load_roles_for_rows(
+        session, organization_id, changed_role_ids, user
+    )
+    context = {
+        "organization": organization,
+        "user": user,
+        "user_permissions": user_permissions,
+        "ValidPermissions": ValidPermissions,
+        "oob": True,
+    }
+    if member and any(role.organization_id == organization_id for role in member.roles):
+        response = FragmentResponse(
+            request,
+            templates,
+            "organization/partials/member_row.html",
+            {**context, "member": member},
+        )
+        if ValidPermissions.EDIT_USER_ROLE in user_permissions:
+            response.add(
+                "organization/partials/member_role_modal.html",
+                {**context, "member": member},
+            )
+    else:
+        response = FragmentResponse(
+            request,
+            templates,
+            "organization/partials/member_removed_oob.html",
+            {"member_id": member_id},
+        )
+    for role in roles:
+        response.add(
+            "organization/partials/role_row.html",
+            {**context, "role": role, "member_counts": member_counts},
+        )
+    oob_only(response)
+    return response
+
+
+def _member_mutation_response(
+    request: Request,
+    session: Session,
+    organization_id: int,
+    user: User,
+    member_id: int,
+    changed_role_ids: set[int | None],
+) -> FragmentResponse:
+    # Editing yourself can change your own permissions, which affects every
+    # row's action buttons, and dropping to one member switches the table to
+    # its empty state; both need the full table.
+    if member_id == user.id or count_org_members(session, organization_id) <= 1:
+        return _members_table_response(request, session, organization_id, user)
+    return _member_rows_response(
+        request, session, organization_id, user, member_id, changed_role_ids
+    )
+
+
 @router.post("/role/update", response_class=RedirectResponse)
 def update_user_role(
     request: Request,
@@ -261,6 +353,10 @@ def update_user_role(
     # Get all roles for this organization
     org_roles = {role.id: role for role in organization.roles}
 
+    previous_role_ids = {
+        role.id for role in target_user.roles if role.organization_id == organization_id
+    }
+
     # Remove all current organization roles from the user
     for role in list(target_user.roles):
         if role.organization_id == organization_id:
@@ -273,28 +369,17 @@ def update_user_role(
             if fetched_role is not None:
                 target_user.roles.append(fetched_role)
 
+    changed_role_ids = previous_role_ids ^ {
+        role.id for role in target_user.roles if role.organization_id == organization_id
+    }
     session.commit()
 
     if is_htmx_request(request):
-        organization, user_permissions, pending_invitations = (
-            load_org_for_members_partial(session, organization_id, user)
-        )
-        response = templates.TemplateResponse(
-            request,
-            "organization/partials/members_table.html",
-            {
-                "organization": organization,
-                "pending_invitations": pending_invitations,
-                "user": user,
-                "user_permissions": user_permissions,
-                "ValidPermissions": ValidPermissions,
-                "all_permissions": list(ValidPermissions) + list(AppPermissions),
-            },
+        response = _member_mutation_response(
+            request, session, organization_id, user, user_id, changed_role_ids
         )
         response.headers["HX-Trigger"] = "modalDismiss"
-        return append_toast(
-            response, request, templates, "User role updated successfully."
-        )
+        return response.add_toast("User role updated successfully.")
     return RedirectResponse(
         url=organization_router.url_path_for(
             "read_organization", org_id=organization_id
@@ -343,31 +428,19 @@ def remove_user_from_organization(
         )
 
     # Remove all organization roles from the user
+    removed_role_ids: set[int | None] = set()
     for role in list(target_user.roles):
         if role.organization_id == organization_id:
+            removed_role_ids.add(role.id)
             target_user.roles.remove(role)
 
     session.commit()
 
     if is_htmx_request(request):
-        organization, user_permissions, pending_invitations = (
-            load_org_for_members_partial(session, organization_id, user)
-        )
-        response = templates.TemplateResponse(
-            request,
-            "organization/partials/members_table.html",
-            {
-                "organization": organization,
-                "pending_invitations": pending_invitations,
-                "user": user,
-                "user_permissions": user_permissions,
-                "ValidPermissions": ValidPermissions,
-                "all_permissions": list(ValidPermissions) + list(AppPermissions),
-            },
-        )
-        return append_toast(
-            response, request, templates, "User removed from organization."
+        response = _member_mutation_response(
+            request, session, organization_id, user, user_id, removed_role_ids
         )
+        return response.add_toast("User removed from organization.")
     return RedirectResponse(
         url=organization_router.url_path_for(
             "read_organization", org_id=organization_id
@@ -42,3 +42,17 @@ document.body.addEventListener('modalDismiss', function() {
         window.UI.hideAllModals();
     }
 });
+
+// Boosted header links only swap #main-content, so the header stays in place.
+// Collapse the mobile nav menu after navigating so it does not stay open.
+document.body.addEventListener('htmx:afterSwap', function(event) {
+    if (event.detail.target.id !== 'main-content') {
+        return;
+    }
+    document.querySelectorAll('.navbar-collapse.show').forEach(function(menu) {
+        menu.classList.remove('show');
+    });
+    document.querySelectorAll('.navbar-toggler').forEach(function(toggler) {
+        toggler.setAttribute('aria-expanded', 'false');
+    });
+});
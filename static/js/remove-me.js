@@ -0,0 +1,42 @@
+// remove-me.js — the htmx "remove-me" extension, used to auto-dismiss toasts.
+//
+// Elements inside an hx-ext="remove-me" region that carry a remove-me (or
+// data-remove-me) attribute are removed from the page once the interval it
+// names has elapsed, e.g. remove-me="5s". Intervals use htmx's own syntax
+// (ms, s, m). Matches the behavior of the upstream htmx-ext-remove-me package,
+// so templates written against it work unchanged.
+//
+// Bundled right after htmx so the extension is defined before htmx processes
+// the initial page.
+
+(function () {
+    "use strict";
+
+    function scheduleRemoval(elt) {
+        var interval = elt.getAttribute("remove-me") || elt.getAttribute("data-remove-me");
+        if (!interval) {
+            return;
+        }
+        setTimeout(function () {
+            if (elt.parentElement) {
+                elt.parentElement.removeChild(elt);
+            }
+        }, htmx.parseInterval(interval));
+    }
+
+    htmx.defineExtension("remove-me", {
+        onEvent: function (name, evt) {
+            if (name !== "htmx:afterProcessNode") {
+                return;
+            }
+            var elt = evt.detail.elt;
+            if (!elt.getAttribute) {
+                return;
+            }
+            scheduleRemoval(elt);
+            if (elt.querySelectorAll) {
+                elt.querySelectorAll("[remove-me], [data-remove-me]").forEach(scheduleRemoval);
+            }
+        },
+    });
+})();
@@ -1,6 +1,7 @@
 import pytest
 import os
-from typing import Generator, cast
+from contextlib import contextmanager
+from typing import Callable, ContextManager, Generator, Iterator, cast
 
 pytest_plugins = ["tests.frontend.fixtures"]
 from sqlmodel import create_engine, Session, select
@@ -29,6 +30,7 @@ from utils.core.auth import (
 from main import app
 from datetime import datetime, UTC, timedelta
 from utils.core.rate_limit import clear_all_rate_limiters
+from utils.core.query_stats import QueryStats, capture_queries
 
 
 @pytest.fixture(autouse=True)
@@ -65,6 +67,7 @@ def env_vars(monkeypatch):
         m.setenv("EMAIL_FROM", "test@example.com")
         m.setenv("BASE_URL", "http://localhost:8000")
         m.setenv("CSRF_ENABLED", "0")
+        m.setenv("STRICT_RENDER", "1")
         yield
 
 
@@ -450,6 +453,26 @@ def member_role(session: Session, test_organization: Organization) -> Role:
     return member_role
 
 
+@pytest.fixture
+def many_org_members(session: Session, member_role: Role) -> list[User]:
+    """
+    Adds 20 Members to test_organization, for checking that a page's query
+    count doesn't grow with the member list.
+    """
+    users = []
+    for i in range(20):
+        # Never logged in, so skip the bcrypt cost of a real hash
+        account = Account(email=f"bulk-member-{i}@example.com", hashed_password="x")
+        session.add(account)
+        session.flush()
+        user = User(name=f"Bulk Member {i}", account_id=account.id)
+        user.roles.append(member_role)
+        session.add(user)
+        users.append(user)
+    session.commit()
+    return users
+
+
 @pytest.fixture
 def test_invitation(
     session: Session, test_organization: Organization, member_role: Role
@@ -620,6 +643,30 @@ def mock_resend_send(mock_email_response):
         yield mock
 
 
+# --- Query budget ---
+
+
+@pytest.fixture
+def assert_max_queries() -> Callable[[int], ContextManager[QueryStats]]:
+    """
+    Returns a context manager that fails the test if the block runs more than
+    the given number of SQL statements, listing them by fingerprint:
+
+        with assert_max_queries(4):
+            client.get(...)
+    """
+
+    @contextmanager
+    def check(limit: int) -> Iterator[QueryStats]:
+        with capture_queries() as stats:
+            yield stats
+        assert stats.count <= limit, (
+            f"{stats.count} queries, expected at most {limit}:\n{stats.describe()}"
+        )
+
+    return check
+
+
 # --- HTMX Test Helpers ---
 
 
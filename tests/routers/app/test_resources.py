@@ -0,0 +1,378 @@
+import csv
+import io
+import json
+
+from sqlmodel import Session, select, func
+
+from main import app
+from tests.conftest import htmx_headers
+from utils.app.models import OrganizationResource
+from utils.app.resources import IMPORT_BATCH_SIZE, DESCRIPTION_PREVIEW_LENGTH
+from utils.core.models import Organization
+
+
+def _add_resource(
+    session: Session, organization: Organization, title: str = "Existing"
+) -> OrganizationResource:
+    assert organization.id is not None
+    resource = OrganizationResource(
+        organization_id=organization.id, title=title, description="Details"
+    )
+    session.add(resource)
+    session.commit()
+    session.refresh(resource)
+    return resource
+
+
+def _resource_count(session: Session, organization: Organization) -> int:
+    return session.exec(
+        select(func.count())
+        .select_from(OrganizationResource)
+        .where(OrganizationResource.organization_id == organization.id)
+    ).one()
+
+
+def _import(client, organization: Organization, filename: str, content: bytes, **kw):
+    return client.post(
+        app.url_path_for("import_resources"),
+        data={"organization_id": str(organization.id)},
+        files={"import_file": (filename, content)},
+        **kw,
+    )
+
+
+# --- CRUD ---
+
+
+def test_create_resource_redirects_to_dashboard(
+    auth_client_owner, session, test_organization
+):
+    response = auth_client_owner.post(
+        app.url_path_for("create_resource"),
+        data={
+            "title": "New Resource",
+            "description": "",
+            "organization_id": str(test_organization.id),
+        },
+    )
+    assert response.status_code == 303
+    assert response.headers["location"].endswith(app.url_path_for("read_dashboard"))
+    resource = session.exec(
+        select(OrganizationResource).where(OrganizationResource.title == "New Resource")
+    ).one()
+    assert resource.description is None
+
+
+def test_create_resource_htmx_prepends_item(auth_client_owner, test_organization):
+    response = auth_client_owner.post(
+        app.url_path_for("create_resource"),
+        data={"title": "Fresh", "organization_id": str(test_organization.id)},
+        headers=htmx_headers(),
+    )
+    assert response.status_code == 200
+    assert response.headers["HX-Reswap"] == "none"
+    assert 'hx-swap-oob="afterbegin:#resource-list"' in response.text
+    assert 'hx-swap-oob="delete:#resources-empty"' in response.text
+    assert "Fresh" in response.text
+    assert "Resource created successfully." in response.text
+
+
+def test_create_resource_requires_write_permission(
+    auth_client_member, session, test_organization
+):
+    response = auth_client_member.post(
+        app.url_path_for("create_resource"),
+        data={"title": "Nope", "organization_id": str(test_organization.id)},
+    )
+    assert response.status_code == 403
+    assert _resource_count(session, test_organization) == 0
+
+
+def test_edit_resource_form_loads_full_description(
+    auth_client_owner, session, test_organization
+):
+    resource = _add_resource(session, test_organization)
+    resource.description = "y" * (DESCRIPTION_PREVIEW_LENGTH * 2)
+    session.commit()
+    url = app.url_path_for("edit_resource_form", resource_id=resource.id)
+
+    partial = auth_client_owner.get(url, headers=htmx_headers())
+    assert partial.status_code == 200
+    assert "<html" not in partial.text
+    assert 'hx-target="this"' in partial.text
+    assert resource.description in partial.text
+
+    page = auth_client_owner.get(url)
+    assert page.status_code == 200
+    assert "<!DOCTYPE html>" in page.text
+    assert 'hx-post="' + app.url_path_for("update_resource") not in page.text
+
+
+def test_update_resource_htmx_swaps_item(auth_client_owner, session, test_organization):
+    resource = _add_resource(session, test_organization)
+    response = auth_client_owner.post(
+        app.url_path_for("update_resource"),
+        data={
+            "resource_id": str(resource.id),
+            "title": "Renamed",
+            "description": "New details",
+        },
+        headers=htmx_headers(),
+    )
+    assert response.status_code == 200
+    assert f'id="resource-{resource.id}"' in response.text
+    assert "Renamed" in response.text
+    session.refresh(resource)
+    assert resource.title == "Renamed"
+    assert resource.description == "New details"
+
+
+def test_update_resource_in_other_organization_is_forbidden(
+    auth_client_owner, session, second_test_organization
+):
+    resource = _add_resource(session, second_test_organization)
+    response = auth_client_owner.post(
+        app.url_path_for("update_resource"),
+        data={"resource_id": str(resource.id), "title": "Hijacked"},
+    )
+    assert response.status_code == 403
+
+
+def test_update_missing_resource_returns_404(auth_client_owner, test_organization):
+    response = auth_client_owner.post(
+        app.url_path_for("update_resource"),
+        data={"resource_id": "999999", "title": "Ghost"},
+    )
+    assert response.status_code == 404
+
+
+def test_delete_last_resource_restores_empty_state(
+    auth_client_owner, session, test_organization
+):
+    resource = _add_resource(session, test_organization)
+    response = auth_client_owner.post(
+        app.url_path_for("delete_resource"),
+        data={"resource_id": str(resource.id)},
+        headers=htmx_headers(),
+    )
+    assert response.status_code == 200
+    assert response.headers["HX-Reswap"] == "none"
+    assert f'hx-swap-oob="delete:#resource-{resource.id}"' in response.text
+    assert 'id="resources-empty"' in response.text
+    assert _resource_count(session, test_organization) == 0
+
+
+def test_read_resource_returns_item_for_cancel(
+    auth_client_owner, session, test_organization
+):
+    resource = _add_resource(session, test_organization)
+    response = auth_client_owner.get(
+        app.url_path_for("read_resource", resource_id=resource.id),
+        headers=htmx_headers(),
+    )
+    assert response.status_code == 200
+    assert f'id="resource-{resource.id}"' in response.text
+    assert "<html" not in response.text
+
+
+# --- Search ---
+
+
+def test_search_matches_word_prefixes(auth_client_owner, session, test_organization):
+    _add_resource(session, test_organization, title="Quarterly report")
+    _add_resource(session, test_organization, title="Team offsite")
+    response = auth_client_owner.get(
+        app.url_path_for("search_organization_resources"),
+        params={"organization_id": test_organization.id, "q": "quar rep"},
+        headers=htmx_headers(),
+    )
+    assert response.status_code == 200
+    assert "Quarterly report" in response.text
+    assert "Team offsite" not in response.text
+
+
+def test_search_is_scoped_to_organization(
+    auth_client_owner, session, test_organization, second_test_organization
+):
+    _add_resource(session, second_test_organization, title="Elsewhere")
+    response = auth_client_owner.get(
+        app.url_path_for("search_organization_resources"),
+        params={"organization_id": test_organization.id, "q": "elsewhere"},
+        headers=htmx_headers(),
+    )
+    assert response.status_code == 200
+    assert 'id="resources-no-matches"' in response.text
+
+
+def test_empty_search_restores_first_page(
+    auth_client_owner, session, test_organization
+):
+    _add_resource(session, test_organization, title="Listed")
+    response = auth_client_owner.get(
+        app.url_path_for("search_organization_resources"),
+        params={"organization_id": test_organization.id, "q": "  "},
+        headers=htmx_headers(),
+    )
+    assert response.status_code == 200
+    assert "Listed" in response.text
+
+
+def test_search_without_htmx_renders_dashboard_results(
+    auth_client_owner, session, test_organization
+):
+    _add_resource(session, test_organization, title="Quarterly report")
+    _add_resource(session, test_organization, title="Team offsite")
+    response = auth_client_owner.get(
+        app.url_path_for("search_organization_resources"),
+        params={"organization_id": test_organization.id, "q": "quarterly"},
+    )
+    assert response.status_code == 303
+    response = auth_client_owner.get(response.headers["location"])
+    assert response.status_code == 200
+    assert 'value="quarterly"' in response.text
+    assert "Quarterly report" in response.text
+    assert "Team offsite" not in response.text
+
+
+def test_search_requires_read_permission(auth_client_non_member, test_organization):
+    response = auth_client_non_member.get(
+        app.url_path_for("search_organization_resources"),
+        params={"organization_id": test_organization.id, "q": "x"},
+        headers=htmx_headers(),
+    )
+    assert response.status_code == 403
+
+
+# --- Bulk import ---
+
+
+def test_import_csv_in_batches(auth_client_owner, session, test_organization):
+    row_count = IMPORT_BATCH_SIZE * 2 + 5
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["title", "description", "ignored"])
+    writer.writerow(["Tricky", 'line one\n\\.\nline, "three"', "x"])
+    writer.writerow(["No description", "", "x"])
+    for i in range(row_count - 2):
+        writer.writerow([f"Imported {i}", f"Row {i}", "x"])
+
+    response = _import(
+        auth_client_owner,
+        test_organization,
+        "resources.csv",
+        buffer.getvalue().encode(),
+    )
+    assert response.status_code == 303
+    assert _resource_count(session, test_organization) == row_count
+
+    tricky = session.exec(
+        select(OrganizationResource).where(OrganizationResource.title == "Tricky")
+    ).one()
+    assert tricky.description == 'line one\n\\.\nline, "three"'
+    blank = session.exec(
+        select(OrganizationResource).where(
+            OrganizationResource.title == "No description"
+        )
+    ).one()
+    assert blank.description is None
+
+
+def test_import_ndjson_htmx_refreshes_list(
+    auth_client_owner, session, test_organization
+):
+    content = "\n".join(
+        [
+            json.dumps({"title": "First", "description": "One"}),
+            "",
+            json.dumps({"title": "Second"}),
+        ]
+    )
+    response = _import(
+        auth_client_owner,
+        test_organization,
+        "resources.ndjson",
+        content.encode(),
+        headers=htmx_headers(),
+    )
+    assert response.status_code == 200
+    assert "First" in response.text and "Second" in response.text
+    assert "Imported 2 resources." in response.text
+    assert _resource_count(session, test_organization) == 2
+
+
+def test_import_with_invalid_row_inserts_nothing(
+    auth_client_owner, session, test_organization
+):
+    rows = [json.dumps({"title": f"Row {i}"}) for i in range(IMPORT_BATCH_SIZE + 1)]
+    rows.append(json.dumps({"title": "   "}))
+    response = _import(
+        auth_client_owner,
+        test_organization,
+        "resources.jsonl",
+        "\n".join(rows).encode(),
+    )
+    assert response.status_code == 400
+    assert f"Line {len(rows)}: title is required" in response.text
+    assert _resource_count(session, test_organization) == 0
+
+
+def test_import_rejects_unknown_file_type(auth_client_owner, test_organization):
+    response = _import(auth_client_owner, test_organization, "resources.xlsx", b"x")
+    assert response.status_code == 400
+
+
+def test_import_requires_title_header(auth_client_owner, test_organization):
+    response = _import(
+        auth_client_owner, test_organization, "resources.csv", b"name\nA\n"
+    )
+    assert response.status_code == 400
+    assert "title column" in response.text
+
+
+# --- Streaming export ---
+
+
+def test_export_csv_round_trips_through_import(
+    auth_client_owner, session, test_organization, second_test_organization
+):
+    _add_resource(session, test_organization, "Exported")
+    _add_resource(session, second_test_organization, "Other org")
+
+    response = auth_client_owner.get(
+        app.url_path_for("export_resources"),
+        params={"organization_id": test_organization.id, "format": "csv"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert "attachment" in response.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["title"] for row in rows] == ["Exported"]
+    assert rows[0]["description"] == "Details"
+
+    reimport = _import(
+        auth_client_owner, test_organization, "export.csv", response.content
+    )
+    assert reimport.status_code == 303
+    assert _resource_count(session, test_organization) == 2
+
+
+def test_export_ndjson(auth_client_owner, session, test_organization):
+    _add_resource(session, test_organization, "One")
+    _add_resource(session, test_organization, "Two")
+
+    response = auth_client_owner.get(
+        app.url_path_for("export_resources"),
+        params={"organization_id": test_organization.id, "format": "ndjson"},
+    )
+    assert response.status_code == 200
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [record["title"] for record in records] == ["One", "Two"]
+    assert set(records[0]) == {"id", "title", "description", "created_at", "updated_at"}
+
+
+def test_export_requires_read_permission(auth_client_member, test_organization):
+    response = auth_client_member.get(
+        app.url_path_for("export_resources"),
+        params={"organization_id": test_organization.id},
+    )
+    assert response.status_code == 403
@@ -7,6 +7,7 @@ from html import unescape
 from sqlalchemy import inspect
 
 from main import app
+from tests.conftest import add_owner_to_organization
 from utils.core.models import (
     User,
     AccountEmail,
@@ -30,6 +31,14 @@ from utils.core.auth import (
     verify_password,
     validate_token,
     get_password_hash,
+    revoke_all_refresh_tokens,
+)
+from utils.core.organizations import (
+    ORGANIZATION_DELETE_BATCH_SIZE,
+    delete_organizations,
+    delete_organizations_task,
+    is_large_organization_deletion,
+    sole_member_organization_ids,
 )
 from utils.core.rate_limit import (
     forgot_password_email_limiter,
@@ -534,6 +543,95 @@ def test_delete_account_preserves_shared_organization_and_owned_resources(
     assert remaining_user_id in organization_user_ids
 
 
+def test_sole_member_organization_ids_excludes_shared_organizations(
+    session: Session,
+    org_owner: User,
+    org_member_user: User,
+    test_organization: Organization,
+    second_test_organization: Organization,
+):
+    assert org_owner.id is not None
+    add_owner_to_organization(session, org_owner, second_test_organization)
+
+    assert sole_member_organization_ids(session, org_owner.id) == [
+        second_test_organization.id
+    ]
+
+
+def test_delete_account_defers_large_organization_deletion(
+    auth_client_owner: TestClient,
+    session: Session,
+    org_owner: User,
+    test_organization: Organization,
+    monkeypatch,
+):
+    assert org_owner.account is not None
+    organization_id = test_organization.id
+    assert organization_id is not None
+    session.add_all(
+        OrganizationResource(organization_id=organization_id, title=f"Resource {i}")
+        for i in range(ORGANIZATION_DELETE_BATCH_SIZE + 1)
+    )
+    session.commit()
+
+    deferred: list[list[int]] = []
+
+    def record_task(organization_ids: list[int]) -> None:
+        deferred.append(organization_ids)
+        delete_organizations_task(organization_ids)
+
+    monkeypatch.setattr("routers.core.account.delete_organizations_task", record_task)
+
+    response = auth_client_owner.post(
+        app.url_path_for("delete_account"),
+        data={"email": org_owner.account.email, "password": "Owner123!@#"},
+    )
+
+    assert response.status_code == 303
+    assert deferred == [[organization_id]]
+    session.expire_all()
+    assert session.get(Organization, organization_id) is None
+    assert (
+        session.exec(
+            select(OrganizationResource).where(
+                OrganizationResource.organization_id == organization_id
+            )
+        ).first()
+        is None
+    )
+
+
+def test_delete_organizations_removes_dependents_in_batches(
+    engine,
+    session: Session,
+    org_owner: User,
+    test_organization: Organization,
+    test_invitation: Invitation,
+):
+    organization_id = test_organization.id
+    assert organization_id is not None
+    session.add_all(
+        OrganizationResource(organization_id=organization_id, title=f"Resource {i}")
+        for i in range(5)
+    )
+    session.commit()
+    assert is_large_organization_deletion(session, [organization_id], threshold=5)
+    session.rollback()
+
+    with engine.connect() as connection:
+        assert delete_organizations(connection, [organization_id], batch_size=2) == 1
+
+    session.expire_all()
+    assert session.get(Organization, organization_id) is None
+    assert session.exec(select(OrganizationResource)).all() == []
+    assert session.exec(select(Invitation)).all() == []
+    assert (
+        session.exec(select(Role).where(Role.organization_id == organization_id)).all()
+        == []
+    )
+    assert session.get(User, org_owner.id) is not None
+
+
 # --- Error Case Tests ---
 
 
@@ -638,6 +736,33 @@ def test_register_with_existing_email(unauth_client: TestClient, test_account: A
     assert response.status_code == 409
 
 
+def test_register_with_existing_email_in_other_case(
+    unauth_client: TestClient, test_account: Account
+):
+    """Emails differing only in case belong to the same account."""
+    response = unauth_client.post(
+        app.url_path_for("register"),
+        data={
+            "name": "Another User",
+            "email": test_account.email.upper(),
+            "password": "Test123!@#",
+            "confirm_password": "Test123!@#",
+        },
+    )
+    assert response.status_code == 409
+
+
+def test_login_email_is_case_insensitive(
+    unauth_client: TestClient, test_account: Account
+):
+    response = unauth_client.post(
+        app.url_path_for("login"),
+        data={"email": test_account.email.upper(), "password": "Test123!@#"},
+    )
+    assert response.status_code == 303
+    assert response.headers["location"] == str(app.url_path_for("read_dashboard"))
+
+
 def test_login_with_invalid_credentials(
     unauth_client: TestClient, test_account: Account
 ):
@@ -1183,6 +1308,87 @@ def test_refresh_reuse_detection_revokes_all_tokens(
     assert len(active_tokens) == 0
 
 
+def test_revoke_all_sessions_rejects_outstanding_access_tokens(
+    auth_client: TestClient, session: Session, test_account: Account
+):
+    """Revoking every session also voids access tokens issued before it."""
+    dashboard = app.url_path_for("read_dashboard")
+    assert auth_client.get(dashboard).status_code == 200
+
+    assert revoke_all_refresh_tokens(test_account.id, session) == 1
+    session.commit()
+    assert test_account.token_version == 1
+
+    response = auth_client.get(dashboard)
+    assert response.status_code == 303
+    assert "login" in response.headers["location"]
+
+    # Replaying the revoked refresh token counts as reuse and bumps it again,
+    # but a token minted at the current version is accepted
+    session.refresh(test_account)
+    assert test_account.token_version == 2
+    client = TestClient(app, follow_redirects=False)
+    client.cookies.set(
+        "access_token",
+        create_access_token(
+            {"sub": test_account.email}, token_version=test_account.token_version
+        ),
+    )
+    assert client.get(dashboard).status_code == 200
+
+
+def test_logout_everywhere_ends_every_session(
+    auth_client: TestClient, session: Session, test_account: Account
+):
+    """Logging out everywhere revokes all refresh tokens and voids access tokens."""
+    # A second session for the same account, e.g. on another device
+    other_device = TestClient(app, follow_redirects=False)
+    other_device.cookies.set(
+        "access_token",
+        create_access_token(
+            {"sub": test_account.email}, token_version=test_account.token_version
+        ),
+    )
+    other_device.cookies.set(
+        "refresh_token",
+        create_tracked_refresh_token(test_account.id, test_account.email, session),
+    )
+    session.commit()
+    dashboard = app.url_path_for("read_dashboard")
+    assert other_device.get(dashboard).status_code == 200
+
+    response = auth_client.post(app.url_path_for("logout_everywhere"))
+    assert response.status_code == 303
+    assert response.headers["location"] == "/"
+    cookie_headers = response.headers.get_list("set-cookie")
+    assert any(
+        "access_token=" in cookie and "Max-Age=0" in cookie for cookie in cookie_headers
+    )
+    assert any(
+        "refresh_token=" in cookie and "Max-Age=0" in cookie
+        for cookie in cookie_headers
+    )
+
+    session.expire_all()
+    live_tokens = session.exec(
+        select(RefreshToken).where(
+            RefreshToken.account_id == test_account.id,
+            RefreshToken.revoked == False,  # noqa: E712
+        )
+    ).all()
+    assert live_tokens == []
+
+    response = other_device.get(dashboard)
+    assert response.status_code == 303
+    assert "login" in response.headers["location"]
+
+
+def test_logout_everywhere_requires_authentication(unauth_client: TestClient):
+    response = unauth_client.post(app.url_path_for("logout_everywhere"))
+    assert response.status_code == 303
+    assert "login" in response.headers["location"]
+
+
 def test_legacy_refresh_token_without_jti_rejected(
     unauth_client: TestClient, session: Session, test_account: Account, test_user: User
 ):
@@ -1,7 +1,13 @@
+from datetime import datetime, timedelta
 from main import app
 from sqlmodel import Session
 from utils.core.models import Organization, User
 from utils.app.models import OrganizationResource
+from utils.app.resources import (
+    DESCRIPTION_PREVIEW_LENGTH,
+    RESOURCES_PAGE_SIZE,
+    load_resource_page,
+)
 from tests.conftest import add_owner_to_organization, htmx_headers
 
 
@@ -169,3 +175,108 @@ def test_dashboard_invalid_org_cookie(auth_client_owner, test_organization):
     assert response.status_code == 200
     # Should still render with first org selected
     assert test_organization.name in response.text
+
+
+# --- Resource pagination ---
+
+
+def _add_resources(
+    session: Session, organization: Organization, count: int
+) -> list[OrganizationResource]:
+    assert organization.id is not None
+    # Identical timestamps exercise the id tie-breaker in the keyset
+    created_at = datetime(2024, 1, 1)
+    resources = [
+        OrganizationResource(
+            organization_id=organization.id,
+            title=f"Paged Resource {i:02d}",
+            created_at=created_at + timedelta(days=i // 2),
+        )
+        for i in range(count)
+    ]
+    session.add_all(resources)
+    session.commit()
+    return resources
+
+
+def test_load_resource_page_walks_newest_first_without_gaps(
+    session: Session, test_organization: Organization
+):
+    _add_resources(session, test_organization, 7)
+    assert test_organization.id is not None
+
+    seen: list[tuple[datetime, int]] = []
+    after = None
+    while True:
+        page = load_resource_page(session, test_organization.id, after, limit=3)
+        seen.extend((item.created_at, item.id) for item in page.resources)
+        if page.next_cursor is None:
+            break
+        after = page.next_cursor
+
+    assert len(seen) == len(set(seen)) == 7
+    assert seen == sorted(seen, reverse=True)
+
+
+def test_load_resource_page_previews_long_descriptions(
+    session: Session, test_organization: Organization
+):
+    assert test_organization.id is not None
+    session.add(
+        OrganizationResource(
+            organization_id=test_organization.id,
+            title="Long",
+            description="x" * (DESCRIPTION_PREVIEW_LENGTH * 5),
+        )
+    )
+    session.commit()
+
+    (item,) = load_resource_page(session, test_organization.id).resources
+    assert item.description_preview == "x" * DESCRIPTION_PREVIEW_LENGTH + "…"
+
+
+def test_dashboard_resources_returns_next_page(
+    auth_client_owner, session: Session, test_organization: Organization
+):
+    _add_resources(session, test_organization, RESOURCES_PAGE_SIZE + 1)
+    auth_client_owner.cookies.set("selected_organization_id", str(test_organization.id))
+
+    response = auth_client_owner.get(app.url_path_for("read_dashboard"))
+    assert response.status_code == 200
+    assert 'id="resources-load-more"' in response.text
+    assert 'hx-trigger="revealed"' in response.text
+    assert response.text.count("dashboard-resource-item-title") == RESOURCES_PAGE_SIZE
+
+    assert test_organization.id is not None
+    cursor = load_resource_page(session, test_organization.id).next_cursor
+    response = auth_client_owner.get(
+        app.url_path_for("read_dashboard_resources"),
+        params={"after": cursor},
+        headers=htmx_headers(),
+    )
+    assert response.status_code == 200
+    assert "<html" not in response.text
+    assert "Paged Resource 00" in response.text
+    assert 'id="resources-load-more"' not in response.text
+
+
+def test_dashboard_resources_without_htmx_redirects_to_dashboard(auth_client_owner):
+    response = auth_client_owner.get(
+        app.url_path_for("read_dashboard_resources"),
+        params={"after": "abc"},
+        follow_redirects=False,
+    )
+    assert response.status_code == 303
+    assert response.headers["location"].endswith("/dashboard/?after=abc")
+
+
+def test_dashboard_resources_requires_read_permission(
+    auth_client_member, test_organization: Organization
+):
+    auth_client_member.cookies.set(
+        "selected_organization_id", str(test_organization.id)
+    )
+    response = auth_client_member.get(
+        app.url_path_for("read_dashboard_resources"), headers=htmx_headers()
+    )
+    assert response.status_code == 403
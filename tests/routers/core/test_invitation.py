@@ -616,6 +616,34 @@ def test_create_invitation_resend_replaces_active_invitation(
     assert "no longer valid" in auth_response.text.lower()
 
 
+def test_create_invitation_resend_ignores_email_case(
+    auth_client,
+    inviter_user: User,
+    existing_invitation: Invitation,
+    session: Session,
+    mock_resend_send,
+):
+    """Re-inviting the same address in another case still replaces the invite."""
+    assert existing_invitation.role_id is not None
+    old_id = existing_invitation.id
+    organization_id = existing_invitation.organization_id
+
+    response = auth_client.post(
+        app.url_path_for("create_invitation"),
+        data={
+            "invitee_email": existing_invitation.invitee_email.upper(),
+            "role_id": str(existing_invitation.role_id),
+            "organization_id": str(organization_id),
+        },
+        follow_redirects=False,
+    )
+
+    assert response.status_code == 303, response.text
+    session.expire_all()
+    assert session.get(Invitation, old_id) is None
+    assert len(Invitation.get_pending_for_org(session, organization_id)) == 1
+
+
 def test_create_invitation_resend_after_expired_pending_invite(
     auth_client,
     inviter_user: User,
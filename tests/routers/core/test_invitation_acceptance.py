@@ -6,7 +6,7 @@ from sqlalchemy.orm import joinedload
 from urllib.parse import urlparse, parse_qs
 
 from main import app
-from utils.core.models import User, Account, Invitation
+from utils.core.models import User, Account, Invitation, utc_now
 
 # --- Test Scenarios ---
 
@@ -326,6 +326,25 @@ def test_accept_invitation_logged_in_user_sees_invalid_warning_on_login(
     )
 
 
+def test_accept_invitation_to_deleting_organization_is_invalid(
+    auth_client_invitee: TestClient,
+    session: Session,
+    test_invitation: Invitation,
+):
+    """Invitations to an organization that is being deleted can't be accepted."""
+    test_invitation.organization.deleting_at = utc_now()
+    session.commit()
+
+    response = auth_client_invitee.get(
+        app.url_path_for("read_login"),
+        params={"invitation_token": test_invitation.token},
+    )
+    _assert_authenticated_invitation_warning_page(
+        response,
+        warning_substring="no longer valid",
+    )
+
+
 def test_accept_invitation_logged_in_user_sees_expired_warning_on_register(
     auth_client_owner: TestClient,
     expired_invitation: Invitation,
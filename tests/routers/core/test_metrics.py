@@ -0,0 +1,56 @@
+from fastapi.testclient import TestClient
+
+from main import app
+from utils.core.rate_limit import login_ip_limiter
+
+
+def _scrape(client: TestClient, token: str = "scrape-token"):
+    return client.get(
+        app.url_path_for("read_metrics"),
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+
+def test_metrics_disabled_without_token(unauth_client: TestClient, monkeypatch):
+    monkeypatch.delenv("METRICS_TOKEN", raising=False)
+    response = _scrape(unauth_client)
+    assert response.status_code == 404
+
+
+def test_metrics_rejects_wrong_token(unauth_client: TestClient, monkeypatch):
+    monkeypatch.setenv("METRICS_TOKEN", "scrape-token")
+    response = _scrape(unauth_client, token="wrong")
+    assert response.status_code == 401
+
+
+def test_metrics_reports_route_latency_and_rate_limit_rejections(
+    auth_client_owner: TestClient,
+    unauth_client: TestClient,
+    test_organization,
+    monkeypatch,
+):
+    monkeypatch.setenv("METRICS_TOKEN", "scrape-token")
+    auth_client_owner.get(
+        app.url_path_for("read_organization", org_id=test_organization.id)
+    )
+    for _ in range(login_ip_limiter.max_attempts + 1):
+        unauth_client.post(
+            app.url_path_for("login"),
+            data={"email": "nobody@example.com", "password": "Wrong123!@#"},
+        )
+
+    response = _scrape(unauth_client)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    # Labelled by route template, not the request path
+    assert (
+        'http_request_duration_seconds_count{route="/organizations/{org_id}",'
+        'method="GET",status="200"}' in response.text
+    )
+    assert 'rate_limit_rejections_total{scope="login_ip"}' in response.text
+    assert "db_pool_checkouts_total" in response.text
+    assert (
+        'template_render_seconds_count{template="organization/organization.html"}'
+        in response.text
+    )
@@ -1,8 +1,26 @@
-from utils.core.models import Organization, Role, Permission, User
+from utils.app.models import OrganizationResource
+from utils.core.models import (
+    Account,
+    Invitation,
+    Organization,
+    Role,
+    Permission,
+    User,
+)
+from utils.core.organizations import (
+    MEMBERS_PAGE_SIZE,
+    ORGANIZATION_DELETE_BATCH_SIZE,
+    count_org_members,
+    count_role_members,
+    delete_organizations_task,
+    load_member_page,
+    load_organization_view,
+)
 from utils.core.enums import ValidPermissions
 from utils.core.db import create_default_roles
+from utils.core.search import run_with_latency_budget
 from main import app
-from sqlmodel import select
+from sqlmodel import select, text
 from tests.conftest import SetupError
 from fastapi.testclient import TestClient
 from sqlmodel import Session
@@ -347,6 +365,49 @@ def test_delete_organization_success(
     assert deleted_org is None
 
 
+def test_delete_large_organization_hides_it_until_background_task_runs(
+    auth_client_owner: TestClient,
+    session: Session,
+    org_owner: User,
+    test_organization: Organization,
+    monkeypatch,
+):
+    """A large organization is marked deleting and emptied after the response"""
+    org_id = test_organization.id
+    assert org_id is not None
+    session.add_all(
+        OrganizationResource(organization_id=org_id, title=f"Resource {i}")
+        for i in range(ORGANIZATION_DELETE_BATCH_SIZE + 1)
+    )
+    session.commit()
+
+    deferred: list[list[int]] = []
+    monkeypatch.setattr(
+        "routers.core.organization.delete_organizations_task",
+        lambda organization_ids: deferred.append(organization_ids),
+    )
+
+    response = auth_client_owner.post(
+        app.url_path_for("delete_organization", org_id=org_id),
+    )
+
+    assert response.status_code == 303
+    assert deferred == [[org_id]]
+    session.expire_all()
+    organization = session.get(Organization, org_id)
+    assert organization is not None and organization.deleting_at is not None
+    assert org_owner.organizations == []
+    assert not org_owner.has_permission(
+        ValidPermissions.DELETE_ORGANIZATION, organization
+    )
+
+    delete_organizations_task(deferred[0])
+
+    session.expire_all()
+    assert session.get(Organization, org_id) is None
+    assert session.exec(select(OrganizationResource)).all() == []
+
+
 def test_delete_organization_unauthorized(
     auth_client_member, session, test_organization
 ):
@@ -522,6 +583,27 @@ def test_organization_page_displays_members_correctly(
     assert ">Member<" in response.text
 
 
+def test_read_organization_query_count_is_independent_of_member_count(
+    auth_client_owner,
+    test_organization,
+    many_org_members,
+    test_invitation,
+    assert_max_queries,
+):
+    """
+    The page is one read-model query plus authentication and the first
+    members page, however many members, roles and invitations there are.
+    """
+    with assert_max_queries(10) as stats:
+        response = auth_client_owner.get(
+            app.url_path_for("read_organization", org_id=test_organization.id),
+        )
+
+    assert response.status_code == 200
+    assert many_org_members[0].name in response.text
+    assert not stats.repeated(), stats.describe()
+
+
 def test_empty_organization_displays_no_members_message(auth_client_owner, session):
     """Test that an organization with no members displays appropriate message"""
     # Create a new empty organization with just the owner
@@ -647,3 +729,239 @@ def test_invite_without_permission(
     # Should return a 403 Forbidden
     assert response.status_code == 403
     assert "permission" in response.text.lower()
+
+
+def test_load_organization_view_reads_page_in_one_query(
+    session: Session,
+    assert_max_queries,
+    org_owner: User,
+    org_admin_user: User,
+    test_organization: Organization,
+    test_invitation: Invitation,
+    expired_invitation: Invitation,
+    used_invitation: Invitation,
+):
+    org_id = test_organization.id
+    assert org_id is not None
+
+    with assert_max_queries(1):
+        organization = load_organization_view(session, org_id)
+
+    assert organization is not None
+    assert organization.name == test_organization.name
+    assert organization.member_count == count_org_members(session, org_id) == 2
+
+    roles = session.exec(
+        select(Role).where(Role.organization_id == org_id).order_by(Role.id)
+    ).all()
+    assert [role.name for role in organization.roles] == [role.name for role in roles]
+    for view, role in zip(organization.roles, roles):
+        assert {permission.name for permission in view.permissions} == {
+            permission.name for permission in role.permissions
+        }
+    assert organization.member_counts == count_role_members(
+        session, {role.id for role in roles if role.id is not None}
+    )
+
+    pending = Invitation.get_pending_for_org(session, org_id)
+    assert [inv.id for inv in organization.invitations] == [inv.id for inv in pending]
+    assert used_invitation.id not in [inv.id for inv in organization.invitations]
+    for view, invitation in zip(organization.invitations, pending):
+        assert view.role.name == invitation.role.name
+        assert view.is_expired() == invitation.is_expired()
+
+
+def test_load_organization_view_missing_organization(session: Session):
+    assert load_organization_view(session, 999999) is None
+
+
+# --- Member Pagination Tests ---
+
+
+def _add_members(session: Session, role: Role, count: int) -> list[User]:
+    members = []
+    for i in range(count):
+        account = Account(email=f"paged{i:02d}@example.com", hashed_password="x")
+        member = User(name=f"Paged Member {i:02d}", account=account)
+        member.roles.append(role)
+        session.add(member)
+        members.append(member)
+    session.commit()
+    return members
+
+
+def test_load_member_page_walks_all_members_once(
+    session, org_owner, org_admin_user, member_role, test_organization
+):
+    _add_members(session, member_role, 5)
+    # A member holding several roles must still appear once
+    org_admin_user.roles.append(member_role)
+    session.commit()
+
+    seen: list[str] = []
+    after = None
+    while True:
+        page = load_member_page(session, test_organization.id, after=after, limit=2)
+        assert len(page.members) <= 2
+        seen.extend(member.name for member in page.members)
+        if page.next_cursor is None:
+            break
+        after = page.next_cursor
+
+    assert seen == sorted(seen, key=str.lower)
+    assert len(seen) == len(set(seen)) == 7
+
+
+def test_load_member_page_filters_by_search_and_role(
+    session, org_owner, org_admin_user, member_role, test_organization
+):
+    _add_members(session, member_role, 3)
+
+    by_name = load_member_page(session, test_organization.id, search="member 01")
+    assert [m.name for m in by_name.members] == ["Paged Member 01"]
+
+    by_email = load_member_page(session, test_organization.id, search="OWNER@")
+    assert [m.name for m in by_email.members] == ["Org Owner"]
+
+    # LIKE wildcards in the search box are matched literally
+    assert load_member_page(session, test_organization.id, search="%").members == []
+
+    by_role = load_member_page(session, test_organization.id, role_id=member_role.id)
+    assert {m.name for m in by_role.members} == {
+        "Paged Member 00",
+        "Paged Member 01",
+        "Paged Member 02",
+    }
+
+
+def test_load_member_page_reads_roles_of_this_organization_in_one_query(
+    session, assert_max_queries, org_owner, member_role, test_organization
+):
+    org_id = test_organization.id
+    # Roles held in another organization must not show up on this page
+    other = Organization(name="Other Organization")
+    other_role = Role(name="Other Role", organization=other)
+    org_owner.roles.append(other_role)
+    org_owner.roles.append(member_role)
+    session.add(other)
+    session.commit()
+
+    with assert_max_queries(1):
+        page = load_member_page(session, org_id)
+
+    [owner] = [member for member in page.members if member.id == org_owner.id]
+    expected = {role.id for role in org_owner.roles if role.organization_id == org_id}
+    assert owner.role_ids == expected
+    assert member_role.id in owner.role_ids
+    assert other_role.id not in owner.role_ids
+    assert {role.organization_id for role in owner.roles} == {org_id}
+
+
+def test_read_organization_members_returns_page_with_load_more_row(
+    auth_client_owner, session, member_role, test_organization
+):
+    _add_members(session, member_role, MEMBERS_PAGE_SIZE + 1)
+    url = app.url_path_for("read_organization_members", org_id=test_organization.id)
+
+    response = auth_client_owner.get(url, headers={"HX-Request": "true"})
+    assert response.status_code == 200
+    assert "<html" not in response.text
+    assert 'id="members-load-more"' in response.text
+    assert 'hx-trigger="revealed"' in response.text
+    assert 'hx-swap-oob="innerHTML:#member-role-modals-container"' in response.text
+
+    page = load_member_page(session, test_organization.id)
+    response = auth_client_owner.get(
+        url, params={"after": page.next_cursor}, headers={"HX-Request": "true"}
+    )
+    assert response.status_code == 200
+    assert 'id="members-load-more"' not in response.text
+    assert "Paged Member" in response.text
+    assert 'hx-swap-oob="beforeend:#member-role-modals-container"' in response.text
+
+
+def test_read_organization_members_search_without_results(
+    auth_client_owner, test_organization
+):
+    response = auth_client_owner.get(
+        app.url_path_for("read_organization_members", org_id=test_organization.id),
+        params={"q": "nobody-matches-this", "role_id": ""},
+        headers={"HX-Request": "true"},
+    )
+    assert response.status_code == 200
+    assert "No members match your search." in response.text
+
+
+def test_read_organization_search_over_budget_keeps_loaded_objects(
+    auth_client_owner, test_organization, many_org_members, monkeypatch
+):
+    """
+    A member search Postgres cancels renders the timeout notice on the full
+    page; the cancellation must not expire the user and organization the
+    route already loaded (STRICT_RENDER would raise on their reload).
+    """
+
+    def slow_search(session, query, timeout_ms=None):
+        def sleep_then_query():
+            session.exec(text("SELECT pg_sleep(1)"))
+            return query()
+
+        return run_with_latency_budget(session, sleep_then_query, timeout_ms=10)
+
+    monkeypatch.setattr("utils.core.organizations.run_with_latency_budget", slow_search)
+    response = auth_client_owner.get(
+        app.url_path_for("read_organization", org_id=test_organization.id),
+        params={"q": "owner"},
+    )
+    assert response.status_code == 200
+    assert 'id="members-search-timeout"' in response.text
+    assert "members-load-more" not in response.text
+    assert test_organization.name in response.text
+
+
+def test_read_organization_members_rejects_invalid_cursor(
+    auth_client_owner, test_organization
+):
+    response = auth_client_owner.get(
+        app.url_path_for("read_organization_members", org_id=test_organization.id),
+        params={"after": "not-a-cursor"},
+        headers={"HX-Request": "true"},
+    )
+    assert response.status_code == 400
+
+
+def test_read_organization_members_without_htmx_redirects_to_page(
+    auth_client_owner, test_organization
+):
+    response = auth_client_owner.get(
+        app.url_path_for("read_organization_members", org_id=test_organization.id),
+        params={"q": "Admin", "role_id": ""},
+        follow_redirects=False,
+    )
+    assert response.status_code == 303
+    assert response.headers["location"] == (
+        app.url_path_for("read_organization", org_id=test_organization.id) + "?q=Admin"
+    )
+
+
+def test_read_organization_members_as_non_member(
+    auth_client_non_member, test_organization
+):
+    response = auth_client_non_member.get(
+        app.url_path_for("read_organization_members", org_id=test_organization.id),
+        headers={"HX-Request": "true"},
+    )
+    assert response.status_code == 404
+
+
+def test_read_organization_applies_member_search(
+    auth_client_owner, org_admin_user, org_member_user, test_organization
+):
+    response = auth_client_owner.get(
+        app.url_path_for("read_organization", org_id=test_organization.id),
+        params={"q": "Admin"},
+    )
+    assert response.status_code == 200
+    assert "Admin User" in response.text
+    assert "Member User" not in response.text
+    assert 'value="Admin"' in response.text
@@ -5,6 +5,7 @@ from tests.conftest import SetupError
 from utils.core.models import Role, Permission, User
 from utils.core.enums import ValidPermissions
 from utils.app.enums import AppPermissions
+from utils.core.query_stats import capture_queries
 from sqlmodel import Session, select, col
 import re
 from main import app
@@ -301,6 +302,73 @@ def test_update_role_invalid_permission(
     assert response.status_code == 400
 
 
+def test_update_role_query_count_is_independent_of_permission_count(
+    auth_client, editor_user, test_organization, session: Session
+):
+    """
+    Permission changes are applied as one bulk INSERT and one bulk DELETE, so
+    swapping every permission costs no more queries than swapping one.
+    """
+    role = Role(name="Diffed Role", organization_id=test_organization.id)
+    session.add(role)
+    session.commit()
+    all_permissions = [p.value for p in ValidPermissions] + [
+        p.value for p in AppPermissions
+    ]
+
+    def count_update_queries(permissions: list[str]) -> int:
+        with capture_queries() as stats:
+            response = auth_client.post(
+                app.url_path_for("update_role"),
+                data={
+                    "id": role.id,
+                    "name": "Diffed Role",
+                    "organization_id": test_organization.id,
+                    "permissions": permissions,
+                },
+            )
+        assert response.status_code == 303
+        return stats.count
+
+    # Warm the per-process permission map so it isn't counted
+    count_update_queries([])
+    half = len(all_permissions) // 2
+    add_only = count_update_queries([all_permissions[0]])
+    swap_one = count_update_queries([all_permissions[1]])
+    # Disjoint selections, so every call below both adds and removes links
+    swap_many = count_update_queries(all_permissions[half:])
+    swap_all = count_update_queries(all_permissions[:half])
+
+    assert swap_one == add_only + 1  # the same statements plus one DELETE
+    assert swap_many == swap_one
+    assert swap_all == swap_one
+
+    session.expire_all()
+    assert {p.name for p in session.get(Role, role.id).permissions} == set(
+        all_permissions[:half]
+    )
+
+
+def test_create_role_invalid_permission(
+    auth_client, admin_user, test_organization, session: Session
+):
+    """Creating a role with an unknown permission is rejected and creates nothing."""
+    response = auth_client.post(
+        app.url_path_for("create_role"),
+        data={
+            "name": "Bad Permission Role",
+            "organization_id": test_organization.id,
+            "permissions": ["NOT_A_VALID_PERMISSION"],
+        },
+    )
+
+    assert response.status_code == 400
+    assert (
+        session.exec(select(Role).where(Role.name == "Bad Permission Role")).first()
+        is None
+    )
+
+
 def test_update_role_unauthenticated(
     unauth_client, test_organization, session: Session
 ):
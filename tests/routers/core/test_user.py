@@ -1,8 +1,8 @@
 from fastapi.testclient import TestClient
 from httpx import Response
-from sqlmodel import Session
+from sqlmodel import Session, select
 from unittest.mock import patch, MagicMock
-from tests.conftest import SetupError
+from tests.conftest import SetupError, htmx_headers
 from main import app
 from utils.core.models import User, Role, Organization
 from utils.core.images import InvalidImageError
@@ -361,3 +361,34 @@ def test_update_communication_preferences_htmx(
     assert test_user.comm_opt_in is True
     assert test_user.comm_updates is True
     assert test_user.comm_marketing is False
+
+
+def test_update_user_role_htmx_query_count_is_independent_of_member_count(
+    auth_client_owner: TestClient,
+    org_member_user: User,
+    test_organization: Organization,
+    many_org_members: list[User],
+    session: Session,
+    assert_max_queries,
+):
+    """Re-rendering the changed member and role rows doesn't touch other members."""
+    admin_role = session.exec(
+        select(Role)
+        .where(Role.organization_id == test_organization.id)
+        .where(Role.name == "Administrator")
+    ).one()
+
+    with assert_max_queries(24) as stats:
+        response = auth_client_owner.post(
+            app.url_path_for("update_user_role"),
+            data={
+                "user_id": str(org_member_user.id),
+                "organization_id": str(test_organization.id),
+                "roles": [str(admin_role.id)],
+            },
+            headers=htmx_headers(),
+        )
+
+    assert response.status_code == 200
+    assert f'id="member-row-{org_member_user.id}"' in response.text
+    assert not stats.repeated(), stats.describe()
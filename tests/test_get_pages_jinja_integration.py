@@ -117,6 +117,7 @@ class TestJinjaCheckAndGetSmokeIntegration:
             and ctx.template_name.endswith(".html")
             and not ctx.template_name.startswith("organization/partials/")
             and not ctx.template_name.startswith("users/partials/")
+            and not ctx.template_name.startswith("dashboard/partials/")
             and ctx.template_name != "base/partials/navbar_avatar_oob.html"
         }
         runtime_reads = {
@@ -8,10 +8,18 @@ Convention: HTMX requests send the HX-Request: true header.
 - Non-HTMX paths remain unchanged (303 RedirectResponse or full-page error).
 """
 
+import asyncio
+
 from starlette.requests import Request
 from fastapi.templating import Jinja2Templates
-from tests.conftest import htmx_headers
-from utils.core.htmx import is_htmx_request, toast_response, append_toast
+from tests.conftest import htmx_headers, is_html_partial
+from utils.core.htmx import (
+    MAIN_CONTENT_ID,
+    FragmentResponse,
+    is_boosted_fragment_request,
+    is_htmx_request,
+    toast_response,
+)
 from utils.core.rate_limit import (
     forgot_password_ip_limiter,
     login_ip_limiter,
@@ -585,7 +593,7 @@ def test_remove_last_non_owner_member_htmx_preserves_empty_state(
 
 
 # ---------------------------------------------------------------------------
-# 2.3 — update_role HTMX refreshes both table and modal container
+# 2.3 — update_role HTMX refreshes both the role row and its modal
 # ---------------------------------------------------------------------------
 
 
@@ -593,9 +601,8 @@ def test_update_role_htmx_refreshes_modal_container(
     auth_client_owner, test_organization, session
 ):
     """
-    update_role HTMX response includes the updated role name in the table
-    and refreshes the role-modals-container OOB so the edit modal title
-    reflects the renamed role.
+    update_role HTMX response swaps the updated role row and its edit modal
+    OOB so the edit modal title reflects the renamed role.
     """
     from utils.core.models import Role
 
@@ -622,9 +629,10 @@ def test_update_role_htmx_refreshes_modal_container(
     assert "NewName" in response.text
     # Old name is gone from the table
     assert "OldName" not in response.text
-    # OOB-refreshed modal container includes updated edit modal title
+    # OOB-refreshed edit modal includes the updated title
     assert "Edit Role: NewName" in response.text
-    assert 'id="role-modals-container"' in response.text
+    assert f'id="editRoleModal{custom_role.id}"' in response.text
+    assert response.headers["HX-Reswap"] == "none"
 
 
 # ---------------------------------------------------------------------------
@@ -718,8 +726,8 @@ def test_toast_response_with_headers():
     assert resp.headers["Retry-After"] == "60"
 
 
-def test_append_toast_helper():
-    """append_toast appends toast HTML to an existing TemplateResponse."""
+def test_fragment_response_sends_one_chunk_per_fragment():
+    """FragmentResponse keeps each rendered fragment as its own body chunk."""
     templates = Jinja2Templates(directory="templates")
     scope = {
         "type": "http",
@@ -729,15 +737,30 @@ def test_append_toast_helper():
         "query_string": b"",
     }
     request = Request(scope)
-    original = templates.TemplateResponse(
+    response = FragmentResponse(
         request,
+        templates,
         "base/partials/toast.html",
         {"message": "original", "level": "info"},
-    )
-    result = append_toast(original, request, templates, "appended", level="success")
-    body = result.body.decode()
-    assert "original" in body
-    assert "appended" in body
+    ).add_toast("appended", level="success")
+
+    assert len(response.chunks) == 2
+    assert b"original" in response.chunks[0]
+    assert b"appended" in response.chunks[1]
+    assert response.headers["content-length"] == str(len(response.body))
+
+    messages = []
+
+    async def receive():
+        return {"type": "http.request"}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(response(scope, receive, send))
+    bodies = [m for m in messages if m["type"] == "http.response.body"]
+    assert [m["body"] for m in bodies] == response.chunks
+    assert [m["more_body"] for m in bodies] == [True, False]
 
 
 # ---------------------------------------------------------------------------
@@ -949,7 +972,7 @@ def test_create_invitation_htmx_includes_success_toast(
     assert "Invitation sent successfully" in response.text
 
 
-def test_delete_invitation_htmx_returns_members_partial(
+def test_delete_invitation_htmx_removes_invitation_row(
     auth_client_owner,
     test_organization,
     member_role,
@@ -977,7 +1000,7 @@ def test_delete_invitation_htmx_returns_members_partial(
     )
     assert response.status_code == 200
     assert "<!DOCTYPE html>" not in response.text
-    assert 'id="invitations-list"' in response.text
+    assert f'id="invitation-{invitation.id}" hx-swap-oob="delete"' in response.text
     assert "cancelme@example.com" not in response.text
 
 
@@ -1156,7 +1179,7 @@ def test_delete_organization_htmx_returns_hx_redirect(
     assert "profile" in response.headers["HX-Redirect"]
 
 
-def test_resend_invitation_htmx_returns_members_partial(
+def test_resend_invitation_htmx_replaces_invitation_row(
     auth_client_owner,
     test_organization,
     test_invitation,
@@ -1174,7 +1197,7 @@ def test_resend_invitation_htmx_returns_members_partial(
     )
     assert response.status_code == 200
     assert "<!DOCTYPE html>" not in response.text
-    assert 'id="invitations-list"' in response.text
+    assert f'id="invitation-{test_invitation.id}" hx-swap-oob="true"' in response.text
     assert "Invitation resent" in response.text
 
 
@@ -1193,3 +1216,251 @@ def test_csrf_enabled_htmx_login_returns_toast(unauth_client, monkeypatch):
     assert response.status_code == 403
     assert "toast" in response.text
     _assert_htmx_error_is_oob_only(response)
+
+
+# ---------------------------------------------------------------------------
+# 9 - Boosted navigation renders only the content block
+# ---------------------------------------------------------------------------
+
+
+def _boosted_headers(**extra) -> dict:
+    return {
+        **htmx_headers(),
+        "HX-Boosted": "true",
+        "HX-Target": MAIN_CONTENT_ID,
+        **extra,
+    }
+
+
+def _request_with_headers(headers: dict) -> Request:
+    scope = {
+        "type": "http",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+        "method": "GET",
+        "path": "/",
+        "query_string": b"",
+    }
+    return Request(scope)
+
+
+def test_is_boosted_fragment_request():
+    assert is_boosted_fragment_request(_request_with_headers(_boosted_headers()))
+    assert not is_boosted_fragment_request(_request_with_headers(htmx_headers()))
+    assert not is_boosted_fragment_request(
+        _request_with_headers(_boosted_headers(**{"HX-Target": "other"}))
+    )
+    assert not is_boosted_fragment_request(
+        _request_with_headers(
+            _boosted_headers(**{"HX-History-Restore-Request": "true"})
+        )
+    )
+
+
+def test_boosted_navigation_returns_content_fragment(auth_client):
+    response = auth_client.get(_url("read_dashboard"), headers=_boosted_headers())
+    assert is_html_partial(response)
+    assert "<title>" in response.text
+    assert "navbarContent" not in response.text
+    assert "<footer" not in response.text
+    assert 'id="main-content"' not in response.text
+    assert "dashboard container" in response.text
+
+
+def test_boosted_navigation_varies_on_htmx_headers(auth_client):
+    response = auth_client.get(_url("read_dashboard"), headers=_boosted_headers())
+    vary = response.headers["Vary"]
+    assert "HX-Request" in vary
+    assert "HX-Target" in vary
+
+
+def test_history_restore_returns_full_page(auth_client):
+    response = auth_client.get(
+        _url("read_dashboard"),
+        headers=_boosted_headers(**{"HX-History-Restore-Request": "true"}),
+    )
+    assert "<!DOCTYPE html>" in response.text
+    assert 'id="main-content"' in response.text
+
+
+def test_non_boosted_navigation_returns_full_page(auth_client):
+    response = auth_client.get(_url("read_dashboard"))
+    assert "<!DOCTYPE html>" in response.text
+    assert "navbarContent" in response.text
+
+
+def test_boosted_navigation_renders_flash_as_oob_toast(auth_client):
+    import json
+    from urllib.parse import quote
+
+    auth_client.cookies.set(
+        "flash_message", quote(json.dumps({"message": "Saved!", "level": "info"}))
+    )
+    response = auth_client.get(_url("read_dashboard"), headers=_boosted_headers())
+    assert is_html_partial(response)
+    assert 'hx-swap-oob="true"' in response.text
+    assert "Saved!" in response.text
+    assert "text-bg-info" in response.text
+
+
+# ---------------------------------------------------------------------------
+# 10 - Member, role and invitation mutations swap only the affected rows
+# ---------------------------------------------------------------------------
+
+
+def _org_role(session, organization, name):
+    from sqlmodel import select
+    from utils.core.models import Role
+
+    return session.exec(
+        select(Role).where(Role.organization_id == organization.id, Role.name == name)
+    ).one()
+
+
+def test_update_user_role_htmx_swaps_member_and_role_rows_only(
+    auth_client_owner, org_member_user, org_admin_user, test_organization, session
+):
+    member_role = _org_role(session, test_organization, "Member")
+    admin_role = _org_role(session, test_organization, "Administrator")
+    response = auth_client_owner.post(
+        "/user/role/update",
+        data={
+            "user_id": str(org_member_user.id),
+            "organization_id": str(test_organization.id),
+            "roles": [str(admin_role.id)],
+        },
+        headers=htmx_headers(),
+    )
+
+    assert response.status_code == 200
+    assert response.headers["HX-Reswap"] == "none"
+    assert (
+        f'<tr id="member-row-{org_member_user.id}" hx-swap-oob="true">' in response.text
+    )
+    assert f'id="member-row-{org_admin_user.id}"' not in response.text
+    assert 'id="members-table-body"' not in response.text
+    # Member counts changed for both the old and the new role
+    assert f'id="role-row-{member_role.id}"' in response.text
+    assert f'id="role-row-{admin_role.id}"' in response.text
+
+
+def test_remove_member_htmx_deletes_member_row(
+    auth_client_owner, org_member_user, org_admin_user, test_organization
+):
+    response = auth_client_owner.post(
+        "/user/organization/remove",
+        data={
+            "user_id": str(org_member_user.id),
+            "organization_id": str(test_organization.id),
+        },
+        headers=htmx_headers(),
+    )
+
+    assert response.status_code == 200
+    assert response.headers["HX-Reswap"] == "none"
+    assert (
+        f'<tr id="member-row-{org_member_user.id}" hx-swap-oob="delete">'
+        in response.text
+    )
+    assert 'id="members-table-body"' not in response.text
+
+
+def test_create_invitation_htmx_prepends_invitation_row(
+    auth_client_owner, test_organization, member_role, mock_resend_send
+):
+    response = auth_client_owner.post(
+        "/invitations/",
+        data={
+            "invitee_email": "rowlevel@example.com",
+            "role_id": str(member_role.id),
+            "organization_id": str(test_organization.id),
+        },
+        headers=htmx_headers(),
+    )
+
+    assert response.status_code == 200
+    assert response.headers["HX-Reswap"] == "none"
+    assert 'hx-swap-oob="afterbegin:#invitations-list"' in response.text
+    assert 'id="invitations-empty" hx-swap-oob="delete"' in response.text
+    assert "rowlevel@example.com" in response.text
+    assert 'id="members-table-body"' not in response.text
+
+
+def test_delete_last_invitation_htmx_restores_empty_placeholder(
+    auth_client_owner, test_organization, test_invitation
+):
+    response = auth_client_owner.post(
+        "/invitations/delete",
+        data={
+            "invitation_id": str(test_invitation.id),
+            "organization_id": str(test_organization.id),
+        },
+        headers=htmx_headers(),
+    )
+
+    assert response.status_code == 200
+    assert 'id="invitations-empty"' in response.text
+    assert "No pending invitations." in response.text
+
+
+def test_create_role_htmx_appends_role_row_and_member_options(
+    auth_client_owner, test_organization
+):
+    response = auth_client_owner.post(
+        "/roles/create",
+        data={"name": "Reviewer", "organization_id": str(test_organization.id)},
+        headers=htmx_headers(),
+    )
+
+    assert response.status_code == 200
+    assert response.headers["HX-Reswap"] == "none"
+    assert 'hx-swap-oob="beforeend:#roles-table-body"' in response.text
+    assert 'hx-swap-oob="beforeend:#role-modals-container"' in response.text
+    assert 'hx-swap-oob="beforeend:.member-role-options"' in response.text
+    assert 'hx-swap-oob="beforeend:select.role-options"' in response.text
+    assert "Owner" not in response.text
+
+
+def test_rename_role_htmx_updates_every_role_label(
+    auth_client_owner, test_organization, session
+):
+    from utils.core.models import Role
+
+    role = Role(name="Before", organization_id=test_organization.id)
+    session.add(role)
+    session.commit()
+    session.refresh(role)
+
+    response = auth_client_owner.post(
+        "/roles/update",
+        data={
+            "id": str(role.id),
+            "name": "After",
+            "organization_id": str(test_organization.id),
+        },
+        headers=htmx_headers(),
+    )
+
+    assert response.status_code == 200
+    assert f'hx-swap-oob="innerHTML:.role-name-{role.id}">After<' in response.text
+
+
+def test_delete_role_htmx_deletes_role_references(
+    auth_client_owner, test_organization, session
+):
+    from utils.core.models import Role
+
+    role = Role(name="Temporary", organization_id=test_organization.id)
+    session.add(role)
+    session.commit()
+    session.refresh(role)
+
+    response = auth_client_owner.post(
+        "/roles/delete",
+        data={"id": str(role.id), "organization_id": str(test_organization.id)},
+        headers=htmx_headers(),
+    )
+
+    assert response.status_code == 200
+    assert response.headers["HX-Reswap"] == "none"
+    assert f'hx-swap-oob="delete:.role-ref-{role.id}"' in response.text
+    assert 'id="roles-table-body"' not in response.text
@@ -24,16 +24,15 @@ def test_scripts_in_head_not_body(unauth_client):
     # Split on </head> to separate head from body
     head, body = html.split("</head>", 1)
 
-    # htmx and our component scripts must be in <head> with defer
-    assert "htmx" in head, "htmx script must be in <head>"
-    assert "js/ui.js" in head, "ui.js must be in <head>"
-    assert "js/app.js" in head, "app.js must be in <head>"
+    # htmx and the bundle holding our component scripts must be in <head>
+    # with defer
+    assert "js/bundle.js" in head, "bundle.js (which includes htmx) must be in <head>"
     assert "defer" in head, "Scripts in <head> must use defer"
 
     # They must NOT be in <body>
     assert "htmx.min.js" not in body, "htmx script must not be in <body>"
-    assert "js/ui.js" not in body, (
-        "ui.js must not be in <body> — hx-boost will re-process it during "
+    assert "js/bundle.js" not in body, (
+        "bundle.js must not be in <body> — hx-boost will re-process it during "
         "swaps, destroying event delegation"
     )
 
@@ -41,3 +40,19 @@ def test_scripts_in_head_not_body(unauth_client):
     assert "bootstrap" not in html.lower(), (
         "Bootstrap must not be referenced — the app ships its own CSS/JS"
     )
+
+
+def test_component_scripts_load_as_single_bundle(unauth_client):
+    """ui.js and app.js ship inside bundle.js rather than as separate requests."""
+    response = unauth_client.get(
+        app.url_path_for("read_home"),
+        follow_redirects=True,
+    )
+    head = response.text.split("</head>", 1)[0]
+
+    assert "js/ui.js" not in head
+    assert "js/app.js" not in head
+    assert head.count("js/bundle.js") == 2, "bundle.js needs a preload hint and a tag"
+    assert 'rel="preload"' in head
+    assert "cdn.jsdelivr.net" not in head, "htmx is vendored into the bundle"
+    assert "fonts.googleapis.com" not in head, "web fonts are self-hosted"
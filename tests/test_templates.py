@@ -29,9 +29,12 @@ def test_valid_endpoints(validate_endpoints):
 
 def test_base_template_includes_htmx():
     content = Path("templates/base.html").read_text()
-    assert "htmx.org" in content, "base.html must load the HTMX library"
-    assert (
-        'src="https://cdn.jsdelivr.net/npm/htmx.org@2.0.8/dist/htmx.min.js"' in content
+    assert "base/partials/assets.html" in content
+    assets = Path("templates/base/partials/assets.html").read_text()
+    assert "js/bundle.js" in assets
+    bundle = Path("static/js/bundle.js").read_text()
+    assert "// --- static/vendor/htmx.min.js ---" in bundle, (
+        "base.html must load the HTMX library"
     )
 
 
@@ -81,7 +84,12 @@ def test_toast_partial_exists():
         "organization/partials/role_row.html",
         "organization/partials/members_table.html",
         "organization/partials/member_row.html",
+        "organization/partials/members_list.html",
+        "organization/partials/member_page.html",
         "organization/partials/invitations_list.html",
+        "organization/partials/invitation_item.html",
+        "organization/partials/member_role_modal.html",
+        "organization/partials/role_modal.html",
         "users/partials/profile_display.html",
         "users/partials/profile_form.html",
     ],
@@ -97,7 +105,7 @@ def test_roles_table_has_stable_id():
 
 
 def test_members_table_has_stable_id():
-    content = Path("templates/organization/modals/members_card.html").read_text()
+    content = Path("templates/organization/partials/members_list.html").read_text()
     assert 'id="members-table-body"' in content
 
 
@@ -117,21 +125,38 @@ def test_invite_member_form_has_hx_post():
 
 
 def test_pending_invitations_include_cancel_confirm():
-    content = Path("templates/organization/partials/invitations_list.html").read_text()
+    content = Path("templates/organization/partials/invitation_item.html").read_text()
     assert "url_for('delete_invitation')" in content
     assert "url_for('resend_invitation')" in content
     assert "hx-confirm" in content
 
 
 def test_remove_member_forms_include_confirm():
+    content = Path("templates/organization/partials/member_row.html").read_text()
+    assert "url_for('remove_user_from_organization')" in content
+    assert "hx-confirm" in content
+
+
+def test_member_and_role_tables_render_shared_row_partials():
+    """Full tables and row-level OOB swaps must render identical rows."""
     for path in (
         "templates/organization/modals/members_card.html",
         "templates/organization/partials/members_table.html",
-        "templates/organization/partials/member_row.html",
     ):
         content = Path(path).read_text()
-        assert "url_for('remove_user_from_organization')" in content
-        assert "hx-confirm" in content
+        assert "organization/partials/members_list.html" in content
+        assert "organization/partials/member_role_modal.html" in content
+    members_list = Path("templates/organization/partials/members_list.html")
+    assert "organization/partials/member_page.html" in members_list.read_text()
+    member_page = Path("templates/organization/partials/member_page.html")
+    assert "organization/partials/member_row.html" in member_page.read_text()
+    for path in (
+        "templates/organization/modals/roles_card.html",
+        "templates/organization/partials/roles_table.html",
+    ):
+        content = Path(path).read_text()
+        assert "organization/partials/role_row.html" in content
+        assert "organization/partials/role_modal.html" in content
 
 
 def test_edit_organization_form_has_hx_post():
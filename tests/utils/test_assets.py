@@ -0,0 +1,111 @@
+import io
+from pathlib import Path
+
+import pytest
+
+from utils.core import assets
+
+
+def test_generated_assets_are_up_to_date():
+    """bundle.js and assets.html must be rebuilt whenever a source script changes."""
+    stale = assets.build(write=False)
+    assert not stale, (
+        f"Stale generated assets {stale}; run `uv run python -m utils.core.assets`"
+    )
+
+
+def test_bundle_concatenates_first_party_scripts_in_order():
+    bundle = assets.build_bundle().decode()
+    ui_index = bundle.index("// --- static/js/ui.js ---")
+    app_index = bundle.index("// --- static/js/app.js ---")
+    assert ui_index < app_index
+    assert Path("static/js/app.js").read_text().strip() in bundle
+
+
+def test_vendored_scripts_precede_first_party_scripts(tmp_path, monkeypatch):
+    monkeypatch.setattr(assets, "VENDOR_DIR", tmp_path)
+    (tmp_path / "htmx.min.js").write_text("var htmx={};")
+
+    bundle = assets.build_bundle().decode()
+    partial = assets.render_assets_partial(bundle.encode())
+
+    assert bundle.index("var htmx={};") < bundle.index("static/js/remove-me.js")
+    assert bundle.index("static/js/remove-me.js") < bundle.index("static/js/ui.js")
+    assert partial.count("<script") == 1
+
+
+def test_missing_vendor_script_fails_the_build(tmp_path, monkeypatch):
+    monkeypatch.setattr(assets, "VENDOR_DIR", tmp_path)
+
+    with pytest.raises(FileNotFoundError, match="htmx.min.js"):
+        assets.build_bundle()
+
+
+def test_partial_loads_nothing_from_third_party_origins():
+    partial = assets.render_assets_partial(assets.build_bundle())
+
+    assert "https://" not in partial
+    assert "http://" not in partial
+    assert "preconnect" not in partial
+
+
+def test_partial_cache_busts_bundle_by_content_hash():
+    first = assets.render_assets_partial(b"one")
+    second = assets.render_assets_partial(b"two")
+    assert f"?v={assets.content_hash(b'one')}" in first
+    assert first != second
+
+
+def test_local_fonts_get_preload_hints(tmp_path, monkeypatch):
+    fonts_dir = tmp_path / "vendor" / "fonts"
+    fonts_dir.mkdir(parents=True)
+    (fonts_dir / "ibm-plex-sans-400.woff2").write_bytes(b"font")
+    fonts_css = tmp_path / "css" / "fonts.css"
+    fonts_css.parent.mkdir()
+    fonts_css.write_text("@font-face {}")
+    monkeypatch.setattr(assets, "STATIC_DIR", tmp_path)
+    monkeypatch.setattr(assets, "FONTS_DIR", fonts_dir)
+    monkeypatch.setattr(assets, "FONTS_CSS_PATH", fonts_css)
+
+    partial = assets.render_assets_partial(b"bundle")
+
+    assert "vendor/fonts/ibm-plex-sans-400.woff2" in partial
+    assert 'as="font" type="font/woff2" crossorigin' in partial
+    assert "fonts.googleapis.com" not in partial
+
+
+def test_partial_without_local_fonts_falls_back_to_system_fonts(tmp_path, monkeypatch):
+    monkeypatch.setattr(assets, "FONTS_DIR", tmp_path / "missing")
+
+    partial = assets.render_assets_partial(b"bundle")
+
+    assert "font" not in partial
+    assert "fonts.googleapis.com" not in partial
+
+
+def test_subset_font_keeps_only_requested_glyphs():
+    pytest.importorskip("fontTools")
+    pytest.importorskip("brotli")
+    from fontTools.fontBuilder import FontBuilder
+    from fontTools.pens.ttGlyphPen import TTGlyphPen
+    from fontTools.ttLib import TTFont
+
+    glyph_names = [".notdef", "A", "alpha"]
+    builder = FontBuilder(1000, isTTF=True)
+    builder.setupGlyphOrder(glyph_names)
+    builder.setupCharacterMap({ord("A"): "A", 0x03B1: "alpha"})
+    empty_glyph = TTGlyphPen(None).glyph()
+    builder.setupGlyf({name: empty_glyph for name in glyph_names})
+    builder.setupHorizontalMetrics({name: (500, 0) for name in glyph_names})
+    builder.setupHorizontalHeader(ascent=800, descent=-200)
+    builder.setupNameTable({"familyName": "Test", "styleName": "Regular"})
+    builder.setupOS2()
+    builder.setupPost()
+    source = io.BytesIO()
+    builder.save(source)
+
+    subset = TTFont(io.BytesIO(assets.subset_font(source.getvalue())))
+    cmap = subset.getBestCmap()
+    assert cmap is not None
+    assert ord("A") in cmap
+    assert 0x03B1 not in cmap
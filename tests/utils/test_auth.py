@@ -6,6 +6,8 @@ from urllib.parse import urlparse, parse_qs
 from starlette.datastructures import URLPath
 from starlette.responses import Response
 import uuid
+from sqlalchemy import Engine, event
+from sqlmodel import Session, select
 from main import app
 from utils.core.auth import (
     create_access_token,
@@ -19,7 +21,10 @@ from utils.core.auth import (
     auth_cookie_max_ages,
     set_auth_cookies,
     refresh_token_is_persistent,
+    create_tracked_refresh_token,
+    revoke_all_refresh_tokens,
 )
+from utils.core.models import Account, RefreshToken
 
 
 def test_convert_python_regex_to_html() -> None:
@@ -199,3 +204,54 @@ def test_refresh_token_is_persistent(env_vars) -> None:
         jti=str(uuid.uuid4()),
     )
     assert refresh_token_is_persistent(session_token) is False
+
+
+def test_access_token_carries_token_version(env_vars) -> None:
+    decoded = validate_token(
+        create_access_token({"sub": "test@example.com"}, token_version=3), "access"
+    )
+    assert decoded is not None
+    assert decoded["ver"] == 3
+
+
+def test_revoke_all_refresh_tokens_is_set_based(
+    session: Session, test_account: Account
+) -> None:
+    for _ in range(3):
+        create_tracked_refresh_token(test_account.id, test_account.email, session)
+    session.commit()
+    account_id = test_account.id
+    assert account_id is not None
+
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", record)
+    try:
+        revoked = revoke_all_refresh_tokens(account_id, session)
+    finally:
+        event.remove(Engine, "before_cursor_execute", record)
+    session.commit()
+
+    assert revoked == 3
+    assert [s.split()[0] for s in statements] == ["UPDATE", "UPDATE"]
+    assert test_account.token_version == 1
+    assert all(
+        token.revoked
+        for token in session.exec(
+            select(RefreshToken).where(RefreshToken.account_id == test_account.id)
+        )
+    )
+
+    # Keeping access tokens valid leaves the version alone
+    assert (
+        revoke_all_refresh_tokens(
+            test_account.id, session, invalidate_access_tokens=False
+        )
+        == 0
+    )
+    session.commit()
+    session.refresh(test_account)
+    assert test_account.token_version == 1
@@ -0,0 +1,250 @@
+import asyncio
+import gzip
+import zlib
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import HTMLResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from utils.core import compression
+from utils.core.compression import (
+    CompressionMiddleware,
+    CompressionSettings,
+    negotiate_encoding,
+)
+
+LARGE_HTML = "<tr><td>Member</td><td>member@example.com</td></tr>" * 200
+
+
+def _client(settings: CompressionSettings | None = None) -> TestClient:
+    app = FastAPI()
+    app.add_middleware(
+        CompressionMiddleware, settings=settings or CompressionSettings()
+    )
+
+    @app.get("/large")
+    def large():
+        return HTMLResponse(LARGE_HTML)
+
+    @app.get("/small")
+    def small():
+        return HTMLResponse("<p>hi</p>")
+
+    @app.get("/avatar")
+    def avatar():
+        return Response(b"\x89PNG" + b"\x00" * 4096, media_type="image/png")
+
+    @app.get("/precompressed")
+    def precompressed():
+        return Response(
+            gzip.compress(LARGE_HTML.encode()),
+            media_type="text/html",
+            headers={"Content-Encoding": "gzip"},
+        )
+
+    @app.get("/etag")
+    def etag():
+        return HTMLResponse(LARGE_HTML, headers={"ETag": '"abc123"'})
+
+    @app.get("/partial")
+    def partial():
+        body = LARGE_HTML.encode()[:2048]
+        return Response(
+            body,
+            status_code=206,
+            media_type="text/html",
+            headers={"Content-Range": f"bytes 0-2047/{len(LARGE_HTML)}"},
+        )
+
+    @app.get("/small-stream")
+    def small_stream():
+        return StreamingResponse(
+            iter([b"<p>hi</p>", b"<p>there</p>"]),
+            media_type="text/html",
+            headers={"Content-Length": "20"},
+        )
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(
+            iter([LARGE_HTML.encode(), LARGE_HTML.encode()]), media_type="text/html"
+        )
+
+    return TestClient(app)
+
+
+def _get_raw(client: TestClient, path: str, accept_encoding: str):
+    with client.stream("GET", path, headers={"Accept-Encoding": accept_encoding}) as r:
+        return r, b"".join(r.iter_raw())
+
+
+@pytest.mark.parametrize(
+    "header, available, expected",
+    [
+        ("gzip, deflate, br, zstd", ["br", "zstd", "gzip"], "br"),
+        ("gzip, br;q=0.5", ["br", "zstd", "gzip"], "gzip"),
+        ("br;q=0, gzip", ["br", "gzip"], "gzip"),
+        ("*", ["zstd", "gzip"], "zstd"),
+        ("identity", ["br", "gzip"], None),
+        ("", ["gzip"], None),
+        ("gzip;q=invalid", ["gzip"], None),
+    ],
+)
+def test_negotiate_encoding(header, available, expected):
+    assert negotiate_encoding(header, available) == expected
+
+
+def test_large_html_is_gzip_compressed():
+    response, raw = _get_raw(_client(), "/large", "gzip")
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert int(response.headers["content-length"]) == len(raw)
+    assert gzip.decompress(raw).decode() == LARGE_HTML
+
+
+def test_small_response_below_threshold_is_not_compressed():
+    response, raw = _get_raw(_client(), "/small", "gzip")
+    assert "content-encoding" not in response.headers
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert raw == b"<p>hi</p>"
+
+
+def test_minimum_size_is_tunable():
+    response, _ = _get_raw(
+        _client(CompressionSettings(minimum_size=1)), "/small", "gzip"
+    )
+    assert response.headers["content-encoding"] == "gzip"
+
+
+def test_images_are_not_compressed():
+    response, raw = _get_raw(_client(), "/avatar", "gzip")
+    assert "content-encoding" not in response.headers
+    assert raw.startswith(b"\x89PNG")
+
+
+def test_already_encoded_response_is_passed_through():
+    response, raw = _get_raw(_client(), "/precompressed", "gzip")
+    assert response.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(raw).decode() == LARGE_HTML
+
+
+def test_no_accept_encoding_returns_identity():
+    response, raw = _get_raw(_client(), "/large", "identity")
+    assert "content-encoding" not in response.headers
+    assert raw.decode() == LARGE_HTML
+
+
+def test_streaming_response_is_compressed_without_content_length():
+    response, raw = _get_raw(_client(), "/stream", "gzip")
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert gzip.decompress(raw).decode() == LARGE_HTML * 2
+
+
+def _stream_decompressor(encoding: str):
+    """An incremental decoder for encoding, skipping if its package is missing."""
+    if encoding == "br":
+        return pytest.importorskip("brotli").Decompressor().process
+    if encoding == "zstd":
+        zstandard = pytest.importorskip("zstandard")
+        return zstandard.ZstdDecompressor().decompressobj().decompress
+    return zlib.decompressobj(31).decompress
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "br", "zstd"])
+def test_each_streamed_chunk_is_flushed(encoding):
+    decompress = _stream_decompressor(encoding)
+    first, second = LARGE_HTML.encode(), b"<p>done</p>"
+
+    async def app(scope, receive, send):
+        headers = [(b"content-type", b"text/html")]
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": first, "more_body": True})
+        await send({"type": "http.response.body", "body": second})
+
+    messages: list[dict] = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(b"accept-encoding", encoding.encode())],
+    }
+    asyncio.run(CompressionMiddleware(app)(scope, receive, send))
+
+    start = next(m for m in messages if m["type"] == "http.response.start")
+    assert (b"content-encoding", encoding.encode()) in start["headers"]
+    bodies = [m["body"] for m in messages if m["type"] == "http.response.body"]
+    # The first chunk decodes in full before the rest of the stream arrives
+    assert decompress(bodies[0]) == first
+    assert decompress(b"".join(bodies[1:])) == second
+
+
+@pytest.mark.parametrize("encoding", ["br", "zstd"])
+def test_optional_encodings_are_negotiated_when_installed(encoding):
+    for path, expected in (("/large", LARGE_HTML), ("/stream", LARGE_HTML * 2)):
+        decompress = _stream_decompressor(encoding)
+        response, raw = _get_raw(_client(), path, f"gzip;q=0.5, {encoding}")
+        assert response.headers["content-encoding"] == encoding
+        assert decompress(raw).decode() == expected
+
+
+def test_strong_etag_is_weakened_when_compressed():
+    response, _ = _get_raw(_client(), "/etag", "gzip")
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == 'W/"abc123"'
+
+    response, _ = _get_raw(_client(), "/etag", "identity")
+    assert response.headers["etag"] == '"abc123"'
+
+
+def test_partial_content_is_not_compressed():
+    response, raw = _get_raw(_client(), "/partial", "gzip")
+    assert response.status_code == 206
+    assert "content-encoding" not in response.headers
+    assert raw == LARGE_HTML.encode()[:2048]
+
+
+def test_small_streamed_response_with_content_length_is_not_compressed():
+    response, raw = _get_raw(_client(), "/small-stream", "gzip")
+    assert "content-encoding" not in response.headers
+    assert raw == b"<p>hi</p><p>there</p>"
+
+
+def test_brotli_preferred_when_available():
+    brotli = pytest.importorskip("brotli")
+    assert compression.brotli is not None
+    response, raw = _get_raw(_client(), "/large", "gzip, br")
+    assert response.headers["content-encoding"] == "br"
+    assert brotli.decompress(raw).decode() == LARGE_HTML
+
+
+def test_zstd_used_when_preferred_by_client():
+    zstandard = pytest.importorskip("zstandard")
+    response, raw = _get_raw(_client(), "/stream", "zstd, gzip;q=0.5")
+    assert response.headers["content-encoding"] == "zstd"
+    decompressed = zstandard.ZstdDecompressor().decompressobj().decompress(raw)
+    assert decompressed.decode() == LARGE_HTML * 2
+
+
+def test_settings_read_levels_from_env(monkeypatch):
+    monkeypatch.setenv("COMPRESSION_MINIMUM_SIZE", "10")
+    monkeypatch.setenv("COMPRESSION_GZIP_LEVEL", "1")
+    settings = CompressionSettings.from_env()
+    assert settings.minimum_size == 10
+    assert settings.gzip_level == 1
+    assert settings.brotli_quality == CompressionSettings().brotli_quality
+
+
+def test_app_compresses_html_pages(unauth_client):
+    response = unauth_client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] in {"gzip", "br", "zstd"}
+    assert "<!DOCTYPE html>" in response.text
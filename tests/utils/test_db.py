@@ -1,11 +1,16 @@
 import pytest
 from sqlmodel import Session, select, inspect
-from sqlalchemy import Engine
+from sqlalchemy import Engine, event
+from sqlalchemy.exc import IntegrityError
 from utils.core.db import (
+    DEFAULT_ROLE_PERMISSIONS,
     get_connection_url,
+    get_default_role_permission_ids,
+    get_permission_ids,
     assign_permissions_to_role,
     create_default_roles,
     create_permissions,
+    schema_fingerprint,
     seed_account_emails,
     tear_down_db,
     set_up_db,
@@ -17,6 +22,8 @@ from utils.core.models import (
     Permission,
     Organization,
     RolePermissionLink,
+    SchemaVersion,
+    email_matches,
 )
 from utils.core.auth import get_password_hash
 from utils.core.enums import ValidPermissions
@@ -207,6 +214,56 @@ def test_create_default_roles(session: Session, test_organization: Organization)
     }
 
 
+def test_default_role_permission_template(session: Session):
+    """The cached template maps each default role to its permission ids"""
+    permission_ids = get_permission_ids(session)
+    assert set(permission_ids) == {
+        str(p) for p in list(ValidPermissions) + list(AppPermissions)
+    }
+    template = get_default_role_permission_ids(session)
+    for role_name, permission_names in DEFAULT_ROLE_PERMISSIONS.items():
+        assert template[role_name] == sorted(
+            permission_ids[name] for name in permission_names
+        )
+    assert template["Member"] == []
+
+
+def test_create_default_roles_uses_two_inserts(engine: Engine, session: Session):
+    """Roles and their permission links are each written with one INSERT"""
+    organization = Organization(name="Bulk Roles Organization")
+    session.add(organization)
+    session.commit()
+    assert organization.id is not None
+    # Warm the per-process permission cache so only the writes are counted
+    get_default_role_permission_ids(session)
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        create_default_roles(session, organization.id, check_first=False)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    inserts = [s for s in statements if s.lstrip().upper().startswith("INSERT")]
+    assert len(inserts) == 2
+
+
+def test_create_default_roles_check_first_is_idempotent(
+    session: Session, test_organization: Organization
+):
+    """Re-running with check_first reuses existing roles and links"""
+    assert test_organization.id is not None
+    first = create_default_roles(session, test_organization.id, check_first=True)
+    link_count = len(session.exec(select(RolePermissionLink)).all())
+    second = create_default_roles(session, test_organization.id, check_first=True)
+
+    assert {r.id for r in first} == {r.id for r in second}
+    assert len(session.exec(select(RolePermissionLink)).all()) == link_count
+
+
 def test_assign_permissions_to_role(session: Session, test_organization: Organization):
     """Test that assign_permissions_to_role correctly assigns permissions"""
     # Create a test role with the organization from fixture
@@ -339,6 +396,69 @@ def test_public_tables_in_public_schema(engine: Engine):
     assert "emailverificationtoken" not in public_tables
 
 
+@pytest.mark.parametrize(
+    "schema,table,index_name,columns,predicate",
+    [
+        (
+            "public",
+            "invitation",
+            "ix_invitation_pending_organization_id_created_at",
+            ["organization_id", "created_at"],
+            "used IS FALSE",
+        ),
+        (
+            "private",
+            "refreshtoken",
+            "ix_refreshtoken_live_account_id",
+            ["account_id"],
+            "revoked IS FALSE",
+        ),
+        (
+            "public",
+            "organization",
+            "ix_organization_live_name",
+            ["name"],
+            "deleting_at IS NULL",
+        ),
+        (
+            "private",
+            "accountemail",
+            "ix_accountemail_verified_account_id",
+            ["account_id"],
+            "verified",
+        ),
+    ],
+)
+def test_hot_lookup_partial_indexes_exist_after_setup(
+    engine: Engine, schema, table, index_name, columns, predicate
+):
+    """The partial indexes behind hot lookups are created with their predicates."""
+    indexes = {
+        index["name"]: index
+        for index in inspect(engine).get_indexes(table, schema=schema)
+    }
+    assert index_name in indexes
+    index = indexes[index_name]
+    assert index["column_names"] == columns
+    assert predicate in index.get("dialect_options", {}).get("postgresql_where", "")
+
+
+def test_account_email_unique_ignores_case(session: Session):
+    """The lower(email) unique index rejects an address differing only in case."""
+    session.add(Account(email="casing@example.com", hashed_password="x"))
+    session.commit()
+
+    session.add(Account(email="Casing@example.com", hashed_password="x"))
+    with pytest.raises(IntegrityError, match="uq_account_lower_email"):
+        session.commit()
+    session.rollback()
+
+    account = session.exec(
+        select(Account).where(email_matches(Account.email, "CASING@EXAMPLE.COM"))
+    ).one()
+    assert account.email == "casing@example.com"
+
+
 def test_set_up_db_drop_flag(engine: Engine, session: Session):
     """Test that set_up_db's drop flag properly recreates tables"""
     # Set up db with drop=True
@@ -365,6 +485,34 @@ def test_set_up_db_drop_flag(engine: Engine, session: Session):
     )
 
 
+def test_set_up_db_skips_work_when_schema_is_current(session: Session):
+    """A current fingerprint short-circuits setup; a stale one re-runs it."""
+    version = session.get(SchemaVersion, 1)
+    assert version is not None
+    assert version.fingerprint == schema_fingerprint()
+
+    permission = session.exec(select(Permission)).first()
+    assert permission is not None
+    session.delete(permission)
+    session.commit()
+
+    set_up_db()
+    assert len(session.exec(select(Permission)).all()) == (
+        len(ValidPermissions) + len(AppPermissions) - 1
+    )
+
+    version.fingerprint = "stale"
+    session.add(version)
+    session.commit()
+
+    set_up_db()
+    assert len(session.exec(select(Permission)).all()) == (
+        len(ValidPermissions) + len(AppPermissions)
+    )
+    session.refresh(version)
+    assert version.fingerprint == schema_fingerprint()
+
+
 # --- Seed AccountEmail Tests ---
 
 
@@ -409,3 +557,26 @@ def test_seed_is_idempotent(session: Session):
 
     emails = session.exec(select(AccountEmail)).all()
     assert len(emails) == 1
+
+
+def test_seed_skips_accounts_whose_email_is_already_claimed(session: Session):
+    """An address another account already holds is left alone, not a crash."""
+    holder = Account(
+        email="holder@example.com", hashed_password=get_password_hash("Test123!@#")
+    )
+    legacy = Account(
+        email="claimed@example.com", hashed_password=get_password_hash("Test123!@#")
+    )
+    session.add(holder)
+    session.add(legacy)
+    session.commit()
+    assert holder.id is not None
+    session.add(AccountEmail(account_id=holder.id, email="claimed@example.com"))
+    session.commit()
+
+    seed_account_emails(session)
+
+    emails = session.exec(
+        select(AccountEmail).where(AccountEmail.email == "claimed@example.com")
+    ).all()
+    assert [email.account_id for email in emails] == [holder.id]
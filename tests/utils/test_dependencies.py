@@ -324,6 +324,8 @@ def test_validate_token_and_get_user() -> None:
     session = MagicMock()
     mock_user = User(id=1, name="Test User")
     mock_account = Account(id=1, email="test@example.com", user=mock_user)
+    # The user is queried with its account and avatar eagerly loaded
+    session.exec.return_value.first.return_value = mock_user
 
     # Test with valid access token
     with patch(
@@ -371,6 +373,7 @@ def test_validate_token_and_get_user() -> None:
     ) as mock_validate:
         mock_account_no_user = Account(id=1, email="test@example.com", user=None)
         mock_validate.return_value = (mock_account_no_user, None, None)
+        session.exec.return_value.first.return_value = None
         user, access_token, refresh_token = validate_token_and_get_user(
             "valid_token", "access", session
         )
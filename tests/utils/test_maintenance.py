@@ -0,0 +1,280 @@
+import threading
+import time
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import Engine, func, text
+from sqlmodel import Session, select
+
+from utils.core import maintenance
+from utils.core.maintenance import (
+    JANITORS,
+    MAINTENANCE_LOCK_ID,
+    Janitor,
+    MaintenanceScheduler,
+    TaskJanitor,
+    purge_in_batches,
+    rotate_rate_limit_partitions,
+)
+from utils.core.models import (
+    Account,
+    Invitation,
+    Organization,
+    PasswordResetToken,
+    RateLimitAttempt,
+    RefreshToken,
+)
+from utils.core.organizations import (
+    ORGANIZATION_DELETE_RETRY_AFTER,
+    resume_stalled_organization_deletions,
+)
+from utils.core.partitions import (
+    create_partitions,
+    is_partitioned,
+    list_partitions,
+    partition_name,
+    partition_start,
+)
+
+
+def _janitor(name: str) -> Janitor:
+    return next(
+        janitor
+        for janitor in JANITORS
+        if isinstance(janitor, Janitor) and janitor.name == name
+    )
+
+
+def _add_refresh_tokens(
+    session: Session, account: Account, count: int, expires_in: timedelta
+) -> None:
+    for _ in range(count):
+        session.add(
+            RefreshToken(
+                account_id=account.id, expires_at=datetime.now(UTC) + expires_in
+            )
+        )
+    session.commit()
+
+
+def test_purge_deletes_expired_refresh_tokens_in_batches(
+    engine: Engine, session: Session, test_account: Account
+):
+    _add_refresh_tokens(session, test_account, 5, timedelta(hours=-1))
+    _add_refresh_tokens(session, test_account, 1, timedelta(hours=1))
+
+    with engine.connect() as connection:
+        deleted = purge_in_batches(connection, _janitor("refresh_tokens"), batch_size=2)
+
+    assert deleted == 5
+    remaining = session.exec(select(RefreshToken)).all()
+    assert len(remaining) == 1
+    assert not remaining[0].is_expired()
+
+
+def test_purge_removes_used_and_expired_single_use_tokens(
+    engine: Engine, session: Session, test_account: Account
+):
+    later = datetime.now(UTC) + timedelta(hours=1)
+    session.add(PasswordResetToken(account_id=test_account.id, used=True))
+    session.add(
+        PasswordResetToken(
+            account_id=test_account.id, expires_at=datetime.now(UTC) - timedelta(1)
+        )
+    )
+    session.add(PasswordResetToken(account_id=test_account.id, expires_at=later))
+    session.commit()
+
+    with engine.connect() as connection:
+        assert purge_in_batches(connection, _janitor("password_reset_tokens")) == 2
+
+    remaining = session.exec(select(PasswordResetToken)).one()
+    assert remaining.used is False
+
+
+def test_purge_keeps_accepted_invitations(
+    engine: Engine,
+    session: Session,
+    test_invitation: Invitation,
+    expired_invitation: Invitation,
+    used_invitation: Invitation,
+):
+    used_invitation.expires_at = datetime.now(UTC) - timedelta(days=1)
+    session.add(used_invitation)
+    session.commit()
+
+    with engine.connect() as connection:
+        assert purge_in_batches(connection, _janitor("expired_invitations")) == 1
+
+    tokens = set(session.exec(select(Invitation.token)).all())
+    assert tokens == {test_invitation.token, used_invitation.token}
+
+
+def test_rotation_drops_rate_limit_partitions_outside_every_window(
+    engine: Engine, session: Session, monkeypatch
+):
+    monkeypatch.setenv("RATE_LIMIT_BACKEND", "postgres")
+    now = datetime.now(UTC)
+    with engine.connect() as connection:
+        create_partitions(connection, now - timedelta(days=1), ahead=0)
+        create_partitions(connection, now, ahead=0)
+        connection.commit()
+    session.add(
+        RateLimitAttempt(
+            scope="login_ip", key="old", attempted_at=now - timedelta(days=1)
+        )
+    )
+    session.add(RateLimitAttempt(scope="login_ip", key="recent"))
+    session.commit()
+
+    with engine.connect() as connection:
+        assert rotate_rate_limit_partitions(connection, now) == 1
+        remaining = list_partitions(connection)
+
+    assert session.exec(select(RateLimitAttempt.key)).all() == ["recent"]
+    assert partition_name(partition_start(now + timedelta(hours=3))) in remaining
+
+
+def test_rotation_is_skipped_for_the_memory_backend(engine: Engine, monkeypatch):
+    monkeypatch.delenv("RATE_LIMIT_BACKEND", raising=False)
+    with engine.connect() as connection:
+        assert rotate_rate_limit_partitions(connection, datetime.now(UTC)) == 0
+        assert list_partitions(connection) == {}
+
+
+def test_rotation_warns_once_about_an_unpartitioned_table(
+    engine: Engine, monkeypatch, caplog
+):
+    """A database from before partitioning gets a warning, not a failing tick."""
+    monkeypatch.setenv("RATE_LIMIT_BACKEND", "postgres")
+    monkeypatch.setattr(maintenance, "_unpartitioned_warned", False)
+    with engine.connect() as connection:
+        connection.execute(text("DROP TABLE private.ratelimitattempt"))
+        connection.execute(
+            text(
+                "CREATE TABLE private.ratelimitattempt "
+                "(id serial PRIMARY KEY, scope varchar NOT NULL, "
+                "key varchar NOT NULL, attempted_at timestamp NOT NULL)"
+            )
+        )
+        connection.commit()
+
+    with engine.connect() as connection:
+        for _ in range(2):
+            assert rotate_rate_limit_partitions(connection, datetime.now(UTC)) == 0
+        assert not is_partitioned(connection)
+
+    warnings = [
+        record
+        for record in caplog.records
+        if "migrations.partition_rate_limit_attempts" in record.getMessage()
+    ]
+    assert len(warnings) == 1
+
+
+def test_stalled_organization_deletions_are_resumed(engine: Engine, session: Session):
+    now = datetime.now(UTC)
+    stalled = Organization(
+        name="Stalled",
+        deleting_at=now - ORGANIZATION_DELETE_RETRY_AFTER - timedelta(minutes=1),
+    )
+    in_progress = Organization(name="In progress", deleting_at=now)
+    active = Organization(name="Active")
+    session.add_all([stalled, in_progress, active])
+    session.commit()
+    stalled_id = stalled.id
+
+    with engine.connect() as connection:
+        assert resume_stalled_organization_deletions(connection, now) == 1
+
+    session.expire_all()
+    assert session.get(Organization, stalled_id) is None
+    assert session.exec(
+        select(Organization.name).order_by(Organization.name)
+    ).all() == [
+        "Active",
+        "In progress",
+    ]
+
+
+def test_scheduler_records_stats_when_leader(
+    engine: Engine, session: Session, test_account: Account
+):
+    _add_refresh_tokens(session, test_account, 3, timedelta(hours=-1))
+    scheduler = MaintenanceScheduler(engine=engine)
+
+    assert scheduler.run_once() is True
+
+    stats = scheduler.stats["refresh_tokens"]
+    assert stats.runs == 1
+    assert stats.rows_deleted == stats.last_rows_deleted == 3
+    assert stats.last_run_at is not None
+    assert all(s.runs == 1 for s in scheduler.stats.values())
+
+
+def test_scheduler_skips_tick_while_another_worker_leads(
+    engine: Engine, session: Session, test_account: Account
+):
+    _add_refresh_tokens(session, test_account, 1, timedelta(hours=-1))
+    scheduler = MaintenanceScheduler(engine=engine)
+
+    with engine.connect() as other_worker:
+        other_worker.execute(select(func.pg_advisory_lock(MAINTENANCE_LOCK_ID)))
+        try:
+            assert scheduler.run_once() is False
+        finally:
+            other_worker.execute(select(func.pg_advisory_unlock(MAINTENANCE_LOCK_ID)))
+
+    assert scheduler.stats["refresh_tokens"].runs == 0
+    assert len(session.exec(select(RefreshToken)).all()) == 1
+
+
+def test_leader_lock_is_held_only_for_the_tick(engine: Engine):
+    """The lock lives in a transaction for the tick and nothing survives it."""
+    held_during_tick = []
+
+    def probe(connection, now):
+        with engine.connect() as other_worker:
+            held_during_tick.append(
+                not other_worker.execute(
+                    select(func.pg_try_advisory_xact_lock(MAINTENANCE_LOCK_ID))
+                ).scalar()
+            )
+        return 0
+
+    scheduler = MaintenanceScheduler(
+        janitors=(TaskJanitor("probe", probe, "probes"),), engine=engine
+    )
+    assert scheduler.run_once() is True
+    assert held_during_tick == [True]
+
+    with engine.connect() as connection:
+        advisory_locks = connection.execute(
+            text("SELECT count(*) FROM pg_locks WHERE locktype = 'advisory'")
+        ).scalar()
+    assert advisory_locks == 0
+
+
+def test_stop_does_not_wait_forever_for_a_running_tick(engine: Engine):
+    started, release = threading.Event(), threading.Event()
+
+    def slow(connection, now):
+        started.set()
+        release.wait(10)
+        return 0
+
+    scheduler = MaintenanceScheduler(
+        janitors=(TaskJanitor("slow", slow, "items"),),
+        interval_seconds=0,
+        engine=engine,
+    )
+    scheduler.start()
+    thread = scheduler._thread
+    assert thread is not None
+    try:
+        assert started.wait(5)
+        began = time.monotonic()
+        scheduler.stop(timeout_seconds=0.1)
+        assert time.monotonic() - began < 2
+    finally:
+        release.set()
+        thread.join(5)
@@ -0,0 +1,107 @@
+import json
+import os
+from pathlib import Path
+
+from utils.core.metrics import (
+    Counter,
+    Gauge,
+    Histogram,
+    MetricsFlusher,
+    Registry,
+    collect,
+    merge_snapshots,
+    render,
+)
+
+
+def _registry() -> tuple[Registry, Counter, Gauge, Histogram]:
+    registry = Registry()
+    counter = Counter("jobs_total", "Jobs run.", ("queue",), registry=registry)
+    gauge = Gauge("jobs_running", "Jobs running.", registry=registry)
+    histogram = Histogram(
+        "job_seconds", "Job time.", ("queue",), buckets=(0.1, 1.0), registry=registry
+    )
+    return registry, counter, gauge, histogram
+
+
+def test_render_exposition_format():
+    registry, counter, gauge, histogram = _registry()
+    counter.inc("default")
+    counter.inc("default", amount=2)
+    gauge.inc()
+    histogram.observe(0.05, 'say "hi"')
+    histogram.observe(0.5, 'say "hi"')
+    histogram.observe(5, 'say "hi"')
+
+    text = render(registry.snapshot())
+
+    assert "# TYPE jobs_total counter\n" in text
+    assert 'jobs_total{queue="default"} 3\n' in text
+    assert "jobs_running 1\n" in text
+    # Buckets are cumulative and label values escaped
+    assert 'job_seconds_bucket{queue="say \\"hi\\"",le="0.1"} 1\n' in text
+    assert 'job_seconds_bucket{queue="say \\"hi\\"",le="1"} 2\n' in text
+    assert 'job_seconds_bucket{queue="say \\"hi\\"",le="+Inf"} 3\n' in text
+    assert 'job_seconds_count{queue="say \\"hi\\""} 3\n' in text
+    assert 'job_seconds_sum{queue="say \\"hi\\""} 5.55\n' in text
+
+
+def test_merge_sums_workers_and_drops_gauges_of_exited_ones():
+    registry, counter, gauge, histogram = _registry()
+    counter.inc("default")
+    gauge.inc()
+    histogram.observe(0.5, "default")
+    snapshot = registry.snapshot()
+
+    merged = merge_snapshots([(snapshot, True), (snapshot, False)])
+    text = render(merged)
+
+    assert 'jobs_total{queue="default"} 2\n' in text
+    assert "jobs_running 1\n" in text
+    assert 'job_seconds_count{queue="default"} 2\n' in text
+
+
+def test_collect_merges_snapshot_files(tmp_path: Path, monkeypatch):
+    registry, counter, _, _ = _registry()
+    counter.inc("default")
+    # An exited worker's file: its counters still count
+    (tmp_path / "999999999.json").write_text(json.dumps(registry.snapshot()))
+    monkeypatch.setenv("METRICS_MULTIPROC_DIR", str(tmp_path))
+
+    text = render(collect(registry))
+
+    assert (tmp_path / f"{os.getpid()}.json").exists()
+    assert 'jobs_total{queue="default"} 2\n' in text
+
+
+def test_collect_ignores_files_that_are_not_snapshots(tmp_path: Path, monkeypatch):
+    registry, counter, _, _ = _registry()
+    counter.inc("default")
+    (tmp_path / "notes.json").write_text(json.dumps({"owner": "ops"}))
+    monkeypatch.setenv("METRICS_MULTIPROC_DIR", str(tmp_path))
+
+    text = render(collect(registry))
+
+    assert 'jobs_total{queue="default"} 1\n' in text
+
+
+def test_flusher_start_removes_snapshots_of_earlier_processes(tmp_path: Path):
+    registry, counter, _, _ = _registry()
+    counter.inc("default")
+    snapshot = json.dumps(registry.snapshot())
+    exited = tmp_path / "999999999.json"
+    reused_pid = tmp_path / f"{os.getpid()}.json"
+    running = tmp_path / f"{os.getppid()}.json"
+    other = tmp_path / "notes.json"
+    for path in (exited, reused_pid, running, other):
+        path.write_text(snapshot)
+
+    flusher = MetricsFlusher(tmp_path, interval_seconds=60)
+    flusher.start()
+    try:
+        assert not exited.exists()
+        assert not reused_pid.exists()
+        assert running.exists()
+        assert other.exists()
+    finally:
+        flusher.stop()
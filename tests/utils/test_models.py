@@ -9,9 +9,11 @@ from utils.core.models import (
     AccountEmail,
     AccountRecoveryToken,
     EmailVerificationToken,
+    Invitation,
     Organization,
     Permission,
     PasswordResetToken,
+    RefreshToken,
     Role,
     RolePermissionLink,
     User,
@@ -523,6 +525,68 @@ def test_user_avatar_database_cascade_delete(session: Session, test_user: User):
     assert session.get(UserAvatar, avatar_id) is None
 
 
+def test_organization_database_cascade_delete(
+    session: Session,
+    org_owner: User,
+    test_organization: Organization,
+    test_invitation: Invitation,
+):
+    """Roles, their links and invitations cascade when an org is deleted in SQL."""
+    organization_id = test_organization.id
+    invitation_id = test_invitation.id
+
+    session.connection().execute(
+        text("DELETE FROM organization WHERE id = :organization_id"),
+        {"organization_id": organization_id},
+    )
+    session.commit()
+    session.expire_all()
+
+    assert (
+        session.exec(select(Role).where(Role.organization_id == organization_id)).all()
+        == []
+    )
+    assert session.exec(select(UserRoleLink)).all() == []
+    assert session.exec(select(RolePermissionLink)).all() == []
+    assert session.get(Invitation, invitation_id) is None
+    assert session.get(User, org_owner.id) is not None
+
+
+def test_account_database_cascade_delete(
+    session: Session,
+    test_account: Account,
+    test_user: User,
+    used_invitation: Invitation,
+):
+    """Deleting an account in SQL removes its user and tokens; accepted invitations stay."""
+    session.add(PasswordResetToken(account_id=test_account.id))
+    session.add(
+        RefreshToken(
+            account_id=test_account.id,
+            expires_at=datetime.now(UTC) + timedelta(days=1),
+        )
+    )
+    used_invitation.accepted_by_user_id = test_user.id
+    session.add(used_invitation)
+    session.commit()
+    user_id = test_user.id
+    invitation_id = used_invitation.id
+
+    session.connection().execute(
+        text('DELETE FROM private."account" WHERE id = :account_id'),
+        {"account_id": test_account.id},
+    )
+    session.commit()
+    session.expire_all()
+
+    assert session.get(User, user_id) is None
+    assert session.exec(select(PasswordResetToken)).all() == []
+    assert session.exec(select(RefreshToken)).all() == []
+    invitation = session.get(Invitation, invitation_id)
+    assert invitation is not None
+    assert invitation.accepted_by_user_id is None
+
+
 # --- EmailVerificationToken model tests ---
 
 
@@ -0,0 +1,27 @@
+from datetime import datetime
+
+import pytest
+
+from exceptions.http_exceptions import InvalidPaginationCursorError
+from utils.core.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trips_values():
+    created_at = datetime(2024, 5, 1, 12, 30)
+    cursor = encode_cursor(created_at.isoformat(), 42)
+    assert "=" not in cursor
+    assert decode_cursor(cursor, datetime.fromisoformat, int) == (created_at, 42)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not-a-cursor",
+        encode_cursor("only-one-value"),
+        encode_cursor("2024-05-01", "not-an-int"),
+        encode_cursor("not-a-date", 1),
+    ],
+)
+def test_tampered_cursor_is_rejected(cursor):
+    with pytest.raises(InvalidPaginationCursorError):
+        decode_cursor(cursor, datetime.fromisoformat, int)
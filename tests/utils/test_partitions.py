@@ -0,0 +1,122 @@
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import Engine, text
+from sqlmodel import Session, select
+
+from utils.core.db import set_up_db
+from utils.core.models import RateLimitAttempt
+from utils.core.partitions import (
+    PARTITIONS_AHEAD,
+    create_partitions,
+    drop_expired_partitions,
+    is_partitioned,
+    list_partitions,
+    partition_name,
+    partition_start,
+)
+from utils.core.rate_limit import PostgresRateLimitWindow
+
+
+def _drop_all_partitions(engine: Engine) -> None:
+    with engine.connect() as connection:
+        for name in list_partitions(connection):
+            connection.execute(text(f"DROP TABLE private.{name}"))
+        connection.commit()
+
+
+def test_partition_start_floors_to_the_utc_hour():
+    moment = datetime(2026, 3, 1, 14, 59, 59, 999, tzinfo=UTC)
+    assert partition_start(moment) == datetime(2026, 3, 1, 14, tzinfo=UTC)
+    assert partition_name(partition_start(moment)) == "ratelimitattempt_p2026030114"
+
+
+def test_set_up_db_partitions_the_table_ahead_of_time(engine: Engine, monkeypatch):
+    monkeypatch.setenv("RATE_LIMIT_BACKEND", "postgres")
+    set_up_db(drop=True)
+    now = datetime.now(UTC)
+    with engine.connect() as connection:
+        assert is_partitioned(connection)
+        partitions = list_partitions(connection)
+
+    expected = {
+        partition_name(partition_start(now + timedelta(hours=offset)))
+        for offset in range(PARTITIONS_AHEAD + 1)
+    }
+    assert expected <= set(partitions)
+
+
+def test_set_up_db_skips_partitions_for_the_memory_backend(engine: Engine, monkeypatch):
+    monkeypatch.delenv("RATE_LIMIT_BACKEND", raising=False)
+    set_up_db(drop=True)
+    with engine.connect() as connection:
+        assert is_partitioned(connection)
+        assert list_partitions(connection) == {}
+
+
+def test_set_up_db_boots_with_an_unpartitioned_table(
+    engine: Engine, monkeypatch, caplog
+):
+    """A database from before partitioning still boots, with a warning."""
+    monkeypatch.setenv("RATE_LIMIT_BACKEND", "postgres")
+    with engine.connect() as connection:
+        connection.execute(text("DROP TABLE private.ratelimitattempt"))
+        connection.execute(
+            text(
+                "CREATE TABLE private.ratelimitattempt "
+                "(id serial PRIMARY KEY, scope varchar NOT NULL, "
+                "key varchar NOT NULL, attempted_at timestamp NOT NULL)"
+            )
+        )
+        connection.execute(text("UPDATE private.schemaversion SET fingerprint = ''"))
+        connection.commit()
+
+    set_up_db()
+
+    with engine.connect() as connection:
+        assert not is_partitioned(connection)
+    assert "migrations.partition_rate_limit_attempts" in caplog.text
+
+
+def test_create_partitions_is_idempotent(engine: Engine):
+    with engine.connect() as connection:
+        assert create_partitions(connection, behind=2) != []
+        assert create_partitions(connection, behind=2) == []
+        connection.commit()
+
+
+def test_drop_keeps_partitions_overlapping_the_retention_window(engine: Engine):
+    now = datetime(2026, 3, 1, 12, 30, tzinfo=UTC)
+    with engine.connect() as connection:
+        create_partitions(connection, now, ahead=0, behind=3)
+        dropped = drop_expired_partitions(connection, timedelta(minutes=90), now)
+        connection.commit()
+        remaining = list_partitions(connection)
+
+    # 10:00-11:00 and earlier end before the 11:00 cutoff; 11:00-12:00 does not
+    assert dropped == ["ratelimitattempt_p2026030109", "ratelimitattempt_p2026030110"]
+    assert "ratelimitattempt_p2026030111" in remaining
+
+
+def test_record_creates_a_missing_partition_on_demand(engine: Engine, session: Session):
+    _drop_all_partitions(engine)
+    limiter = PostgresRateLimitWindow("test_scope", max_attempts=1, window_seconds=60)
+
+    limiter.record("key")
+
+    assert session.exec(select(RateLimitAttempt.key)).all() == ["key"]
+    assert limiter.check("key")[0] is True
+
+
+def test_partitions_can_be_unlogged(engine: Engine, monkeypatch):
+    monkeypatch.setenv("RATE_LIMIT_UNLOGGED", "1")
+    with engine.connect() as connection:
+        (name,) = create_partitions(
+            connection, datetime(2026, 3, 1, 12, tzinfo=UTC), ahead=0
+        )
+        persistence = connection.execute(
+            text("SELECT relpersistence FROM pg_class WHERE oid = to_regclass(:n)"),
+            {"n": f"private.{name}"},
+        ).scalar()
+        connection.commit()
+
+    assert persistence == "u"
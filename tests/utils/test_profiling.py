@@ -0,0 +1,91 @@
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from utils.core.auth import create_access_token
+from utils.core.models import Account
+from utils.core.profiling import (
+    RequestProfiler,
+    _prune,
+    create_profile_token,
+    profile_token_valid,
+)
+
+
+@pytest.fixture
+def profile_dir(tmp_path: Path, monkeypatch) -> Path:
+    monkeypatch.setenv("PROFILE_DIR", str(tmp_path))
+    monkeypatch.setenv("PROFILE_INTERVAL_MS", "1")
+    return tmp_path
+
+
+def test_profile_token_validation(env_vars):
+    assert profile_token_valid(create_profile_token())
+    assert not profile_token_valid(create_profile_token(timedelta(seconds=-1)))
+    assert not profile_token_valid(create_access_token({"sub": "a@example.com"}))
+    assert not profile_token_valid("not-a-token")
+    assert not profile_token_valid(None)
+
+
+def test_signed_header_profiles_request_with_bcrypt_breakdown(
+    unauth_client: TestClient, test_account: Account, profile_dir: Path
+):
+    response = unauth_client.post(
+        app.url_path_for("login"),
+        data={"email": test_account.email, "password": "Test123!@#"},
+        headers={"X-Profile-Token": create_profile_token()},
+    )
+
+    assert response.status_code == 303
+    path = Path(response.headers["X-Profile-Path"])
+    assert path.parent == profile_dir / "account_login"
+    folded = path.read_text()
+    assert "[bcrypt];" in folded
+    # Collapsed stack format: frames joined by ";" then a sample count
+    stacks = dict(line.rsplit(" ", 1) for line in folded.splitlines())
+    assert all(int(count) > 0 for count in stacks.values())
+    assert any("routers/core/account.py:login" in stack for stack in stacks)
+
+
+def test_requests_are_not_profiled_by_default(
+    unauth_client: TestClient, test_account: Account, profile_dir: Path
+):
+    response = unauth_client.post(
+        app.url_path_for("login"),
+        data={"email": test_account.email, "password": "Test123!@#"},
+        headers={"X-Profile-Token": "forged"},
+    )
+
+    assert "X-Profile-Path" not in response.headers
+    assert list(profile_dir.iterdir()) == []
+
+
+def test_sample_rate_profiles_without_header(
+    auth_client: TestClient, profile_dir: Path, monkeypatch
+):
+    monkeypatch.setenv("PROFILE_SAMPLE_RATE", "1")
+    response = auth_client.get(app.url_path_for("read_dashboard"))
+
+    assert response.status_code == 200
+    # Sampled requests don't reveal the profile's location
+    assert "X-Profile-Path" not in response.headers
+    assert len(list((profile_dir / "dashboard").glob("*-GET-200.folded"))) == 1
+
+
+def test_categories_total_samples_per_root():
+    profiler = RequestProfiler({})
+    profiler.stacks.update(
+        {"[sql];a;b": 3, "[template];a;c": 2, "[sql];a;d": 1, "[app];a": 4}
+    )
+    assert profiler.categories() == {"sql": 4, "template": 2, "app": 4}
+
+
+def test_prune_keeps_newest(tmp_path: Path):
+    paths = [tmp_path / f"2026010{i}T000000Z-GET-200.folded" for i in range(5)]
+    for path in paths:
+        path.write_text("")
+    _prune(sorted(paths), keep=2)
+    assert sorted(tmp_path.iterdir()) == paths[3:]
@@ -0,0 +1,54 @@
+import logging
+
+from fastapi.testclient import TestClient
+from sqlalchemy import Engine, text
+
+from main import app
+from utils.core.query_stats import QueryStats, capture_queries, fingerprint
+
+
+def test_fingerprint_ignores_parameter_values_and_in_list_length():
+    one = fingerprint('SELECT "user".id FROM "user"\n  WHERE "user".id IN (%(id_1_1)s)')
+    many = fingerprint(
+        'SELECT "user".id FROM "user" WHERE "user".id IN '
+        "(%(id_1_1)s, %(id_1_2)s, %(id_1_3)s)"
+    )
+    assert one == many == 'SELECT "user".id FROM "user" WHERE "user".id IN (?)'
+
+
+def test_repeated_reports_statements_at_or_over_threshold():
+    stats = QueryStats()
+    for i in range(5):
+        stats.record(f"SELECT role.id FROM role WHERE role.id = %(id_{i})s", 0.001)
+    stats.record("SELECT 1", 0.001)
+
+    assert stats.count == 6
+    assert stats.repeated(5) == [("SELECT role.id FROM role WHERE role.id = ?", 5)]
+    assert stats.repeated(6) == []
+
+
+def test_capture_queries_counts_statements(engine: Engine):
+    with capture_queries() as stats:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+            connection.execute(text("SELECT 2"))
+    assert stats.count == 2
+    assert stats.seconds > 0
+
+
+def test_server_timing_header_only_when_enabled(auth_client: TestClient, monkeypatch):
+    response = auth_client.get(app.url_path_for("read_dashboard"))
+    assert "Server-Timing" not in response.headers
+
+    monkeypatch.setenv("SERVER_TIMING_ENABLED", "1")
+    response = auth_client.get(app.url_path_for("read_dashboard"))
+    assert response.status_code == 200
+    assert response.headers["Server-Timing"].startswith("db;dur=")
+    assert "queries" in response.headers["Server-Timing"]
+
+
+def test_repeated_statements_are_logged(auth_client: TestClient, monkeypatch, caplog):
+    monkeypatch.setenv("N_PLUS_ONE_THRESHOLD", "1")
+    with caplog.at_level(logging.WARNING, logger="uvicorn.error"):
+        auth_client.get(app.url_path_for("read_dashboard"))
+    assert "Possible N+1" in caplog.text
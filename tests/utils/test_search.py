@@ -0,0 +1,45 @@
+from sqlmodel import select, text
+
+from utils.core.search import (
+    create_trigram_indexes,
+    prefix_tsquery,
+    run_with_latency_budget,
+)
+
+
+def test_prefix_tsquery_matches_every_word_as_prefix():
+    assert prefix_tsquery("Quar Rep") == "quar:* & rep:*"
+
+
+def test_prefix_tsquery_drops_tsquery_operators():
+    assert prefix_tsquery("a & !b | (c:*)") == "a:* & b:* & c:*"
+    assert prefix_tsquery("  !&| ") is None
+
+
+def test_latency_budget_returns_result_and_restores_timeout(session):
+    previous = session.exec(text("SHOW statement_timeout")).one()[0]
+    assert run_with_latency_budget(session, lambda: session.exec(select(1)).one()) == 1
+    assert session.exec(text("SHOW statement_timeout")).one()[0] == previous
+
+
+def test_latency_budget_cancels_slow_query(session):
+    result = run_with_latency_budget(
+        session, lambda: session.exec(text("SELECT pg_sleep(1)")).all(), timeout_ms=10
+    )
+    assert result is None
+    # The aborted transaction was rolled back, so the session is usable again
+    assert session.exec(select(1)).one() == 1
+
+
+def test_create_trigram_indexes_matches_extension_availability(engine):
+    with engine.connect() as connection:
+        available = (
+            connection.execute(
+                text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+            ).scalar()
+            is not None
+        )
+        assert create_trigram_indexes(connection) is available
+        # The connection is still usable whether or not the extension exists
+        assert connection.execute(text("SELECT 1")).scalar() == 1
+        connection.rollback()
@@ -0,0 +1,117 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from utils.core.slow_queries import (
+    analyzable,
+    explain_worker,
+    index_advice,
+    main,
+    parameter_shape,
+    sequential_scans,
+)
+
+PLAN = [
+    {
+        "Plan": {
+            "Node Type": "Nested Loop",
+            "Plans": [
+                {
+                    "Node Type": "Seq Scan",
+                    "Relation Name": "invitation",
+                    "Filter": "((NOT used) AND (organization_id = 1))",
+                    "Actual Total Time": 2.5,
+                    "Actual Loops": 2,
+                },
+                {"Node Type": "Index Scan", "Relation Name": "role"},
+            ],
+        }
+    }
+]
+
+
+@pytest.fixture
+def slow_query_log(tmp_path: Path, monkeypatch) -> Path:
+    path = tmp_path / "slow.jsonl"
+    monkeypatch.setenv("SLOW_QUERY_MS", "0.001")
+    monkeypatch.setenv("SLOW_QUERY_LOG", str(path))
+    monkeypatch.setenv("SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS", "0")
+    return path
+
+
+def test_parameter_shape_hides_values():
+    assert parameter_shape({"email_1": "a@example.com", "id_1": 3}) == {
+        "email_1": "str",
+        "id_1": "int",
+    }
+    assert parameter_shape(None) == []
+
+
+def test_only_plain_reads_are_analyzed():
+    assert analyzable("SELECT * FROM role WHERE role.id = %(id_1)s")
+    assert not analyzable("SELECT * FROM role FOR UPDATE")
+    assert not analyzable("UPDATE role SET name = %(name)s")
+    assert not analyzable("WITH gone AS (DELETE FROM role RETURNING id) SELECT 1")
+
+
+def test_sequential_scans_and_index_advice():
+    assert sequential_scans(PLAN) == [("invitation", ("organization_id", "used"), 5.0)]
+
+    advice = index_advice(
+        [
+            {"plan": PLAN, "duration_ms": 40.0, "route": "/organizations/{org_id}"},
+            {"plan": PLAN, "duration_ms": 60.0, "route": None},
+            {"plan": None, "duration_ms": 10.0, "route": None},
+        ]
+    )
+
+    assert advice == [
+        {
+            "table": "invitation",
+            "columns": ["organization_id", "used"],
+            "suggestion": "CREATE INDEX ON invitation (organization_id, used)",
+            "count": 2,
+            "scan_ms": 10.0,
+            "query_ms": 100.0,
+            "routes": ["/organizations/{org_id}"],
+        }
+    ]
+
+
+def test_slow_queries_are_logged_with_route_and_plan(
+    auth_client_owner: TestClient, test_organization, slow_query_log: Path
+):
+    response = auth_client_owner.get(
+        app.url_path_for("read_organization", org_id=test_organization.id)
+    )
+    assert response.status_code == 200
+    explain_worker.join()
+
+    records = [json.loads(line) for line in slow_query_log.read_text().splitlines()]
+    from_page = [r for r in records if r["route"] == "/organizations/{org_id}"]
+    assert from_page
+    explained = [r for r in from_page if r["plan"] is not None]
+    assert explained and all(r["analyzed"] for r in explained)
+    assert "Execution Time" in explained[0]["plan"][0]
+    # Parameter values never reach the log
+    assert all(
+        set(r["parameters"].values()) <= {"int", "str", "bool", "datetime", "list"}
+        for r in records
+        if isinstance(r["parameters"], dict)
+    )
+
+
+def test_report_prints_index_suggestions(tmp_path: Path, monkeypatch, capsys):
+    log = tmp_path / "slow.jsonl"
+    log.write_text(json.dumps({"plan": PLAN, "duration_ms": 40.0, "route": "/x"}))
+    monkeypatch.setattr(sys, "argv", ["slow_queries", str(log)])
+
+    main()
+
+    assert (
+        "CREATE INDEX ON invitation (organization_id, used)" in capsys.readouterr().out
+    )
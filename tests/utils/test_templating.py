@@ -0,0 +1,71 @@
+from pathlib import Path
+
+import pytest
+from sqlalchemy import Engine, inspect
+from sqlmodel import Session
+
+from exceptions.exceptions import LazyLoadDuringRenderError
+from utils.core.auth import create_access_token
+from utils.core.dependencies import validate_token_and_get_user
+from utils.core.models import Account, User, UserAvatar
+from utils.core.templating import create_templates
+
+
+@pytest.fixture
+def email_template(tmp_path: Path) -> Path:
+    (tmp_path / "email.html").write_text("{{ user.account.email }}")
+    return tmp_path
+
+
+def test_strict_render_raises_on_lazy_load(
+    engine: Engine, test_user: User, test_account: Account, email_template: Path
+):
+    templates = create_templates(str(email_template))
+    with Session(engine) as session:
+        user = session.get(User, test_user.id)
+
+        with pytest.raises(LazyLoadDuringRenderError):
+            templates.get_template("email.html").render(user=user)
+
+        # Loaded before rendering, the same attribute is fine
+        assert user is not None and user.account is not None
+        html = templates.get_template("email.html").render(user=user)
+    assert html == test_account.email
+
+
+def test_lazy_loads_allowed_when_strict_render_off(
+    engine: Engine,
+    test_user: User,
+    test_account: Account,
+    email_template: Path,
+    monkeypatch,
+):
+    monkeypatch.setenv("STRICT_RENDER", "0")
+    templates = create_templates(str(email_template))
+    with Session(engine) as session:
+        user = session.get(User, test_user.id)
+        html = templates.get_template("email.html").render(user=user)
+    assert html == test_account.email
+
+
+def test_current_user_loads_avatar_without_image_bytes(
+    engine: Engine, session: Session, test_user: User, test_account: Account
+):
+    assert test_user.id is not None
+    session.add(
+        UserAvatar(
+            user_id=test_user.id,
+            avatar_data=b"image bytes",
+            avatar_content_type="image/png",
+        )
+    )
+    session.commit()
+    token = create_access_token({"sub": test_account.email})
+
+    with Session(engine) as request_session:
+        user, _, _ = validate_token_and_get_user(token, "access", request_session)
+        assert user is not None
+        unloaded = inspect(user).unloaded
+        assert "avatar" not in unloaded and "account" not in unloaded
+        assert user.avatar is not None
+        assert "avatar_data" in inspect(user.avatar).unloaded
@@ -8,6 +8,7 @@ database on startup, as long as this module is imported in utils/core/db.py.
 
 from typing import Optional
 from datetime import datetime
+from sqlalchemy import Index, text
 from sqlmodel import SQLModel, Field
 from utils.core.models import utc_now
 
@@ -15,6 +16,11 @@ from utils.core.models import utc_now
 # --- Replace the example model below with your own application models ---
 
 
+RESOURCE_SEARCH_DOCUMENT = (
+    "to_tsvector('simple', title || ' ' || coalesce(description, ''))"
+)
+
+
 class OrganizationResource(SQLModel, table=True):
     """
     Example application data model representing a resource owned by an
@@ -24,12 +30,29 @@ class OrganizationResource(SQLModel, table=True):
     key). Users with the READ_ORGANIZATION_RESOURCES permission can view these
     resources, users with WRITE_ORGANIZATION_RESOURCES can create/edit them, and
     users with DELETE_ORGANIZATION_RESOURCES can delete them.
+
+    The composite index serves the dashboard's newest-first keyset pagination
+    (see utils/app/resources.py) and, through its leading column, lookups and
+    cascades by organization_id. The GIN index serves full-text search over
+    RESOURCE_SEARCH_DOCUMENT, which queries must repeat verbatim to use it.
     """
 
-    id: Optional[int] = Field(default=None, primary_key=True)
-    organization_id: int = Field(
-        foreign_key="organization.id", ondelete="CASCADE", index=True
+    __table_args__ = (
+        Index(
+            "ix_organizationresource_organization_id_created_at_id",
+            "organization_id",
+            "created_at",
+            "id",
+        ),
+        Index(
+            "ix_organizationresource_search",
+            text(RESOURCE_SEARCH_DOCUMENT),
+            postgresql_using="gin",
+        ),
     )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    organization_id: int = Field(foreign_key="organization.id", ondelete="CASCADE")
     title: str
     description: Optional[str] = None
     created_at: datetime = Field(default_factory=utc_now)
@@ -0,0 +1,333 @@
+"""
+Queries and bulk helpers for the example OrganizationResource model: the
+dashboard's paged list, plus streaming CSV/NDJSON import and export.
+
+Replace or extend these alongside utils/app/models.py.
+"""
+
+import csv
+import io
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import batched
+from typing import IO, Iterable, Iterator
+
+from sqlmodel import Session, col, create_engine, func, select
+from sqlalchemy import literal, literal_column, tuple_
+
+from exceptions.http_exceptions import InvalidResourceImportError
+from utils.app.models import RESOURCE_SEARCH_DOCUMENT, OrganizationResource
+from utils.core.db import get_connection_url
+from utils.core.models import utc_naive_now
+from utils.core.pagination import decode_cursor, encode_cursor
+from utils.core.search import SEARCH_RESULT_LIMIT
+
+RESOURCES_PAGE_SIZE = 50
+DESCRIPTION_PREVIEW_LENGTH = 200
+IMPORT_BATCH_SIZE = 1000
+EXPORT_BATCH_SIZE = 1000
+EXPORT_COLUMNS = ("id", "title", "description", "created_at", "updated_at")
+
+
+@dataclass(frozen=True)
+class ResourceListItem:
+    """The columns the dashboard list shows, without the full description."""
+
+    id: int
+    title: str
+    created_at: datetime
+    description_preview: str | None
+
+    @classmethod
+    def from_resource(cls, resource: OrganizationResource) -> "ResourceListItem":
+        assert resource.id is not None
+        return cls(
+            id=resource.id,
+            title=resource.title,
+            created_at=resource.created_at,
+            description_preview=_preview(resource.description),
+        )
+
+
+@dataclass
+class ResourcePage:
+    resources: list[ResourceListItem]
+    next_cursor: str | None
+    after: str | None = None
+
+    @property
+    def is_first_page(self) -> bool:
+        return self.after is None
+
+
+def _preview(description: str | None) -> str | None:
+    if description is None or len(description) <= DESCRIPTION_PREVIEW_LENGTH:
+        return description
+    return description[:DESCRIPTION_PREVIEW_LENGTH].rstrip() + "…"
+
+
+def load_resource_page(
+    session: Session,
+    organization_id: int,
+    after: str | None = None,
+    limit: int = RESOURCES_PAGE_SIZE,
+) -> ResourcePage:
+    """
+    Load one page of an organization's resources, newest first.
+
+    Rows are ordered by (created_at, id) descending and paged with a keyset
+    cursor, which the (organization_id, created_at, id) index serves as a
+    backward range scan. Only the listed columns are selected, and the
+    description is cut to a short preview in SQL so long bodies never leave
+    the database.
+    """
+    statement = (
+        select(
+            OrganizationResource.id,
+            OrganizationResource.title,
+            OrganizationResource.created_at,
+            func.left(OrganizationResource.description, DESCRIPTION_PREVIEW_LENGTH + 1),
+        )
+        .where(OrganizationResource.organization_id == organization_id)
+        .order_by(
+            col(OrganizationResource.created_at).desc(),
+            col(OrganizationResource.id).desc(),
+        )
+        .limit(limit + 1)
+    )
+    if after:
+        after_created_at, after_id = decode_cursor(after, datetime.fromisoformat, int)
+        statement = statement.where(
+            tuple_(col(OrganizationResource.created_at), col(OrganizationResource.id))
+            < tuple_(literal(after_created_at), literal(after_id))
+        )
+
+    rows = session.exec(statement).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_id, _, last_created_at, _ = rows[-1]
+        next_cursor = encode_cursor(last_created_at.isoformat(), last_id)
+    return ResourcePage(
+        resources=[
+            ResourceListItem(
+                id=resource_id,
+                title=title,
+                created_at=created_at,
+                description_preview=_preview(description),
+            )
+            for resource_id, title, created_at, description in rows
+        ],
+        next_cursor=next_cursor,
+        after=after,
+    )
+
+
+def search_resources(
+    session: Session,
+    organization_id: int,
+    tsquery: str,
+    limit: int = SEARCH_RESULT_LIMIT,
+) -> list[ResourceListItem]:
+    """
+    Full-text search over title and description within one organization, best
+    matches first. tsquery is to_tsquery() syntax, e.g. from prefix_tsquery().
+    The match repeats RESOURCE_SEARCH_DOCUMENT so the GIN index is used.
+    """
+    document = literal_column(RESOURCE_SEARCH_DOCUMENT)
+    query = func.to_tsquery(literal_column("'simple'"), tsquery)
+    rows = session.exec(
+        select(
+            OrganizationResource.id,
+            OrganizationResource.title,
+            OrganizationResource.created_at,
+            func.left(OrganizationResource.description, DESCRIPTION_PREVIEW_LENGTH + 1),
+        )
+        .where(
+            OrganizationResource.organization_id == organization_id,
+            document.op("@@")(query),
+        )
+        .order_by(
+            func.ts_rank(document, query).desc(),
+            col(OrganizationResource.created_at).desc(),
+        )
+        .limit(limit)
+    ).all()
+    return [
+        ResourceListItem(
+            id=resource_id,
+            title=title,
+            created_at=created_at,
+            description_preview=_preview(description),
+        )
+        for resource_id, title, created_at, description in rows
+    ]
+
+
+def has_resources(session: Session, organization_id: int) -> bool:
+    return (
+        session.exec(
+            select(OrganizationResource.id)
+            .where(OrganizationResource.organization_id == organization_id)
+            .limit(1)
+        ).first()
+        is not None
+    )
+
+
+# --- Bulk import ---
+
+
+def detect_import_format(filename: str | None, content_type: str | None) -> str | None:
+    """Return "csv" or "ndjson" from the upload's extension or content type."""
+    name = (filename or "").lower()
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if name.endswith(".csv") or media_type == "text/csv":
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl")) or media_type in (
+        "application/x-ndjson",
+        "application/jsonl",
+    ):
+        return "ndjson"
+    return None
+
+
+def _clean_row(title: object, description: object, line: int) -> tuple[str, str | None]:
+    if not isinstance(title, str) or not title.strip():
+        raise InvalidResourceImportError("title is required", line)
+    if description is not None and not isinstance(description, str):
+        raise InvalidResourceImportError("description must be a string", line)
+    return title.strip(), description or None
+
+
+def _parse_csv(text: IO[str]) -> Iterator[tuple[str, str | None]]:
+    reader = csv.DictReader(text)
+    if reader.fieldnames is None or "title" not in reader.fieldnames:
+        raise InvalidResourceImportError("CSV header must include a title column", 1)
+    for record in reader:
+        yield _clean_row(
+            record.get("title"), record.get("description"), reader.line_num
+        )
+
+
+def _parse_ndjson(text: IO[str]) -> Iterator[tuple[str, str | None]]:
+    for line_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            raise InvalidResourceImportError("invalid JSON", line_number)
+        if not isinstance(record, dict):
+            raise InvalidResourceImportError("expected a JSON object", line_number)
+        yield _clean_row(record.get("title"), record.get("description"), line_number)
+
+
+def parse_resource_import(
+    binary_file: IO[bytes], import_format: str
+) -> Iterator[tuple[str, str | None]]:
+    """
+    Lazily yield (title, description) rows from an uploaded file, reading it
+    line by line so memory use does not grow with the upload. Unknown columns
+    and keys are ignored, so an export can be imported back as-is.
+    """
+    text = io.TextIOWrapper(binary_file, encoding="utf-8-sig", newline="")
+    try:
+        parse = _parse_csv if import_format == "csv" else _parse_ndjson
+        yield from parse(text)
+    except UnicodeDecodeError:
+        raise InvalidResourceImportError("File must be UTF-8 encoded")
+    except csv.Error as e:
+        raise InvalidResourceImportError(f"malformed CSV ({e})")
+    finally:
+        # Leave the upload's file open; UploadFile closes it
+        text.detach()
+
+
+def bulk_insert_resources(
+    session: Session,
+    organization_id: int,
+    rows: Iterable[tuple[str, str | None]],
+    batch_size: int = IMPORT_BATCH_SIZE,
+) -> int:
+    """
+    Insert rows with one COPY per batch on the session's connection, so they
+    share its transaction; the caller commits or rolls back the whole import.
+    Returns the number of rows inserted.
+    """
+    copy_sql = (
+        f"COPY {OrganizationResource.__tablename__} "
+        "(organization_id, title, description, created_at, updated_at) "
+        "FROM STDIN WITH (FORMAT csv)"
+    )
+    now = utc_naive_now().isoformat()
+    cursor = session.connection().connection.cursor()
+    inserted = 0
+    try:
+        for batch in batched(rows, batch_size):
+            buffer = io.StringIO()
+            # Quote every non-NULL field so text such as a lone "\." line
+            # can't be read as COPY's end-of-data marker; None stays NULL
+            writer = csv.writer(buffer, quoting=csv.QUOTE_NOTNULL)
+            writer.writerows(
+                (organization_id, title, description, now, now)
+                for title, description in batch
+            )
+            buffer.seek(0)
+            cursor.copy_expert(copy_sql, buffer)
+            inserted += len(batch)
+    finally:
+        cursor.close()
+    return inserted
+
+
+# --- Streaming export ---
+
+
+def _export_record(row: tuple) -> dict[str, object]:
+    record = dict(zip(EXPORT_COLUMNS, row))
+    record["created_at"] = record["created_at"].isoformat()
+    record["updated_at"] = record["updated_at"].isoformat()
+    return record
+
+
+def iter_resource_export(
+    organization_id: int, export_format: str, batch_size: int = EXPORT_BATCH_SIZE
+) -> Iterator[str]:
+    """
+    Yield an organization's resources as CSV or NDJSON text chunks.
+
+    Rows are read through a server-side cursor (yield_per) one batch at a
+    time, so the result set is never held in memory. The body streams after
+    the endpoint has returned, so the export opens its own session instead of
+    borrowing the request's.
+    """
+    statement = (
+        select(*(getattr(OrganizationResource, column) for column in EXPORT_COLUMNS))
+        .where(OrganizationResource.organization_id == organization_id)
+        .order_by(col(OrganizationResource.id))
+    )
+    engine = create_engine(get_connection_url())
+    try:
+        with Session(engine) as session:
+            result = (
+                session.connection()
+                .execution_options(yield_per=batch_size)
+                .execute(statement)
+            )
+            if export_format == "csv":
+                buffer = io.StringIO()
+                csv.writer(buffer).writerow(EXPORT_COLUMNS)
+                yield buffer.getvalue()
+            for partition in result.partitions():
+                buffer = io.StringIO()
+                if export_format == "csv":
+                    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+                    writer.writerows(_export_record(tuple(row)) for row in partition)
+                else:
+                    for row in partition:
+                        buffer.write(json.dumps(_export_record(tuple(row))) + "\n")
+                yield buffer.getvalue()
+    finally:
+        engine.dispose()
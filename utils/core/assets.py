@@ -0,0 +1,329 @@
+"""
+Front-end asset pipeline: vendoring, font subsetting, and script bundling.
+
+The app has no Node.js build step, so this module does the small amount of
+asset processing we need in plain Python:
+
+- Third-party scripts (htmx) are pinned in ``VENDOR_SCRIPTS`` and committed
+  under ``static/vendor/``.
+- Web fonts are downloaded from Google Fonts, subset to the Latin glyphs the
+  UI uses, and served from ``static/vendor/fonts/`` via ``static/css/fonts.css``.
+- Vendored scripts and our own ``remove-me.js``/``ui.js``/``app.js`` are
+  concatenated, in load order, into a single deferred ``static/js/bundle.js``.
+- ``templates/base/partials/assets.html`` is generated with the bundle's
+  content hash and a preload hint for every local asset.
+
+Pages only ever load assets from our own origin. Building fails if a pinned
+vendor script is missing rather than falling back to a CDN; without vendored
+fonts, the font stacks in styles.css fall back to system fonts.
+
+Usage:
+    uv run python -m utils.core.assets            # rebuild bundle + partial
+    uv run python -m utils.core.assets --fetch    # also (re)download vendor assets
+    uv run python -m utils.core.assets --check    # exit 1 if outputs are stale
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import io
+import os
+import re
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from urllib.request import Request, urlopen
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+STATIC_DIR = ROOT_DIR / "static"
+VENDOR_DIR = STATIC_DIR / "vendor"
+FONTS_DIR = VENDOR_DIR / "fonts"
+FONTS_CSS_PATH = STATIC_DIR / "css" / "fonts.css"
+BUNDLE_PATH = STATIC_DIR / "js" / "bundle.js"
+ASSETS_PARTIAL_PATH = ROOT_DIR / "templates" / "base" / "partials" / "assets.html"
+
+
+@dataclass(frozen=True)
+class VendorScript:
+    name: str
+    version: str
+    url: str
+    filename: str
+
+    @property
+    def path(self) -> Path:
+        return VENDOR_DIR / self.filename
+
+
+VENDOR_SCRIPTS = (
+    VendorScript(
+        name="htmx.org",
+        version="2.0.10",
+        url="https://cdn.jsdelivr.net/npm/htmx.org@2.0.10/dist/htmx.min.js",
+        filename="htmx.min.js",
+    ),
+)
+
+# Load order matters: remove-me.js calls htmx.defineExtension() at load time.
+FIRST_PARTY_SCRIPTS = (
+    STATIC_DIR / "js" / "remove-me.js",
+    STATIC_DIR / "js" / "ui.js",
+    STATIC_DIR / "js" / "app.js",
+)
+
+GOOGLE_FONTS_CSS_URL = (
+    "https://fonts.googleapis.com/css2?family=Space+Grotesk:wght@500;600;700"
+    "&family=IBM+Plex+Sans:wght@400;500;600"
+    "&family=IBM+Plex+Mono:wght@400;500;600&display=swap"
+)
+
+# Printable ASCII, Latin-1 supplement, and the typographic punctuation that
+# appears in templates and flash messages (dashes, curly quotes, bullet,
+# ellipsis, multiplication sign used by close buttons).
+FONT_UNICODES = (
+    "U+0020-007E,U+00A0-00FF,U+2013-2014,U+2018-201D,U+2022,U+2026,U+20AC,U+2122"
+)
+
+# Browsers only receive woff2 from Google Fonts when they look like a browser.
+_FONT_USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+)
+_LATIN_FONT_FACE = re.compile(
+    r"/\* latin \*/\s*@font-face\s*\{(?P<body>[^}]*)\}", re.MULTILINE
+)
+
+
+# --- Bundling ---
+
+
+def _relative(path: Path) -> str:
+    return Path(os.path.relpath(path, ROOT_DIR)).as_posix()
+
+
+def bundle_sources() -> list[Path]:
+    """Return the scripts that make up the bundle, in load order."""
+    missing = [
+        script.filename for script in VENDOR_SCRIPTS if not script.path.is_file()
+    ]
+    if missing:
+        raise FileNotFoundError(
+            f"Vendor scripts missing from {_relative(VENDOR_DIR)}: {missing}; "
+            "run `uv run python -m utils.core.assets --fetch`"
+        )
+    return [script.path for script in VENDOR_SCRIPTS] + list(FIRST_PARTY_SCRIPTS)
+
+
+def build_bundle() -> bytes:
+    """Concatenate vendored and first-party scripts into one bundle."""
+    parts: list[bytes] = [
+        b"// bundle.js -- generated by utils/core/assets.py. Do not edit.\n"
+    ]
+    for source in bundle_sources():
+        parts.append(f"\n// --- {_relative(source)} ---\n".encode())
+        parts.append(source.read_bytes().rstrip())
+        # Guard against sources that omit a trailing semicolon.
+        parts.append(b"\n;\n")
+    return b"".join(parts)
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+def local_font_files() -> list[Path]:
+    if not FONTS_DIR.is_dir():
+        return []
+    return sorted(FONTS_DIR.glob("*.woff2"))
+
+
+def render_assets_partial(bundle: bytes) -> str:
+    """Render the <head> partial that loads fonts and the script bundle."""
+    lines = [
+        "{# Generated by utils/core/assets.py -- run "
+        "`uv run python -m utils.core.assets` instead of editing. #}",
+    ]
+
+    fonts = local_font_files()
+    if fonts and FONTS_CSS_PATH.is_file():
+        for font in fonts:
+            path = font.relative_to(STATIC_DIR).as_posix()
+            lines.append(
+                f"<link rel=\"preload\" href=\"{{{{ url_for('static', path='{path}') }}}}\" "
+                'as="font" type="font/woff2" crossorigin>'
+            )
+        lines.append(
+            "<link href=\"{{ url_for('static', path='css/fonts.css') }}\" rel=\"stylesheet\">"
+        )
+
+    bundle_url = (
+        f"{{{{ url_for('static', path='js/bundle.js') }}}}?v={content_hash(bundle)}"
+    )
+    lines.append(f'<link rel="preload" href="{bundle_url}" as="script">')
+    lines.append(f'<script defer src="{bundle_url}"></script>')
+    return "\n".join(lines) + "\n"
+
+
+def build(write: bool = True) -> list[Path]:
+    """
+    Regenerate the bundle and the assets partial.
+
+    Args:
+        write (bool): If False, only report which outputs are stale.
+
+    Returns:
+        list[Path]: Output files whose on-disk contents differ from a fresh build.
+    """
+    bundle = build_bundle()
+    outputs = {
+        BUNDLE_PATH: bundle,
+        ASSETS_PARTIAL_PATH: render_assets_partial(bundle).encode(),
+    }
+    stale = [
+        path
+        for path, data in outputs.items()
+        if not path.is_file() or path.read_bytes() != data
+    ]
+    if write:
+        for path in stale:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(outputs[path])
+    return stale
+
+
+# --- Vendoring ---
+
+
+def _download(url: str) -> bytes:
+    request = Request(url, headers={"User-Agent": _FONT_USER_AGENT})
+    with urlopen(request, timeout=30) as response:
+        return response.read()
+
+
+def fetch_vendor_scripts() -> None:
+    VENDOR_DIR.mkdir(parents=True, exist_ok=True)
+    for script in VENDOR_SCRIPTS:
+        script.path.write_bytes(_download(script.url))
+
+
+def _font_face_field(body: str, field: str) -> str:
+    match = re.search(rf"{field}:\s*([^;]+);", body)
+    if not match:
+        raise ValueError(f"Google Fonts CSS is missing '{field}'")
+    return match.group(1).strip()
+
+
+def subset_font(data: bytes) -> bytes:
+    """Subset a woff2 font to FONT_UNICODES."""
+    try:
+        from fontTools import subset
+    except ImportError as e:
+        raise RuntimeError(
+            "Font subsetting requires fonttools with brotli support: "
+            "uv add --group dev 'fonttools[woff]'"
+        ) from e
+
+    options = subset.Options()
+    options.flavor = "woff2"
+    options.layout_features = ["*"]
+    font = subset.load_font(io.BytesIO(data), options)
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=subset.parse_unicodes(FONT_UNICODES))
+    subsetter.subset(font)
+    output = io.BytesIO()
+    subset.save_font(font, output, options)
+    return output.getvalue()
+
+
+def vendor_font(family: str, weight: str, style: str, data: bytes) -> str:
+    """
+    Subset one font face into FONTS_DIR and return its @font-face rule.
+
+    Args:
+        family (str): CSS font-family name, e.g. "IBM Plex Sans".
+        weight (str): CSS font-weight, e.g. "400".
+        style (str): CSS font-style, e.g. "normal".
+        data (bytes): The face as a woff2, woff, or TrueType/OpenType font.
+
+    Returns:
+        str: The rule to include in fonts.css.
+    """
+    filename = f"{family.lower().replace(' ', '-')}-{weight}.woff2"
+    FONTS_DIR.mkdir(parents=True, exist_ok=True)
+    (FONTS_DIR / filename).write_bytes(subset_font(data))
+    return (
+        "@font-face {\n"
+        f"    font-family: '{family}';\n"
+        f"    font-style: {style};\n"
+        f"    font-weight: {weight};\n"
+        "    font-display: swap;\n"
+        f"    src: url('../vendor/fonts/{filename}') format('woff2');\n"
+        f"    unicode-range: {FONT_UNICODES};\n"
+        "}\n"
+    )
+
+
+def write_fonts_css(rules: list[str]) -> None:
+    FONTS_CSS_PATH.write_text(
+        "/* fonts.css -- generated by utils/core/assets.py. Do not edit. */\n\n"
+        + "\n".join(rules)
+    )
+
+
+def fetch_fonts() -> None:
+    """Download the Latin faces from Google Fonts, subset them, and write fonts.css."""
+    css = _download(GOOGLE_FONTS_CSS_URL).decode()
+    for stale_font in local_font_files():
+        stale_font.unlink()
+
+    rules = []
+    for match in _LATIN_FONT_FACE.finditer(css):
+        body = match.group("body")
+        family = _font_face_field(body, "font-family").strip("'\"")
+        weight = _font_face_field(body, "font-weight")
+        style = _font_face_field(body, "font-style")
+        url_match = re.search(r"url\(([^)]+)\)", body)
+        if not url_match:
+            raise ValueError(f"Google Fonts CSS is missing a URL for {family}")
+
+        rules.append(vendor_font(family, weight, style, _download(url_match.group(1))))
+
+    if not rules:
+        raise ValueError("No Latin @font-face rules found in Google Fonts CSS")
+    write_fonts_css(rules)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Vendor third-party front-end assets and rebuild the script bundle."
+    )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--fetch",
+        action="store_true",
+        help="Download pinned vendor scripts and subset web fonts before building.",
+    )
+    mode.add_argument(
+        "--check",
+        action="store_true",
+        help="Exit with status 1 if the bundle or assets partial is out of date.",
+    )
+    args = parser.parse_args()
+
+    if args.fetch:
+        fetch_vendor_scripts()
+        fetch_fonts()
+
+    stale = build(write=not args.check)
+    if args.check:
+        if stale:
+            print(f"Stale: {[_relative(path) for path in stale]}")
+            sys.exit(1)
+        print("Front-end assets are up to date.")
+        return
+    print(f"Updated: {[_relative(path) for path in stale]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,12 +5,13 @@ import jwt
 import uuid
 import logging
 import resend
-from sqlmodel import Session, select
+from sqlmodel import Session, col, select, update
 from bcrypt import gensalt, hashpw, checkpw
 from datetime import UTC, datetime, timedelta
 from typing import Literal, Optional
 from jinja2.environment import Template
-from fastapi.templating import Jinja2Templates
+from utils.core.templating import create_templates
+from utils.core.metrics import BCRYPT_DURATION, BCRYPT_IN_PROGRESS, record_email
 from fastapi import Cookie
 from starlette.responses import Response
 from utils.core.db import create_engine, get_connection_url
@@ -20,6 +21,7 @@ from utils.core.models import (
     PasswordResetToken,
     RefreshToken,
     Account,
+    email_matches,
 )
 
 logger = logging.getLogger(__name__)
@@ -30,7 +32,7 @@ logger.addHandler(logging.StreamHandler())
 # --- Constants ---
 
 
-templates = Jinja2Templates(directory="templates")
+templates = create_templates()
 COOKIE_SECURE = os.getenv("BASE_URL", "http://localhost:8000").startswith("https")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
@@ -157,7 +159,8 @@ def get_password_hash(password: str) -> str:
     # Convert the password to bytes and generate the hash
     password_bytes = password.encode("utf-8")
     salt = gensalt()
-    return hashpw(password_bytes, salt).decode("utf-8")
+    with BCRYPT_IN_PROGRESS.track_in_progress(), BCRYPT_DURATION.time("hash"):
+        return hashpw(password_bytes, salt).decode("utf-8")
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -166,12 +169,19 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     password_bytes = plain_password.encode("utf-8")
     hashed_bytes = hashed_password.encode("utf-8")
-    return checkpw(password_bytes, hashed_bytes)
+    with BCRYPT_IN_PROGRESS.track_in_progress(), BCRYPT_DURATION.time("check"):
+        return checkpw(password_bytes, hashed_bytes)
 
 
-def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+def create_access_token(
+    data: dict, expires_delta: Optional[timedelta] = None, token_version: int = 0
+) -> str:
+    """
+    Create an access token. token_version should be the account's current
+    token_version; the token stops validating once the account's is bumped.
+    """
     to_encode = data.copy()
-    to_encode.update({"type": "access"})
+    to_encode.update({"type": "access", "ver": token_version})
     if expires_delta:
         expire = datetime.now(UTC) + expires_delta
     else:
@@ -222,26 +232,30 @@ def create_tracked_refresh_token(
     return token
 
 
-def revoke_all_refresh_tokens(account_id: int, session: Session) -> None:
-    tokens = session.exec(
-        select(RefreshToken).where(
-            RefreshToken.account_id == account_id,
-            RefreshToken.revoked == False,  # noqa: E712
+def revoke_all_refresh_tokens(
+    account_id: int, session: Session, invalidate_access_tokens: bool = True
+) -> int:
+    """
+    Revoke every live refresh token for the account with one UPDATE and
+    return how many were revoked. Unless invalidate_access_tokens is False,
+    also bump the account's token_version so access tokens issued before now
+    are rejected too. Loaded Account objects see the new version.
+    """
+    result = session.exec(
+        update(RefreshToken)
+        .where(
+            col(RefreshToken.account_id) == account_id,
+            col(RefreshToken.revoked).is_(False),
         )
-    ).all()
-    for token in tokens:
-        token.revoked = True
-
-
-def cleanup_expired_refresh_tokens(session: Session) -> int:
-    expired = session.exec(
-        select(RefreshToken).where(RefreshToken.expires_at < datetime.now(UTC))
-    ).all()
-    count = len(expired)
-    for token in expired:
-        session.delete(token)
-    session.commit()
-    return count
+        .values(revoked=True)
+    )
+    if invalidate_access_tokens:
+        session.exec(
+            update(Account)
+            .where(col(Account.id) == account_id)
+            .values(token_version=Account.token_version + 1)
+        )
+    return result.rowcount
 
 
 def validate_token(token: str, token_type: str = "access") -> Optional[dict]:
@@ -283,7 +297,7 @@ def generate_password_reset_url(email: str, token: str) -> str:
 def send_reset_email(email: str, session: Session) -> None:
     # Check for an existing unexpired token
     account: Optional[Account] = session.exec(
-        select(Account).where(Account.email == email)
+        select(Account).where(email_matches(Account.email, email))
     ).first()
 
     if account:
@@ -321,7 +335,8 @@ def send_reset_email(email: str, session: Session) -> None:
                 "html": html_content,
             }
 
-            sent_email = resend.Emails.send(params)  # ty: ignore[invalid-argument-type]
+            with record_email("reset_email"):
+                sent_email = resend.Emails.send(params)  # ty: ignore[invalid-argument-type]
             logger.debug(f"Password reset email sent: {sent_email.get('id')}")
 
             session.commit()
@@ -396,7 +411,8 @@ def send_email_verification(account_id: int, new_email: str, session: Session) -
             "html": html_content,
         }
 
-        sent_email = resend.Emails.send(params)  # ty: ignore[invalid-argument-type]
+        with record_email("verify_new_email"):
+            sent_email = resend.Emails.send(params)  # ty: ignore[invalid-argument-type]
         logger.debug(f"Email verification sent: {sent_email.get('id')}")
 
         session.commit()
@@ -421,7 +437,8 @@ def send_email_verified_notification(primary_email: str, new_email: str) -> None
             "html": html_content,
         }
 
-        sent_email = resend.Emails.send(params)  # ty: ignore[invalid-argument-type]
+        with record_email("email_verified_alert"):
+            sent_email = resend.Emails.send(params)  # ty: ignore[invalid-argument-type]
         logger.debug(f"Email verified notification sent: {sent_email.get('id')}")
     except Exception as e:
         logger.error(f"Failed to send email verified notification: {e}")
@@ -449,7 +466,8 @@ def send_primary_email_changed_notification(
             "html": html_content,
         }
 
-        sent_email = resend.Emails.send(params)  # ty: ignore[invalid-argument-type]
+        with record_email("primary_email_changed"):
+            sent_email = resend.Emails.send(params)  # ty: ignore[invalid-argument-type]
         logger.debug(f"Primary email changed notification sent: {sent_email.get('id')}")
     except Exception as e:
         logger.error(f"Failed to send primary email changed notification: {e}")
@@ -474,7 +492,8 @@ def send_email_removed_notification(removed_email: str, recovery_url: str) -> No
             "html": html_content,
         }
 
-        sent_email = resend.Emails.send(params)  # ty: ignore[invalid-argument-type]
+        with record_email("email_removed_alert"):
+            sent_email = resend.Emails.send(params)  # ty: ignore[invalid-argument-type]
         logger.debug(f"Email removed notification sent: {sent_email.get('id')}")
     except Exception as e:
         logger.error(f"Failed to send email removed notification: {e}")
@@ -1,17 +1,42 @@
 import os
+import hashlib
 import logging
 from itertools import chain
-from typing import Union, Sequence
+from typing import Iterable, Union, Sequence
+from sqlalchemy import (
+    ColumnElement,
+    Connection,
+    Table,
+    any_,
+    exists,
+    literal,
+    literal_column,
+    true,
+)
+from sqlalchemy import select as sa_select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.engine import URL
-from sqlmodel import create_engine, Session, SQLModel, select, text
+from sqlalchemy.schema import CreateIndex, CreateTable
+from sqlmodel import create_engine, col, delete, func, Session, SQLModel, select, text
 from utils.core.models import (
     Account,
     AccountEmail,
     Role,
     Permission,
     RolePermissionLink,
+    SchemaVersion,
+    utc_naive_now,
+    utc_now,
 )
 from utils.core.enums import ValidPermissions
+from utils.core.partitions import (
+    UNPARTITIONED_WARNING,
+    create_partitions,
+    is_partitioned,
+    rate_limit_backend,
+)
+from utils.core.search import create_trigram_indexes
 from utils.app.enums import AppPermissions
 from utils.app.models import *  # noqa: F401, F403 — registers app models with SQLModel.metadata
 
@@ -24,6 +49,24 @@ logger = logging.getLogger("uvicorn.error")
 
 default_roles = ["Owner", "Administrator", "Member"]
 
+# Permission names granted to each default role when an organization is created
+DEFAULT_ROLE_PERMISSIONS: dict[str, frozenset[str]] = {
+    "Owner": frozenset(map(str, chain(ValidPermissions, AppPermissions))),
+    "Administrator": frozenset(
+        str(permission)
+        for permission in chain(ValidPermissions, AppPermissions)
+        if permission != ValidPermissions.DELETE_ORGANIZATION
+    ),
+    "Member": frozenset(),
+}
+
+# Arbitrary application-wide key for pg_advisory_xact_lock around set_up_db
+SCHEMA_SETUP_LOCK_ID = 7_310_042_951
+
+# Process-wide caches filled by get_permission_ids()/get_default_role_permission_ids()
+_permission_ids: dict[str, int] | None = None
+_default_role_permission_ids: dict[str, list[int]] | None = None
+
 
 # --- Database connection functions ---
 
@@ -118,6 +161,67 @@ def get_connection_url() -> URL:
     return database_url
 
 
+def get_permission_ids(session: Session) -> dict[str, int]:
+    """
+    Permission name -> id map, read from the database once per process.
+    Permissions only change when set_up_db seeds them, which clears the map.
+    """
+    global _permission_ids
+    if _permission_ids is None:
+        _permission_ids = {
+            name: permission_id
+            for name, permission_id in session.exec(
+                select(Permission.name, Permission.id)
+            ).all()
+            if permission_id is not None
+        }
+    return _permission_ids
+
+
+def get_default_role_permission_ids(session: Session) -> dict[str, list[int]]:
+    """Default role name -> permission ids, built from DEFAULT_ROLE_PERMISSIONS."""
+    global _default_role_permission_ids
+    if _default_role_permission_ids is None:
+        permission_ids = get_permission_ids(session)
+        _default_role_permission_ids = {
+            role_name: sorted(permission_ids[name] for name in permission_names)
+            for role_name, permission_names in DEFAULT_ROLE_PERMISSIONS.items()
+        }
+    return _default_role_permission_ids
+
+
+def clear_permission_cache() -> None:
+    """Forget the cached permission maps so the next lookup reloads them."""
+    global _permission_ids, _default_role_permission_ids
+    _permission_ids = None
+    _default_role_permission_ids = None
+
+
+def insert_role_permission_links(
+    session: Session,
+    links: Iterable[tuple[int, int]],
+    skip_existing: bool = False,
+) -> None:
+    """
+    Insert (role_id, permission_id) links with one multi-row INSERT.
+
+    Args:
+        session (Session): The database session to use for operations.
+        links (Iterable[tuple[int, int]]): The (role_id, permission_id) pairs to insert.
+        skip_existing (bool): If True, pairs that already exist are ignored (ON CONFLICT DO NOTHING).
+    """
+    values = [
+        {"role_id": role_id, "permission_id": permission_id}
+        for role_id, permission_id in links
+    ]
+    if not values:
+        return
+    statement = pg_insert(RolePermissionLink).values(values)
+    if skip_existing:
+        statement = statement.on_conflict_do_nothing()
+    session.connection().execute(statement)
+
+
 def assign_permissions_to_role(
     session: Session,
     role: Role,
@@ -131,27 +235,18 @@ def assign_permissions_to_role(
         session (Session): The database session to use for operations.
         role (Role): The role to assign permissions to.
         permissions (list[Permission]): The list of permissions to assign.
-        check_first (bool): If True, checks if the role already has the permission before assigning it.
+        check_first (bool): If True, skips permissions the role already has instead of failing.
     """
-
-    for permission in permissions:
-        # Check if the role already has the permission
-        if check_first:
-            db_role_permission_link: RolePermissionLink | None = session.exec(
-                select(RolePermissionLink).where(
-                    RolePermissionLink.role_id == role.id,
-                    RolePermissionLink.permission_id == permission.id,
-                )
-            ).first()
-        else:
-            db_role_permission_link = None
-
-        # Skip granting DELETE_ORGANIZATION permission to the Administrator role
-        if not db_role_permission_link:
-            role_permission_link = RolePermissionLink(
-                role_id=role.id, permission_id=permission.id
-            )
-            session.add(role_permission_link)
+    assert role.id is not None
+    insert_role_permission_links(
+        session,
+        [
+            (role.id, permission.id)
+            for permission in permissions
+            if permission.id is not None
+        ],
+        skip_existing=check_first,
+    )
 
 
 def create_default_roles(
@@ -161,6 +256,9 @@ def create_default_roles(
     Creates default roles for a specified organization in the database if they do not already exist,
     and assigns permissions to the Owner and Administrator roles.
 
+    New roles are written with one multi-row INSERT and their permission
+    links with another, using the cached default-role permission template.
+
     Args:
         session (Session): The database session to use for operations.
         organization_id (int): The ID of the organization for which to create roles.
@@ -169,40 +267,36 @@ def create_default_roles(
     Returns:
         list: A list of roles that were created or already existed in the database.
     """
-
-    roles_in_db = []
-    for role_name in default_roles:
-        db_role = session.exec(
-            select(Role).where(
-                Role.name == role_name, Role.organization_id == organization_id
-            )
-        ).first()
-        if not db_role:
-            db_role = Role(name=role_name, organization_id=organization_id)
-            session.add(db_role)
-        roles_in_db.append(db_role)
-
-    # TODO: Construct this role-permission mapping once at app startup and use as constant
-    # Fetch all permissions once
-    owner_permissions = session.exec(select(Permission)).all()
-    admin_permissions = [
-        permission
-        for permission in owner_permissions
-        if permission.name != ValidPermissions.DELETE_ORGANIZATION
+    existing_roles: dict[str, Role] = {}
+    if check_first:
+        existing_roles = {
+            role.name: role
+            for role in session.exec(
+                select(Role).where(
+                    Role.organization_id == organization_id,
+                    col(Role.name).in_(default_roles),
+                )
+            ).all()
+        }
+    new_roles = [
+        Role(name=role_name, organization_id=organization_id)
+        for role_name in default_roles
+        if role_name not in existing_roles
     ]
-
-    # Get Owner and Administrator roles by name
-    owner_role = next(role for role in roles_in_db if role.name == "Owner")
-    admin_role = next(role for role in roles_in_db if role.name == "Administrator")
-
-    # Assign all permissions to Owner
-    assign_permissions_to_role(
-        session, owner_role, owner_permissions, check_first=check_first
-    )
-
-    # Assign filtered permissions to Administrator
-    assign_permissions_to_role(
-        session, admin_role, admin_permissions, check_first=check_first
+    session.add_all(new_roles)
+    session.flush()
+
+    roles_in_db = list(existing_roles.values()) + new_roles
+    role_permission_ids = get_default_role_permission_ids(session)
+    insert_role_permission_links(
+        session,
+        [
+            (role.id, permission_id)
+            for role in roles_in_db
+            if role.id is not None
+            for permission_id in role_permission_ids[role.name]
+        ],
+        skip_existing=check_first,
     )
 
     session.commit()
@@ -212,66 +306,169 @@ def create_default_roles(
 def create_permissions(session: Session) -> None:
     """
     Creates permissions in the database from both core (ValidPermissions)
-    and app-specific (AppPermissions) enums if they do not already exist.
+    and app-specific (AppPermissions) enums if they do not already exist,
+    with a single INSERT ... ON CONFLICT DO NOTHING.
 
     Args:
         session (Session): The database session to use for operations.
     """
-    for permission in chain(ValidPermissions, AppPermissions):
-        db_permission = session.exec(
-            select(Permission).where(Permission.name == str(permission))
-        ).first()
-        if not db_permission:
-            db_permission = Permission(name=str(permission))
-            session.add(db_permission)
+    now = utc_now()
+    session.connection().execute(
+        pg_insert(Permission)
+        .values(
+            [
+                {"name": str(permission), "created_at": now, "updated_at": now}
+                for permission in chain(ValidPermissions, AppPermissions)
+            ]
+        )
+        .on_conflict_do_nothing(index_elements=["name"])
+    )
 
 
 def seed_account_emails(session: Session) -> None:
     """
     Backfill AccountEmail rows for existing accounts that don't have one.
     Each account gets a primary, verified AccountEmail matching its email field.
+    Runs as one INSERT ... SELECT, however many accounts there are.
     """
-    from datetime import datetime, UTC
-
-    accounts = session.exec(select(Account)).all()
-    for account in accounts:
-        existing = session.exec(
-            select(AccountEmail).where(AccountEmail.account_id == account.id)
-        ).first()
-        if not existing:
-            assert account.id is not None
-            account_email = AccountEmail(
-                account_id=account.id,
-                email=account.email,
-                is_primary=True,
-                verified=True,
-                verified_at=datetime.now(UTC),
-            )
-            session.add(account_email)
+    now = utc_naive_now()
+    missing = sa_select(
+        col(Account.id),
+        col(Account.email),
+        true(),
+        true(),
+        literal(now),
+        literal(now),
+    ).where(~exists().where(col(AccountEmail.account_id) == col(Account.id)))
+    session.connection().execute(
+        pg_insert(AccountEmail)
+        .from_select(
+            [
+                "account_id",
+                "email",
+                "is_primary",
+                "verified",
+                "verified_at",
+                "created_at",
+            ],
+            missing,
+        )
+        .on_conflict_do_nothing()
+    )
     session.commit()
 
 
+def delete_in_batches(
+    connection: Connection,
+    table: Table,
+    condition: ColumnElement[bool],
+    batch_size: int,
+) -> int:
+    """
+    Delete the table's rows matching condition batch_size at a time,
+    committing after each batch, and return how many were deleted. Each batch
+    is DELETE ... WHERE ctid = ANY(ARRAY(SELECT ctid ... LIMIT n)), so no
+    statement locks more than batch_size rows or runs for long.
+    """
+    ctid = literal_column("ctid")
+    batch = (
+        sa_select(ctid)
+        .select_from(table)
+        .where(condition)
+        .limit(batch_size)
+        .scalar_subquery()
+    )
+    statement = delete(table).where(ctid == any_(func.array(batch)))
+    deleted = 0
+    while True:
+        result = connection.execute(statement)
+        connection.commit()
+        deleted += result.rowcount
+        if result.rowcount < batch_size:
+            return deleted
+
+
+def schema_fingerprint() -> str:
+    """
+    Hash of the DDL for every table and index in SQLModel.metadata plus the
+    permission names, so any model or enum change yields a new fingerprint.
+    """
+    dialect = postgresql.dialect()
+    parts = []
+    for table in SQLModel.metadata.sorted_tables:
+        parts.append(str(CreateTable(table).compile(dialect=dialect)))
+        parts.extend(
+            str(CreateIndex(index).compile(dialect=dialect))
+            for index in sorted(table.indexes, key=lambda index: index.name or "")
+        )
+    parts.extend(
+        str(permission) for permission in chain(ValidPermissions, AppPermissions)
+    )
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+
+def _applied_fingerprint(connection: Connection) -> str | None:
+    if (
+        connection.execute(text("SELECT to_regclass('private.schemaversion')")).scalar()
+        is None
+    ):
+        return None
+    return connection.execute(
+        sa_select(col(SchemaVersion.fingerprint)).where(col(SchemaVersion.id) == 1)
+    ).scalar()
+
+
 def set_up_db(drop: bool = False) -> None:
     """
     Sets up the database by creating tables and populating them with default permissions.
 
+    Boots are cheap once the database is current: the schema fingerprint is
+    compared first and nothing else runs if it matches. Otherwise setup runs
+    in one transaction under an advisory lock, so when several workers start
+    together one applies it and the rest wait, re-check and skip.
+
     Args:
         drop (bool): If True, drops all existing tables before creating new ones.
     """
+    fingerprint = schema_fingerprint()
     engine = create_engine(get_connection_url())
-    if drop:
-        SQLModel.metadata.drop_all(engine)
-    # Ensure the private schema exists before creating tables
-    with engine.connect() as conn:
-        conn.execute(text("CREATE SCHEMA IF NOT EXISTS private"))
-        conn.commit()
-    SQLModel.metadata.create_all(engine)
-    # Create default permissions and seed account emails
-    with Session(engine) as session:
-        create_permissions(session)
-        session.commit()
-        seed_account_emails(session)
-    engine.dispose()
+    try:
+        with engine.connect() as conn:
+            if not drop and _applied_fingerprint(conn) == fingerprint:
+                return
+        with engine.begin() as conn:
+            conn.execute(sa_select(func.pg_advisory_xact_lock(SCHEMA_SETUP_LOCK_ID)))
+            if not drop and _applied_fingerprint(conn) == fingerprint:
+                return
+            if drop:
+                SQLModel.metadata.drop_all(conn)
+            # Ensure the private schema exists before creating tables
+            conn.execute(text("CREATE SCHEMA IF NOT EXISTS private"))
+            SQLModel.metadata.create_all(conn)
+            # Index member search where pg_trgm is available
+            create_trigram_indexes(conn)
+            # Rate-limit attempts need a partition for the current hour, but
+            # a table created before partitioning can't take one until the
+            # migration has converted it
+            if not is_partitioned(conn):
+                logger.warning(UNPARTITIONED_WARNING)
+            elif rate_limit_backend() == "postgres":
+                create_partitions(conn)
+            # Create default permissions and seed account emails
+            with Session(bind=conn) as session:
+                create_permissions(session)
+                seed_account_emails(session)
+            clear_permission_cache()
+            conn.execute(
+                pg_insert(SchemaVersion)
+                .values(id=1, fingerprint=fingerprint, applied_at=utc_now())
+                .on_conflict_do_update(
+                    index_elements=["id"],
+                    set_={"fingerprint": fingerprint, "applied_at": utc_now()},
+                )
+            )
+    finally:
+        engine.dispose()
 
 
 def tear_down_db() -> None:
@@ -2,9 +2,9 @@ import logging
 from fastapi import Depends, Form, Query, Request
 from pydantic import EmailStr
 from sqlmodel import Session, select
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import InstrumentedAttribute, joinedload, selectinload
 from datetime import UTC, datetime
-from typing import Optional, Tuple, Generator
+from typing import Any, Optional, Tuple, Generator, cast
 from utils.core.auth import (
     validate_token,
     create_access_token,
@@ -16,12 +16,15 @@ from utils.core.auth import (
 from utils.core.db import create_engine, get_connection_url
 from utils.core.models import (
     User,
+    UserAvatar,
     Role,
     AccountRecoveryToken,
     PasswordResetToken,
     EmailVerificationToken,
     RefreshToken,
     Account,
+    email_matches,
+    same_email,
 )
 from exceptions.http_exceptions import (
     AlreadyAuthenticatedError,
@@ -35,6 +38,16 @@ from utils.core.invitations import get_invitation_token_warning
 
 logger = logging.getLogger(__name__)
 
+# What templates read from the current user. Every page's navbar checks
+# user.avatar, so the avatar row is loaded without its image bytes; get_avatar
+# loads those on demand.
+USER_LOAD_OPTIONS = (
+    joinedload(User.account),
+    joinedload(User.avatar).defer(
+        cast(InstrumentedAttribute[Any], UserAvatar.avatar_data)
+    ),
+)
+
 
 def get_session() -> Generator[Session, None, None]:
     """
@@ -68,7 +81,7 @@ def validate_token_and_get_account(
     if decoded_token:
         user_email = decoded_token.get("sub")
         account = session.exec(
-            select(Account).where(Account.email == user_email)
+            select(Account).where(email_matches(Account.email, user_email))
         ).first()
 
         if account:
@@ -99,12 +112,17 @@ def validate_token_and_get_account(
                 # Revoke the current token and issue new ones
                 db_token.revoked = True
                 persistent = bool(decoded_token.get("persistent", False))
-                new_access_token = create_access_token(data={"sub": account.email})
+                new_access_token = create_access_token(
+                    data={"sub": account.email}, token_version=account.token_version
+                )
                 new_refresh_token = create_tracked_refresh_token(
                     account.id, account.email, session, persistent=persistent
                 )
                 session.commit()
                 return account, new_access_token, new_refresh_token
+            # Access tokens minted before the account's last revocation are void
+            if decoded_token.get("ver", 0) != account.token_version:
+                return None, None, None
             return account, None, None
     return None, None, None
 
@@ -128,7 +146,9 @@ def get_account_from_credentials(
     Raises:
         HTTPException: If credentials are invalid
     """
-    account = session.exec(select(Account).where(Account.email == email)).first()
+    account = session.exec(
+        select(Account).where(email_matches(Account.email, email))
+    ).first()
 
     if not account or not verify_password(password, account.hashed_password):
         raise CredentialsError()
@@ -213,8 +233,14 @@ def validate_token_and_get_user(
     account, new_access_token, new_refresh_token = validate_token_and_get_account(
         token, token_type, session
     )
-    if account and account.user:
-        return account.user, new_access_token, new_refresh_token
+    if account:
+        user = session.exec(
+            select(User)
+            .where(User.account_id == account.id)
+            .options(*USER_LOAD_OPTIONS)
+        ).first()
+        if user:
+            return user, new_access_token, new_refresh_token
     return None, None, None
 
 
@@ -316,7 +342,7 @@ def get_verified_account(
     Dependency that returns an authenticated account after verifying credentials.
     Wraps get_authenticated_account with an additional email/password check.
     """
-    if email != account.email:
+    if not same_email(email, account.email):
         raise CredentialsError(message="Email does not match authenticated account")
     if not verify_password(password, account.hashed_password):
         raise PasswordValidationError(field="password", message="Password is incorrect")
@@ -389,7 +415,7 @@ def get_account_from_reset_token(
     """
     result = session.exec(
         select(Account, PasswordResetToken).where(
-            Account.email == email,
+            email_matches(Account.email, email),
             PasswordResetToken.token == token,
             PasswordResetToken.expires_at > datetime.now(UTC),
             PasswordResetToken.used == False,  # noqa: E712
@@ -448,8 +474,4 @@ async def get_user_from_request(request: Request) -> Optional[User]:
             # The user will need to make another request to get new tokens.
             pass
 
-        if user:
-            # Eagerly load avatar so it's available after the session closes
-            _ = user.avatar
-
         return user
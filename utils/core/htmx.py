@@ -1,7 +1,9 @@
 import json
+from typing import Any, Mapping, Self
 from urllib.parse import quote, unquote
 from starlette.requests import Request
 from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
 from fastapi.templating import Jinja2Templates
 from starlette.templating import _TemplateResponse as TemplateResponse
 from utils.core.auth import COOKIE_SECURE
@@ -11,11 +13,36 @@ def is_htmx_request(request: Request) -> bool:
     return request.headers.get("HX-Request") == "true"
 
 
+# id of the <main> element in base.html that boosted header links target.
+MAIN_CONTENT_ID = "main-content"
+
+
+def is_boosted_fragment_request(request: Request) -> bool:
+    """
+    Return True if only the page content needs to be rendered.
+
+    Boosted header links target #main-content, so htmx discards everything
+    outside it. History restores (a cache miss on back/forward) need the full
+    document, as do boosted requests aimed at any other target.
+    """
+    return (
+        is_htmx_request(request)
+        and request.headers.get("HX-Boosted") == "true"
+        and request.headers.get("HX-Target") == MAIN_CONTENT_ID
+        and request.headers.get("HX-History-Restore-Request") != "true"
+    )
+
+
 def htmx_redirect(response: Response, url: str) -> None:
     """Set HX-Redirect header so HTMX performs a client-side navigation."""
     response.headers["HX-Redirect"] = url
 
 
+def oob_only(response: Response) -> None:
+    """Set HX-Reswap so htmx skips the main swap and applies only OOB fragments."""
+    response.headers["HX-Reswap"] = "none"
+
+
 def toast_response(
     request: Request,
     templates: Jinja2Templates,
@@ -36,35 +63,81 @@ def toast_response(
     return response
 
 
-def _render_toast_html(
-    request: Request,
-    templates: Jinja2Templates,
-    message: str,
-    level: str = "success",
-) -> str:
-    """Render the toast partial to an HTML string."""
-    resp = templates.TemplateResponse(
-        request,
-        "base/partials/toast.html",
-        {"message": message, "level": level},
-    )
-    return bytes(resp.body).decode()
+class FragmentResponse(Response):
+    """
+    HTML response made of a main fragment followed by any number of OOB fragments.
 
+    Each fragment is rendered and encoded once, then kept as its own chunk and
+    sent as its own ASGI body message, so adding a toast or an extra OOB swap
+    never copies the fragments rendered before it.
 
-def append_toast(
-    response: TemplateResponse,
-    request: Request,
-    templates: Jinja2Templates,
-    message: str,
-    level: str = "success",
-) -> TemplateResponse:
-    """Append an OOB toast partial to an existing TemplateResponse body."""
-    toast_html = _render_toast_html(request, templates, message, level)
-    original_body = bytes(response.body).decode()
-    response.body = (original_body + toast_html).encode()
-    # Update content-length header
-    response.headers["content-length"] = str(len(response.body))
-    return response
+    Example:
+        return FragmentResponse(
+            request, templates, "organization/partials/roles_table.html", context
+        ).add_toast("Role created successfully.")
+    """
+
+    media_type = "text/html"
+
+    def __init__(
+        self,
+        request: Request,
+        templates: Jinja2Templates,
+        name: str,
+        context: dict[str, Any] | None = None,
+        status_code: int = 200,
+        headers: Mapping[str, str] | None = None,
+    ) -> None:
+        self.request = request
+        self.templates = templates
+        super().__init__(status_code=status_code, headers=headers)
+        self.add(name, context)
+
+    @property
+    def body(self) -> bytes:  # type: ignore[override]
+        """The joined body. Copies every chunk, so avoid it outside tests."""
+        return b"".join(self.chunks)
+
+    @body.setter
+    def body(self, value: bytes | memoryview) -> None:
+        # Response.__init__ assigns the rendered content here.
+        self.chunks: list[bytes] = [bytes(value)] if value else []
+
+    def add(self, name: str, context: dict[str, Any] | None = None) -> Self:
+        """Render a template and append it as the next chunk."""
+        template = self.templates.get_template(name)
+        html = template.render({**(context or {}), "request": self.request})
+        self.chunks.append(html.encode(self.charset))
+        self.headers["content-length"] = str(sum(len(chunk) for chunk in self.chunks))
+        return self
+
+    def add_toast(self, message: str, level: str = "success") -> Self:
+        """Append an OOB toast swapped into #toast-container."""
+        return self.add(
+            "base/partials/toast.html", {"message": message, "level": level}
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": self.status_code,
+                "headers": self.raw_headers,
+            }
+        )
+        last = len(self.chunks) - 1
+        for index, chunk in enumerate(self.chunks):
+            await send(
+                {
+                    "type": "http.response.body",
+                    "body": chunk,
+                    "more_body": index < last,
+                }
+            )
+        if not self.chunks:
+            await send({"type": "http.response.body", "body": b""})
+        if self.background is not None:
+            await self.background()
 
 
 # --- Flash cookie helpers for non-HTMX PRG redirects ---
@@ -2,9 +2,10 @@ import os
 from logging import getLogger, DEBUG
 from typing import Literal, Optional
 import resend
-from sqlmodel import Session, select
+from sqlmodel import Session, col, select
 from jinja2.environment import Template
-from fastapi.templating import Jinja2Templates
+from utils.core.templating import create_templates
+from utils.core.metrics import record_email
 
 from utils.core.models import utc_now, Invitation, Organization, User
 from exceptions.exceptions import EmailSendFailedError
@@ -20,7 +21,7 @@ logger = getLogger("uvicorn.error")
 logger.setLevel(DEBUG)
 
 # Setup templates
-templates = Jinja2Templates(directory="templates")
+templates = create_templates()
 
 
 def generate_invitation_link(token: str) -> str:
@@ -44,7 +45,9 @@ def get_invitation_token_warning(
 ) -> Optional[InvitationTokenWarning]:
     """Return a warning key for register/login UI, or None if the token is active."""
     invitation = session.exec(
-        select(Invitation).where(Invitation.token == token)
+        select(Invitation)
+        .join(Organization, col(Organization.id) == col(Invitation.organization_id))
+        .where(Invitation.token == token, col(Organization.deleting_at).is_(None))
     ).first()
     if invitation is None or invitation.used:
         return "invalid"
@@ -56,7 +59,9 @@ def get_invitation_token_warning(
 def require_active_invitation_by_token(session: Session, token: str) -> Invitation:
     """Load an invitation by token or raise an HTTP exception with a clear message."""
     invitation = session.exec(
-        select(Invitation).where(Invitation.token == token)
+        select(Invitation)
+        .join(Organization, col(Organization.id) == col(Invitation.organization_id))
+        .where(Invitation.token == token, col(Organization.deleting_at).is_(None))
     ).first()
     if invitation is None or invitation.used:
         raise InvalidInvitationTokenError()
@@ -115,7 +120,8 @@ def send_invitation_email(invitation: Invitation, session: Session) -> None:
             "html": html_content,
         }
 
-        sent_email = resend.Emails.send(params)  # ty: ignore[invalid-argument-type]
+        with record_email("organization_invite"):
+            sent_email = resend.Emails.send(params)  # ty: ignore[invalid-argument-type]
         logger.info(
             f"Organization invitation email sent to {invitation.invitee_email}: {sent_email.get('id')}"
         )
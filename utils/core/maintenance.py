@@ -0,0 +1,310 @@
+"""
+Background maintenance: janitors that purge expired tokens, stale rate-limit
+attempts and lapsed invitations, and the in-process scheduler that runs them.
+
+Every worker starts a scheduler from the app lifespan, but each tick only the
+worker that wins pg_try_advisory_xact_lock runs the janitors, so the cluster
+behaves as if it had a single leader. Deletes are batched by ctid so no single
+statement holds locks on more than MAINTENANCE_BATCH_SIZE rows; rate-limit
+attempts live in hourly partitions, which are rotated instead of deleted, and
+organization deletions left unfinished by a background task are resumed.
+"""
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from logging import getLogger
+from typing import Any, Callable
+
+from sqlalchemy import Connection, Engine, inspect
+from sqlmodel import SQLModel, col, create_engine, func, or_, select
+
+from utils.core.db import delete_in_batches, get_connection_url
+from utils.core.metrics import JANITOR_DELETED, JANITOR_DURATION, JANITOR_RUNS
+from utils.core.organizations import resume_stalled_organization_deletions
+from utils.core.partitions import (
+    UNPARTITIONED_WARNING,
+    create_partitions,
+    drop_expired_partitions,
+    is_partitioned,
+    rate_limit_backend,
+)
+from utils.core.models import (
+    AccountRecoveryToken,
+    EmailVerificationToken,
+    Invitation,
+    PasswordResetToken,
+    RefreshToken,
+    utc_now,
+)
+
+logger = getLogger("uvicorn.error")
+
+DEFAULT_INTERVAL_SECONDS = 300
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_STOP_TIMEOUT_SECONDS = 10
+
+# Arbitrary application-wide key for the maintenance leader lock
+MAINTENANCE_LOCK_ID = 7_310_042_952
+
+# Whether this process has already warned that rotation can't run
+_unpartitioned_warned = False
+
+
+@dataclass(frozen=True)
+class Janitor:
+    """A table to purge and the condition selecting its purgeable rows."""
+
+    name: str
+    model: type[SQLModel]
+    condition: Callable[[datetime], Any]
+
+
+@dataclass(frozen=True)
+class TaskJanitor:
+    """
+    A janitor that does its own cleanup, such as dropping whole partitions,
+    and returns how many units (e.g. "partitions") it removed.
+    """
+
+    name: str
+    run: Callable[[Connection, datetime], int]
+    unit: str
+
+
+@dataclass
+class JanitorStats:
+    """
+    Running totals for one janitor in this process. For a TaskJanitor the
+    deleted counts are in the janitor's unit, not rows.
+    """
+
+    runs: int = 0
+    rows_deleted: int = 0
+    seconds: float = 0.0
+    last_rows_deleted: int = 0
+    last_run_at: datetime | None = None
+
+
+def rotate_rate_limit_partitions(connection: Connection, now: datetime) -> int:
+    """
+    Create the coming hours' rate-limit partitions, drop those outside every
+    limiter window and return how many were dropped. Does nothing unless
+    attempts are kept in Postgres and the table has been partitioned.
+    """
+    global _unpartitioned_warned
+    # Imported lazily: rate_limit builds its limiters from the environment
+    from utils.core.rate_limit import rate_limit_retention
+
+    if rate_limit_backend() != "postgres":
+        return 0
+    if not is_partitioned(connection):
+        if not _unpartitioned_warned:
+            logger.warning(UNPARTITIONED_WARNING)
+            _unpartitioned_warned = True
+        return 0
+
+    create_partitions(connection, now)
+    dropped = drop_expired_partitions(connection, rate_limit_retention(), now)
+    connection.commit()
+    return len(dropped)
+
+
+# Revoked refresh tokens are kept until they expire so a replayed token can
+# still be recognised as reuse; single-use tokens go once used or expired.
+JANITORS: tuple[Janitor | TaskJanitor, ...] = (
+    Janitor(
+        "refresh_tokens",
+        RefreshToken,
+        lambda now: col(RefreshToken.expires_at) < now,
+    ),
+    Janitor(
+        "password_reset_tokens",
+        PasswordResetToken,
+        lambda now: or_(
+            col(PasswordResetToken.used), col(PasswordResetToken.expires_at) < now
+        ),
+    ),
+    Janitor(
+        "email_verification_tokens",
+        EmailVerificationToken,
+        lambda now: or_(
+            col(EmailVerificationToken.used),
+            col(EmailVerificationToken.expires_at) < now,
+        ),
+    ),
+    Janitor(
+        "account_recovery_tokens",
+        AccountRecoveryToken,
+        lambda now: or_(
+            col(AccountRecoveryToken.used), col(AccountRecoveryToken.expires_at) < now
+        ),
+    ),
+    TaskJanitor("rate_limit_attempts", rotate_rate_limit_partitions, "partitions"),
+    # Accepted invitations are kept as a record of who joined through them
+    Janitor(
+        "expired_invitations",
+        Invitation,
+        lambda now: ~col(Invitation.used) & (col(Invitation.expires_at) < now),
+    ),
+    TaskJanitor(
+        "stalled_organization_deletions",
+        resume_stalled_organization_deletions,
+        "organizations",
+    ),
+)
+
+
+def purge_in_batches(
+    connection: Connection,
+    janitor: Janitor,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    now: datetime | None = None,
+) -> int:
+    """
+    Delete the janitor's rows batch_size at a time, committing after each
+    batch, and return how many were deleted.
+    """
+    return delete_in_batches(
+        connection,
+        inspect(janitor.model).local_table,
+        janitor.condition(now or utc_now()),
+        batch_size,
+    )
+
+
+class MaintenanceScheduler:
+    """
+    Runs the janitors every interval_seconds on a daemon thread. A tick does
+    nothing unless this worker takes the cluster-wide advisory lock; the lock
+    is released at the end of the tick, so leadership moves to another worker
+    if this one exits.
+
+    The lock is transaction-scoped and held in an open transaction on a
+    connection of its own for the whole tick, while the janitors commit on
+    another. Behind PgBouncer in transaction mode the open transaction keeps
+    the lock on one server backend, and ending it (or losing the connection)
+    always releases the lock.
+    """
+
+    def __init__(
+        self,
+        janitors: tuple[Janitor | TaskJanitor, ...] = JANITORS,
+        interval_seconds: int = DEFAULT_INTERVAL_SECONDS,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        engine: Engine | None = None,
+    ):
+        self.janitors = janitors
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self.stats: dict[str, JanitorStats] = {
+            janitor.name: JanitorStats() for janitor in janitors
+        }
+        self._engine = engine
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _get_engine(self) -> Engine:
+        if self._engine is None:
+            self._engine = create_engine(get_connection_url())
+        return self._engine
+
+    def run_once(self) -> bool:
+        """
+        Run every janitor if this worker wins the leader lock. Returns whether
+        it did; a janitor that fails is logged and the rest still run.
+        """
+        engine = self._get_engine()
+        with engine.connect() as lock_connection:
+            leader = lock_connection.execute(
+                select(func.pg_try_advisory_xact_lock(MAINTENANCE_LOCK_ID))
+            ).scalar()
+            try:
+                if not leader:
+                    return False
+                with engine.connect() as connection:
+                    for janitor in self.janitors:
+                        self._run_janitor(connection, janitor)
+            finally:
+                # Ends the lock's transaction, which releases the lock
+                lock_connection.rollback()
+        return True
+
+    def _run_janitor(
+        self, connection: Connection, janitor: Janitor | TaskJanitor
+    ) -> None:
+        started = time.perf_counter()
+        try:
+            if isinstance(janitor, TaskJanitor):
+                deleted = janitor.run(connection, utc_now())
+            else:
+                deleted = purge_in_batches(connection, janitor, self.batch_size)
+        except Exception:
+            connection.rollback()
+            logger.exception(f"Maintenance janitor {janitor.name} failed")
+            return
+        elapsed = time.perf_counter() - started
+        stats = self.stats[janitor.name]
+        stats.runs += 1
+        stats.rows_deleted += deleted
+        stats.seconds += elapsed
+        stats.last_rows_deleted = deleted
+        stats.last_run_at = utc_now()
+        JANITOR_RUNS.inc(janitor.name)
+        JANITOR_DELETED.inc(janitor.name, amount=deleted)
+        JANITOR_DURATION.inc(janitor.name, amount=elapsed)
+        if deleted:
+            unit = janitor.unit if isinstance(janitor, TaskJanitor) else "rows"
+            logger.info(
+                f"Maintenance janitor {janitor.name} deleted {deleted} {unit} "
+                f"in {elapsed:.3f}s"
+            )
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Maintenance tick failed")
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._loop, name="maintenance-scheduler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout_seconds: float = DEFAULT_STOP_TIMEOUT_SECONDS) -> None:
+        """
+        Stop the scheduler, waiting up to timeout_seconds for a tick in
+        progress. A tick still running after that is abandoned to the daemon
+        thread so shutdown isn't held up by, say, a large organization delete.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout_seconds)
+            if self._thread.is_alive():
+                logger.warning(
+                    f"Maintenance tick still running after {timeout_seconds}s; "
+                    "not waiting for it"
+                )
+            self._thread = None
+        if self._engine is not None:
+            self._engine.dispose()
+
+
+def maintenance_enabled() -> bool:
+    return os.getenv("MAINTENANCE_ENABLED", "1") != "0"
+
+
+def scheduler_from_env() -> MaintenanceScheduler:
+    return MaintenanceScheduler(
+        interval_seconds=int(
+            os.getenv("MAINTENANCE_INTERVAL_SECONDS", DEFAULT_INTERVAL_SECONDS)
+        ),
+        batch_size=int(os.getenv("MAINTENANCE_BATCH_SIZE", DEFAULT_BATCH_SIZE)),
+    )
@@ -0,0 +1,493 @@
+"""
+Prometheus metrics, exported in the text exposition format by GET /metrics.
+
+A small in-process registry of counters, gauges and histograms (the app has
+no prometheus_client dependency). Metrics are module-level objects defined
+below and updated from the code they describe: the request middleware in
+main.py, connection pool events, rate limiting, bcrypt, template rendering,
+email sending and the maintenance janitors.
+
+With several uvicorn workers each process only sees its own requests, so in
+multiprocess mode (METRICS_MULTIPROC_DIR set to a directory shared by the
+workers) every worker writes a snapshot file there every few seconds, and a
+scrape merges all of them. Counters and histograms of exited workers keep
+counting; their gauges are dropped. A starting worker removes the snapshots of
+processes that are no longer running, so files from an earlier run (or from a
+dead worker whose PID it now has) are not merged in. Files in the directory
+whose names are not PIDs are ignored.
+"""
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from logging import getLogger
+from pathlib import Path
+from typing import Any, Iterator, MutableMapping
+
+from sqlalchemy import Engine, event
+from sqlalchemy.pool import Pool
+
+logger = getLogger("uvicorn.error")
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DEFAULT_FLUSH_SECONDS = 5
+
+
+class Metric:
+    """A named metric holding one value per combination of label values."""
+
+    kind = ""
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        registry: "Registry | None" = None,
+    ):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values: dict[tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+        (REGISTRY if registry is None else registry).register(self)
+
+    def _key(self, labels: tuple[Any, ...]) -> tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        return tuple(str(label) for label in labels)
+
+    def describe(self) -> dict[str, Any]:
+        """The metric's definition and current values, as JSON-safe data."""
+        with self._lock:
+            samples = [[list(key), value] for key, value in self._values.items()]
+        return {
+            "kind": self.kind,
+            "help": self.help,
+            "labelnames": list(self.labelnames),
+            "samples": samples,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, *labels: Any, amount: float = 1.0) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def inc(self, *labels: Any, amount: float = 1.0) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, *labels: Any, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    @contextmanager
+    def track_in_progress(self, *labels: Any) -> Iterator[None]:
+        """Count the block as in progress while it runs."""
+        self.inc(*labels)
+        try:
+            yield
+        finally:
+            self.dec(*labels)
+
+
+class Histogram(Metric):
+    """
+    Observations counted into buckets. A value is the per-bucket counts (the
+    last bucket is +Inf) and the sum of the observations.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+        registry: "Registry | None" = None,
+    ):
+        self.buckets = buckets
+        super().__init__(name, help, labelnames, registry)
+
+    def observe(self, value: float, *labels: Any) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(key) or ((0,) * (len(self.buckets) + 1), 0)
+            # A new tuple each time, so snapshots never see a later observation
+            self._values[key] = (
+                counts[:index] + (counts[index] + 1,) + counts[index + 1 :],
+                total + value,
+            )
+
+    @contextmanager
+    def time(self, *labels: Any) -> Iterator[None]:
+        """Observe how long the block takes, in seconds."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def describe(self) -> dict[str, Any]:
+        described = super().describe()
+        described["buckets"] = list(self.buckets)
+        described["samples"] = [
+            [labels, {"counts": list(counts), "sum": total}]
+            for labels, (counts, total) in described["samples"]
+        ]
+        return described
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        """Every metric in this process, keyed by name."""
+        return {name: metric.describe() for name, metric in self._metrics.items()}
+
+    def clear(self) -> None:
+        for metric in self._metrics.values():
+            metric.clear()
+
+
+REGISTRY = Registry()
+
+
+# --- Multiprocess mode ---
+
+
+def multiprocess_dir() -> Path | None:
+    directory = os.getenv("METRICS_MULTIPROC_DIR")
+    return Path(directory) if directory else None
+
+
+def metrics_token() -> str | None:
+    """The bearer token /metrics requires; the endpoint is off without one."""
+    return os.getenv("METRICS_TOKEN") or None
+
+
+def write_snapshot(directory: Path, registry: Registry = REGISTRY) -> None:
+    """Write this process's snapshot to directory, replacing the previous one."""
+    path = directory / f"{os.getpid()}.json"
+    partial = path.with_suffix(".tmp")
+    partial.write_text(json.dumps(registry.snapshot()))
+    partial.replace(path)
+
+
+def _snapshot_pid(path: Path) -> int | None:
+    """The PID of the worker that wrote a snapshot file, or None for other files."""
+    return int(path.stem) if path.stem.isdigit() else None
+
+
+def remove_stale_snapshots(directory: Path) -> None:
+    """
+    Remove the snapshots of processes that are no longer running, and any left
+    under this process's own PID by an earlier process that had it.
+    """
+    for path in directory.glob("*.json"):
+        pid = _snapshot_pid(path)
+        if pid is None or (pid != os.getpid() and _process_alive(pid)):
+            continue
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def merge_snapshots(
+    snapshots: list[tuple[dict[str, dict[str, Any]], bool]],
+) -> dict[str, dict[str, Any]]:
+    """
+    Sum (snapshot, process_alive) pairs into one snapshot. Gauges only count
+    from live processes, since an exited worker has nothing in flight.
+    """
+    merged: dict[str, dict[str, Any]] = {}
+    totals: dict[str, dict[tuple[str, ...], Any]] = {}
+    for snapshot, alive in snapshots:
+        for name, described in snapshot.items():
+            if name not in merged:
+                merged[name] = {**described, "samples": []}
+                totals[name] = {}
+            if described["kind"] == "gauge" and not alive:
+                continue
+            values = totals[name]
+            for labels, value in described["samples"]:
+                key = tuple(labels)
+                if described["kind"] == "histogram":
+                    counts: list[int] = value["counts"]
+                    if key in values:
+                        counts = [a + b for a, b in zip(values[key]["counts"], counts)]
+                        value = {
+                            "counts": counts,
+                            "sum": values[key]["sum"] + value["sum"],
+                        }
+                    values[key] = value
+                else:
+                    values[key] = values.get(key, 0.0) + value
+    for name, values in totals.items():
+        merged[name]["samples"] = [[list(key), value] for key, value in values.items()]
+    return merged
+
+
+def collect(registry: Registry = REGISTRY) -> dict[str, dict[str, Any]]:
+    """
+    This process's metrics, or in multiprocess mode every worker's merged
+    (after refreshing this process's own snapshot file).
+    """
+    directory = multiprocess_dir()
+    if directory is None:
+        return registry.snapshot()
+    write_snapshot(directory, registry)
+    snapshots = []
+    for path in directory.glob("*.json"):
+        pid = _snapshot_pid(path)
+        if pid is None:
+            continue
+        try:
+            snapshot = json.loads(path.read_text())
+        except (OSError, ValueError):
+            # Replaced or removed while we read it; the next scrape sees it
+            continue
+        snapshots.append((snapshot, _process_alive(pid)))
+    return merge_snapshots(snapshots)
+
+
+class MetricsFlusher:
+    """
+    Writes this process's snapshot to the multiprocess directory every
+    interval_seconds on a daemon thread, and once more on stop.
+    """
+
+    def __init__(
+        self, directory: Path, interval_seconds: float = DEFAULT_FLUSH_SECONDS
+    ):
+        self.directory = directory
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def flush(self) -> None:
+        try:
+            write_snapshot(self.directory)
+        except OSError:
+            logger.exception("Failed to write metrics snapshot")
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            self.flush()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        remove_stale_snapshots(self.directory)
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._loop, name="metrics-flusher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+
+def flusher_from_env() -> MetricsFlusher | None:
+    directory = multiprocess_dir()
+    if directory is None:
+        return None
+    return MetricsFlusher(
+        directory,
+        interval_seconds=float(
+            os.getenv("METRICS_FLUSH_SECONDS", DEFAULT_FLUSH_SECONDS)
+        ),
+    )
+
+
+# --- Exposition ---
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_text(names: list[str], values: list[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def render(snapshot: dict[str, dict[str, Any]]) -> str:
+    """A snapshot in the Prometheus text exposition format."""
+    lines = []
+    for name, described in sorted(snapshot.items()):
+        lines.append(f"# HELP {name} {described['help']}")
+        lines.append(f"# TYPE {name} {described['kind']}")
+        names = described["labelnames"]
+        for labels, value in sorted(described["samples"], key=lambda s: s[0]):
+            if described["kind"] != "histogram":
+                lines.append(f"{name}{_label_text(names, labels)} {_number(value)}")
+                continue
+            cumulative = 0
+            bounds = [_number(bound) for bound in described["buckets"]] + ["+Inf"]
+            for bound, count in zip(bounds, value["counts"]):
+                cumulative += count
+                le = _label_text(names, labels, f'le="{bound}"')
+                lines.append(f"{name}_bucket{le} {cumulative}")
+            lines.append(f"{name}_sum{_label_text(names, labels)} {value['sum']}")
+            lines.append(f"{name}_count{_label_text(names, labels)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+# --- Application metrics ---
+
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "Requests currently being handled."
+)
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time to handle a request, by route template, method and status.",
+    ("route", "method", "status"),
+)
+DB_CHECKOUTS = Counter("db_pool_checkouts_total", "Connections checked out of a pool.")
+DB_CHECKED_OUT = Gauge(
+    "db_pool_checked_out", "Connections currently checked out of a pool."
+)
+DB_CONNECT_DURATION = Histogram(
+    "db_connect_seconds",
+    "Time spent opening a new database connection for a pool.",
+)
+RATE_LIMIT_REJECTIONS = Counter(
+    "rate_limit_rejections_total", "Requests refused by a rate limiter.", ("scope",)
+)
+BCRYPT_IN_PROGRESS = Gauge(
+    "bcrypt_operations_in_progress", "Password hashes or checks currently running."
+)
+BCRYPT_DURATION = Histogram(
+    "bcrypt_duration_seconds",
+    "Time to hash or check a password.",
+    ("operation",),
+)
+TEMPLATE_RENDER_DURATION = Histogram(
+    "template_render_seconds", "Time to render a Jinja2 template.", ("template",)
+)
+EMAILS_SENT = Counter(
+    "emails_sent_total",
+    "Emails handed to the email API, by outcome.",
+    ("kind", "outcome"),
+)
+JANITOR_RUNS = Counter(
+    "maintenance_janitor_runs_total",
+    "Completed maintenance janitor runs.",
+    ("janitor",),
+)
+JANITOR_DELETED = Counter(
+    "maintenance_janitor_deleted_total",
+    "Rows (or the janitor's own unit) removed by maintenance janitors.",
+    ("janitor",),
+)
+JANITOR_DURATION = Counter(
+    "maintenance_janitor_seconds_total",
+    "Time spent in maintenance janitor runs.",
+    ("janitor",),
+)
+
+
+def route_template(scope: MutableMapping[str, Any]) -> str:
+    """A request's route template (e.g. /organizations/{org_id}), for labels."""
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    # Mounted apps such as /static leave only their mount path behind
+    mount_path = scope.get("root_path", "").removeprefix(scope.get("app_root_path", ""))
+    return mount_path or "unmatched"
+
+
+@contextmanager
+def record_email(kind: str) -> Iterator[None]:
+    """Count the email sent in the block as sent, or failed if it raises."""
+    try:
+        yield
+    except Exception:
+        EMAILS_SENT.inc(kind, "failed")
+        raise
+    EMAILS_SENT.inc(kind, "sent")
+
+
+# Every request opens its own engine, so these listen on every pool. A new
+# connection is opened in the thread that asked for it, so the start time is
+# kept per thread between do_connect and the pool's connect event.
+_connect_started = threading.local()
+
+
+@event.listens_for(Engine, "do_connect")
+def _start_connect_timer(dialect: Any, conn_rec: Any, cargs: Any, cparams: Any) -> None:
+    _connect_started.at = time.perf_counter()
+
+
+@event.listens_for(Pool, "connect")
+def _record_connect(dbapi_connection: Any, connection_record: Any) -> None:
+    started = getattr(_connect_started, "at", None)
+    if started is not None:
+        DB_CONNECT_DURATION.observe(time.perf_counter() - started)
+        _connect_started.at = None
+
+
+@event.listens_for(Pool, "checkout")
+def _record_checkout(
+    dbapi_connection: Any, connection_record: Any, connection_proxy: Any
+) -> None:
+    DB_CHECKOUTS.inc()
+    DB_CHECKED_OUT.inc()
+
+
+@event.listens_for(Pool, "checkin")
+def _record_checkin(dbapi_connection: Any, connection_record: Any) -> None:
+    DB_CHECKED_OUT.dec()
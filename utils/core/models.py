@@ -2,10 +2,19 @@ from enum import StrEnum
 from logging import getLogger, DEBUG
 from uuid import uuid4
 from datetime import datetime, UTC, timedelta
-from typing import Optional, List, Union
+from typing import Any, Optional, List, Union
 from pydantic import EmailStr
 from sqlmodel import SQLModel, Field, Relationship, Session, select, col
-from sqlalchemy import Column, LargeBinary, String, UniqueConstraint
+from sqlalchemy import (
+    Column,
+    ColumnElement,
+    Index,
+    LargeBinary,
+    String,
+    UniqueConstraint,
+    func,
+    text,
+)
 from sqlalchemy.orm import Mapped
 from exceptions.http_exceptions import DataIntegrityError
 
@@ -33,42 +42,82 @@ def _expires_at_passed(expires_at: datetime) -> bool:
     return now > expires_at
 
 
+def email_matches(column: Any, email: Optional[str]) -> ColumnElement[bool]:
+    """
+    Case-insensitive email comparison. Emails keep the case they were entered
+    in, so lookups compare lower() of both sides, which the lower(email)
+    indexes on Account, AccountEmail and Invitation serve.
+    """
+    return func.lower(column) == func.lower(email)
+
+
+def same_email(a: str, b: str) -> bool:
+    """Python-side counterpart of email_matches()."""
+    return a.lower() == b.lower()
+
+
 # --- Private database models ---
 
+# Dependent rows are removed by the foreign keys' ON DELETE rules; passive_deletes
+# stops the ORM from loading them first just to delete them one by one.
+
 
 # TODO: Handle password hashing and checking on the data model?
 class Account(SQLModel, table=True):
-    __table_args__ = {"schema": "private"}
+    __table_args__ = (
+        Index("uq_account_lower_email", text("lower(email)"), unique=True),
+        {"schema": "private"},
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
-    email: EmailStr = Field(index=True, unique=True)
+    email: EmailStr
     hashed_password: str
+    # Bumped to invalidate every access token issued before (see "ver" claim)
+    token_version: int = Field(default=0)
     created_at: datetime = Field(default_factory=utc_now)
     updated_at: datetime = Field(default_factory=utc_now)
 
     user: Mapped[Optional["User"]] = Relationship(
         back_populates="account",
-        sa_relationship_kwargs={"cascade": "all, delete-orphan"},
+        sa_relationship_kwargs={
+            "cascade": "all, delete-orphan",
+            "passive_deletes": True,
+        },
     )
     password_reset_tokens: Mapped[List["PasswordResetToken"]] = Relationship(
         back_populates="account",
-        sa_relationship_kwargs={"cascade": "all, delete-orphan"},
+        sa_relationship_kwargs={
+            "cascade": "all, delete-orphan",
+            "passive_deletes": True,
+        },
     )
     emails: Mapped[List["AccountEmail"]] = Relationship(
         back_populates="account",
-        sa_relationship_kwargs={"cascade": "all, delete-orphan"},
+        sa_relationship_kwargs={
+            "cascade": "all, delete-orphan",
+            "passive_deletes": True,
+        },
     )
     email_verification_tokens: Mapped[List["EmailVerificationToken"]] = Relationship(
         back_populates="account",
-        sa_relationship_kwargs={"cascade": "all, delete-orphan"},
+        sa_relationship_kwargs={
+            "cascade": "all, delete-orphan",
+            "passive_deletes": True,
+        },
     )
     refresh_tokens: Mapped[List["RefreshToken"]] = Relationship(
         back_populates="account",
-        sa_relationship_kwargs={"cascade": "all, delete-orphan"},
+        sa_relationship_kwargs={
+            "cascade": "all, delete-orphan",
+            "passive_deletes": True,
+        },
     )
     account_recovery_tokens: Mapped[List["AccountRecoveryToken"]] = Relationship(
         back_populates="account",
-        sa_relationship_kwargs={"cascade": "all, delete-orphan"},
+        sa_relationship_kwargs={
+            "cascade": "all, delete-orphan",
+            "passive_deletes": True,
+        },
     )
 
 
@@ -76,7 +125,9 @@ class PasswordResetToken(SQLModel, table=True):
     __table_args__ = {"schema": "private"}
 
     id: Optional[int] = Field(default=None, primary_key=True)
-    account_id: Optional[int] = Field(foreign_key="private.account.id")
+    account_id: Optional[int] = Field(
+        foreign_key="private.account.id", ondelete="CASCADE"
+    )
     token: str = Field(default_factory=lambda: str(uuid4()), index=True, unique=True)
     expires_at: datetime = Field(
         default_factory=lambda: datetime.now(UTC) + timedelta(hours=1)
@@ -96,7 +147,13 @@ class PasswordResetToken(SQLModel, table=True):
 
 class AccountEmail(SQLModel, table=True):
     __table_args__ = (
-        UniqueConstraint("email", name="uq_account_email_email"),
+        Index("uq_accountemail_lower_email", text("lower(email)"), unique=True),
+        # Verified addresses of an account, checked on invitation login
+        Index(
+            "ix_accountemail_verified_account_id",
+            "account_id",
+            postgresql_where=text("verified"),
+        ),
         {"schema": "private"},
     )
 
@@ -104,7 +161,7 @@ class AccountEmail(SQLModel, table=True):
     account_id: int = Field(
         foreign_key="private.account.id", ondelete="CASCADE", index=True
     )
-    email: str = Field(index=True)
+    email: str
     is_primary: bool = Field(default=False)
     verified: bool = Field(default=False)
     verified_at: Optional[datetime] = Field(default=None)
@@ -117,7 +174,9 @@ class EmailVerificationToken(SQLModel, table=True):
     __table_args__ = {"schema": "private"}
 
     id: Optional[int] = Field(default=None, primary_key=True)
-    account_id: Optional[int] = Field(foreign_key="private.account.id")
+    account_id: Optional[int] = Field(
+        foreign_key="private.account.id", ondelete="CASCADE"
+    )
     token: str = Field(default_factory=lambda: str(uuid4()), index=True, unique=True)
     new_email: str
     expires_at: datetime = Field(
@@ -137,7 +196,9 @@ class AccountRecoveryToken(SQLModel, table=True):
     __table_args__ = {"schema": "private"}
 
     id: Optional[int] = Field(default=None, primary_key=True)
-    account_id: Optional[int] = Field(foreign_key="private.account.id")
+    account_id: Optional[int] = Field(
+        foreign_key="private.account.id", ondelete="CASCADE"
+    )
     token: str = Field(default_factory=lambda: str(uuid4()), index=True, unique=True)
     email: str  # the email address to restore
     expires_at: datetime = Field(
@@ -154,10 +215,20 @@ class AccountRecoveryToken(SQLModel, table=True):
 
 
 class RefreshToken(SQLModel, table=True):
-    __table_args__ = {"schema": "private"}
+    __table_args__ = (
+        # Live tokens of an account, revoked together on logout everywhere
+        Index(
+            "ix_refreshtoken_live_account_id",
+            "account_id",
+            postgresql_where=text("revoked IS FALSE"),
+        ),
+        {"schema": "private"},
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
-    account_id: Optional[int] = Field(foreign_key="private.account.id", index=True)
+    account_id: Optional[int] = Field(
+        foreign_key="private.account.id", ondelete="CASCADE", index=True
+    )
     jti: str = Field(default_factory=lambda: str(uuid4()), index=True, unique=True)
     expires_at: datetime
     revoked: bool = Field(default=False)
@@ -170,14 +241,38 @@ class RefreshToken(SQLModel, table=True):
 
 
 class RateLimitAttempt(SQLModel, table=True):
-    """Shared rate-limit counter row for multi-worker deployments."""
+    """
+    Shared rate-limit counter row for multi-worker deployments.
 
-    __table_args__ = {"schema": "private"}
+    Range-partitioned by the hour of attempted_at (see utils.core.partitions),
+    so expired attempts are dropped a partition at a time. The partition key
+    has to be part of the primary key.
+    """
 
-    id: Optional[int] = Field(default=None, primary_key=True)
+    __table_args__ = {
+        "schema": "private",
+        "postgresql_partition_by": "RANGE (attempted_at)",
+    }
+
+    id: Optional[int] = Field(
+        default=None, primary_key=True, sa_column_kwargs={"autoincrement": True}
+    )
     scope: str = Field(index=True)
     key: str = Field(index=True)
-    attempted_at: datetime = Field(default_factory=utc_now, index=True)
+    attempted_at: datetime = Field(default_factory=utc_now, primary_key=True)
+
+
+class SchemaVersion(SQLModel, table=True):
+    """
+    Single row recording the schema fingerprint set_up_db last applied, so
+    worker boots can skip DDL and seeding when the database is current.
+    """
+
+    __table_args__ = {"schema": "private"}
+
+    id: int = Field(default=1, primary_key=True)
+    fingerprint: str
+    applied_at: datetime = Field(default_factory=utc_now)
 
 
 # --- Public database models ---
@@ -189,13 +284,21 @@ class UserRoleLink(SQLModel, table=True):
     between users and roles.
     """
 
-    user_id: Optional[int] = Field(foreign_key="user.id", primary_key=True)
-    role_id: Optional[int] = Field(foreign_key="role.id", primary_key=True)
+    user_id: Optional[int] = Field(
+        foreign_key="user.id", ondelete="CASCADE", primary_key=True
+    )
+    role_id: Optional[int] = Field(
+        foreign_key="role.id", ondelete="CASCADE", primary_key=True
+    )
 
 
 class RolePermissionLink(SQLModel, table=True):
-    role_id: Optional[int] = Field(foreign_key="role.id", primary_key=True)
-    permission_id: Optional[int] = Field(foreign_key="permission.id", primary_key=True)
+    role_id: Optional[int] = Field(
+        foreign_key="role.id", ondelete="CASCADE", primary_key=True
+    )
+    permission_id: Optional[int] = Field(
+        foreign_key="permission.id", ondelete="CASCADE", primary_key=True
+    )
 
 
 class UserBase(SQLModel):
@@ -225,17 +328,25 @@ class User(UserBase, table=True):
     created_at: datetime = Field(default_factory=utc_now)
     updated_at: datetime = Field(default_factory=utc_now)
 
-    account_id: Optional[int] = Field(foreign_key="private.account.id", unique=True)
+    account_id: Optional[int] = Field(
+        foreign_key="private.account.id", ondelete="CASCADE", unique=True
+    )
     account: Mapped[Optional[Account]] = Relationship(back_populates="user")
     avatar: Mapped[Optional["UserAvatar"]] = Relationship(
         back_populates="user",
-        sa_relationship_kwargs={"cascade": "all, delete-orphan", "uselist": False},
+        sa_relationship_kwargs={
+            "cascade": "all, delete-orphan",
+            "passive_deletes": True,
+            "uselist": False,
+        },
     )
     roles: Mapped[List["Role"]] = Relationship(
-        back_populates="users", link_model=UserRoleLink
+        back_populates="users",
+        link_model=UserRoleLink,
+        sa_relationship_kwargs={"passive_deletes": True},
     )
     accepted_invitations: Mapped[List["Invitation"]] = Relationship(
-        back_populates="accepted_by"
+        back_populates="accepted_by", sa_relationship_kwargs={"passive_deletes": True}
     )
 
     @property
@@ -246,7 +357,9 @@ class User(UserBase, table=True):
         organizations = []
         organization_ids = set()
         for role in self.roles:
-            if role.organization_id not in organization_ids:
+            if role.organization_id in organization_ids:
+                continue
+            if role.organization.deleting_at is None:
                 organizations.append(role.organization)
                 organization_ids.add(role.organization_id)
         return organizations
@@ -269,23 +382,43 @@ class User(UserBase, table=True):
 
         for role in self.roles:
             if role.organization_id == organization_id:
+                if role.organization.deleting_at is not None:
+                    return False
                 return str(permission) in [perm.name for perm in role.permissions]
         return False
 
 
 class Organization(SQLModel, table=True):
+    __table_args__ = (
+        # Name uniqueness checks on create and rename skip orgs being deleted
+        Index(
+            "ix_organization_live_name",
+            "name",
+            postgresql_where=text("deleting_at IS NULL"),
+        ),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str
     created_at: datetime = Field(default_factory=utc_now)
     updated_at: datetime = Field(default_factory=utc_now)
+    # Set when deletion is requested; the org is hidden from members while a
+    # background task removes its rows (see utils.core.organizations)
+    deleting_at: Optional[datetime] = Field(default=None)
 
     roles: Mapped[List["Role"]] = Relationship(
         back_populates="organization",
-        sa_relationship_kwargs={"cascade": "all, delete-orphan"},
+        sa_relationship_kwargs={
+            "cascade": "all, delete-orphan",
+            "passive_deletes": True,
+        },
     )
     invitations: Mapped[List["Invitation"]] = Relationship(
         back_populates="organization",
-        sa_relationship_kwargs={"cascade": "all, delete-orphan"},
+        sa_relationship_kwargs={
+            "cascade": "all, delete-orphan",
+            "passive_deletes": True,
+        },
     )
 
     @property
@@ -318,19 +451,27 @@ class Role(SQLModel, table=True):
 
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str
-    organization_id: int = Field(foreign_key="organization.id")
+    organization_id: int = Field(foreign_key="organization.id", ondelete="CASCADE")
     created_at: datetime = Field(default_factory=utc_now)
     updated_at: datetime = Field(default_factory=utc_now)
 
     organization: Mapped[Organization] = Relationship(back_populates="roles")
     users: Mapped[List[User]] = Relationship(
-        back_populates="roles", link_model=UserRoleLink
+        back_populates="roles",
+        link_model=UserRoleLink,
+        sa_relationship_kwargs={"passive_deletes": True},
     )
     permissions: Mapped[List["Permission"]] = Relationship(
-        back_populates="roles", link_model=RolePermissionLink
+        back_populates="roles",
+        link_model=RolePermissionLink,
+        sa_relationship_kwargs={"passive_deletes": True},
     )
     invitations: Mapped[List["Invitation"]] = Relationship(
-        back_populates="role", sa_relationship_kwargs={"cascade": "all, delete-orphan"}
+        back_populates="role",
+        sa_relationship_kwargs={
+            "cascade": "all, delete-orphan",
+            "passive_deletes": True,
+        },
     )
 
     __table_args__ = (
@@ -351,7 +492,9 @@ class Permission(SQLModel, table=True):
     updated_at: datetime = Field(default_factory=utc_now)
 
     roles: Mapped[List[Role]] = Relationship(
-        back_populates="permissions", link_model=RolePermissionLink
+        back_populates="permissions",
+        link_model=RolePermissionLink,
+        sa_relationship_kwargs={"passive_deletes": True},
     )
 
 
@@ -360,27 +503,39 @@ class Permission(SQLModel, table=True):
 
 class Invitation(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    organization_id: int = Field(foreign_key="organization.id", index=True)
-    role_id: int = Field(foreign_key="role.id")
-    invitee_email: EmailStr = Field(index=True)
+    organization_id: int = Field(
+        foreign_key="organization.id", ondelete="CASCADE", index=True
+    )
+    role_id: int = Field(foreign_key="role.id", ondelete="CASCADE")
+    invitee_email: EmailStr
 
     token: str = Field(default_factory=lambda: str(uuid4()), index=True, unique=True)
     expires_at: datetime = Field(default_factory=lambda: utc_now() + timedelta(days=7))
     created_at: datetime = Field(default_factory=utc_now)
     used: bool = Field(default=False, index=True)
     accepted_at: Optional[datetime] = Field(default=None)
-    accepted_by_user_id: Optional[int] = Field(default=None, foreign_key="user.id")
+    accepted_by_user_id: Optional[int] = Field(
+        default=None, foreign_key="user.id", ondelete="SET NULL"
+    )
 
     organization: "Organization" = Relationship(back_populates="invitations")
     role: "Role" = Relationship(back_populates="invitations")
     accepted_by: Optional["User"] = Relationship(back_populates="accepted_invitations")
 
     __table_args__ = (
-        UniqueConstraint(
+        Index(
+            "uq_invitation_org_lower_email_used",
             "organization_id",
-            "invitee_email",
+            text("lower(invitee_email)"),
             "used",
-            name="uq_invitation_org_email_used",
+            unique=True,
+        ),
+        # Pending invitations of an org, newest first (get_pending_for_org)
+        Index(
+            "ix_invitation_pending_organization_id_created_at",
+            "organization_id",
+            "created_at",
+            postgresql_where=text("used IS FALSE"),
         ),
     )
 
@@ -427,7 +582,7 @@ class Invitation(SQLModel, table=True):
         """Delete unused invitations for an org+email. Caller must commit or rollback."""
         statement = select(cls).where(
             cls.organization_id == organization_id,
-            cls.invitee_email == invitee_email,
+            email_matches(cls.invitee_email, invitee_email),
             col(cls.used).is_(False),
         )
         pending: list[Invitation] = list(session.exec(statement).all())
@@ -1,41 +1,301 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from logging import getLogger
 from typing import Any, cast
 
-from sqlmodel import Session, select
-from sqlalchemy.orm import InstrumentedAttribute, selectinload
+from sqlmodel import (
+    SQLModel,
+    Session,
+    col,
+    create_engine,
+    delete,
+    func,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy import ColumnElement, Connection, Table, inspect, literal, tuple_
+from sqlalchemy.dialects.postgresql import JSONB, aggregate_order_by
+from sqlalchemy.orm import InstrumentedAttribute, contains_eager, selectinload
 
-from utils.core.models import Organization, Role, User, Invitation
+from utils.core.models import (
+    Account,
+    Organization,
+    Permission,
+    Role,
+    RolePermissionLink,
+    User,
+    UserRoleLink,
+    Invitation,
+    utc_naive_now,
+    utc_now,
+)
+from utils.core.db import delete_in_batches, get_connection_url
+from utils.core.pagination import decode_cursor, encode_cursor
+from utils.core.search import run_with_latency_budget
 
+logger = getLogger("uvicorn.error")
 
-def _user_permissions_for_org(user: User, organization_id: int) -> set[str]:
+MEMBERS_PAGE_SIZE = 25
+ORGANIZATION_DELETE_BATCH_SIZE = 1000
+ORGANIZATION_DELETE_RETRY_AFTER = timedelta(minutes=15)
+
+
+def user_permissions_for_org(user: User, organization_id: int) -> set[str]:
     user_permissions: set[str] = set()
     for role in user.roles:
-        if role.organization_id == organization_id:
+        if (
+            role.organization_id == organization_id
+            and role.organization.deleting_at is None
+        ):
             for permission in role.permissions:
                 user_permissions.add(permission.name)
     return user_permissions
 
 
+# --- Organization page read model ---
+# The organization page and members card only read the org's roles, their
+# permissions and member counts, and its pending invitations. Postgres builds
+# all of that as one JSON document in a single statement, which is decoded
+# into frozen, slotted view objects instead of ORM entities: no per-relationship
+# SELECTs, no lazy loads from the templates and no identity-map bookkeeping.
+# Member rows are paged ORM queries, converted to MemberView the same way.
+
+
+@dataclass(frozen=True, slots=True)
+class PermissionView:
+    name: str
+
+
+@dataclass(frozen=True, slots=True)
+class RoleView:
+    id: int
+    name: str
+    organization_id: int
+    permissions: tuple[PermissionView, ...]
+    member_count: int
+
+
+@dataclass(frozen=True, slots=True)
+class InvitationView:
+    id: int
+    invitee_email: str
+    role_id: int
+    role: RoleView
+    expires_at: datetime
+    created_at: datetime
+
+    def is_expired(self) -> bool:
+        # Timestamps in the document are naive UTC, as stored
+        return utc_naive_now() > self.expires_at
+
+
+@dataclass(frozen=True, slots=True)
+class OrganizationView:
+    id: int
+    name: str
+    roles: tuple[RoleView, ...]
+    invitations: tuple[InvitationView, ...]
+    member_count: int
+
+    @property
+    def member_counts(self) -> dict[int, int]:
+        """Role id -> member count, as role_row.html expects."""
+        return {role.id: role.member_count for role in self.roles}
+
+
+@dataclass(frozen=True, slots=True)
+class RoleRef:
+    id: int
+    name: str
+    organization_id: int
+
+
+@dataclass(frozen=True, slots=True)
+class MemberView:
+    """What a member row and edit-roles modal show, detached from the session."""
+
+    id: int
+    name: str | None
+    email: str
+    roles: tuple[RoleRef, ...]
+
+    @classmethod
+    def from_user(cls, user: User) -> "MemberView":
+        """Build from a user loaded with its account and roles."""
+        assert user.id is not None
+        return cls(
+            id=user.id,
+            name=user.name,
+            email=user.account.email if user.account else "",
+            roles=tuple(
+                RoleRef(role.id, role.name, role.organization_id)
+                for role in user.roles
+                if role.id is not None
+            ),
+        )
+
+    @classmethod
+    def from_member_row(
+        cls, user: User, organization_id: int, roles: list[list[Any]]
+    ) -> "MemberView":
+        """
+        Build from a member page row: a user loaded with its account, and the
+        [id, name] pairs of the roles it holds in the organization.
+        """
+        assert user.id is not None
+        return cls(
+            id=user.id,
+            name=user.name,
+            email=user.account.email if user.account else "",
+            roles=tuple(
+                RoleRef(role_id, name, organization_id) for role_id, name in roles
+            ),
+        )
+
+    @property
+    def role_ids(self) -> frozenset[int]:
+        return frozenset(role.id for role in self.roles)
+
+
+def _json_array(element: Any, order_by: Any) -> Any:
+    """jsonb_agg of element in order_by order, or [] when there are no rows."""
+    return func.coalesce(
+        func.jsonb_agg(aggregate_order_by(element, order_by)),
+        func.jsonb_build_array(),
+    )
+
+
+def _organization_document(organization_id: int) -> Any:
+    permissions = (
+        select(_json_array(col(Permission.name), col(Permission.id)))
+        .join(
+            RolePermissionLink,
+            col(RolePermissionLink.permission_id) == col(Permission.id),
+        )
+        .where(col(RolePermissionLink.role_id) == col(Role.id))
+        .scalar_subquery()
+    )
+    role_member_count = (
+        select(func.count())
+        .where(col(UserRoleLink.role_id) == col(Role.id))
+        .scalar_subquery()
+    )
+    roles = (
+        select(
+            _json_array(
+                func.jsonb_build_object(
+                    "id",
+                    Role.id,
+                    "name",
+                    Role.name,
+                    "permissions",
+                    permissions,
+                    "member_count",
+                    role_member_count,
+                ),
+                col(Role.id),
+            )
+        )
+        .where(col(Role.organization_id) == col(Organization.id))
+        .scalar_subquery()
+    )
+    invitations = (
+        select(
+            _json_array(
+                func.jsonb_build_object(
+                    "id",
+                    Invitation.id,
+                    "invitee_email",
+                    Invitation.invitee_email,
+                    "role_id",
+                    Invitation.role_id,
+                    "expires_at",
+                    Invitation.expires_at,
+                    "created_at",
+                    Invitation.created_at,
+                ),
+                col(Invitation.created_at).desc(),
+            )
+        )
+        .where(
+            col(Invitation.organization_id) == col(Organization.id),
+            col(Invitation.used).is_(False),
+        )
+        .scalar_subquery()
+    )
+    member_count = (
+        select(func.count(func.distinct(UserRoleLink.user_id)))
+        .join(Role, col(Role.id) == col(UserRoleLink.role_id))
+        .where(col(Role.organization_id) == col(Organization.id))
+        .scalar_subquery()
+    )
+    return select(
+        func.jsonb_build_object(
+            "id",
+            Organization.id,
+            "name",
+            Organization.name,
+            "roles",
+            roles,
+            "invitations",
+            invitations,
+            "member_count",
+            member_count,
+            type_=JSONB,
+        )
+    ).where(Organization.id == organization_id)
+
+
+def load_organization_view(
+    session: Session, organization_id: int
+) -> OrganizationView | None:
+    """
+    Load the organization page's roles, permissions, member counts and
+    pending invitations (newest first) in one round trip.
+    """
+    document = session.exec(_organization_document(organization_id)).first()
+    if document is None:
+        return None
+    roles = {
+        role["id"]: RoleView(
+            id=role["id"],
+            name=role["name"],
+            organization_id=organization_id,
+            permissions=tuple(PermissionView(name) for name in role["permissions"]),
+            member_count=role["member_count"],
+        )
+        for role in document["roles"]
+    }
+    return OrganizationView(
+        id=document["id"],
+        name=document["name"],
+        roles=tuple(roles.values()),
+        invitations=tuple(
+            InvitationView(
+                id=invitation["id"],
+                invitee_email=invitation["invitee_email"],
+                role_id=invitation["role_id"],
+                role=roles[invitation["role_id"]],
+                expires_at=datetime.fromisoformat(invitation["expires_at"]),
+                created_at=datetime.fromisoformat(invitation["created_at"]),
+            )
+            for invitation in document["invitations"]
+        ),
+        member_count=document["member_count"],
+    )
+
+
 def load_org_for_members_partial(
     session: Session, organization_id: int, user: User
-) -> tuple[Organization | None, set[str], list[Invitation]]:
-    """Re-query org with members fully loaded and compute user_permissions."""
-    organization = session.exec(
-        select(Organization)
-        .where(Organization.id == organization_id)
-        .options(
-            selectinload(cast(InstrumentedAttribute[Any], Organization.roles))
-            .selectinload(cast(InstrumentedAttribute[Any], Role.users))
-            .selectinload(cast(InstrumentedAttribute[Any], User.account)),
-            selectinload(cast(InstrumentedAttribute[Any], Organization.roles))
-            .selectinload(cast(InstrumentedAttribute[Any], Role.users))
-            .selectinload(cast(InstrumentedAttribute[Any], User.roles)),
-            selectinload(
-                cast(InstrumentedAttribute[Any], Organization.roles)
-            ).selectinload(cast(InstrumentedAttribute[Any], Role.permissions)),
-        )
-    ).first()
-    user_permissions = _user_permissions_for_org(user, organization_id)
-    pending_invitations = Invitation.get_pending_for_org(session, organization_id)
+) -> tuple[OrganizationView | None, set[str], list[InvitationView]]:
+    """
+    Load the org's page read model and compute user_permissions. Members are
+    loaded a page at a time with load_member_page.
+    """
+    organization = load_organization_view(session, organization_id)
+    user_permissions = user_permissions_for_org(user, organization_id)
+    pending_invitations = list(organization.invitations) if organization else []
     return organization, user_permissions, pending_invitations
 
 
@@ -55,5 +315,349 @@ def load_org_for_roles_partial(
             ).selectinload(cast(InstrumentedAttribute[Any], Role.permissions)),
         )
     ).first()
-    user_permissions = _user_permissions_for_org(user, organization_id)
+    user_permissions = user_permissions_for_org(user, organization_id)
     return organization, user_permissions
+
+
+# --- Row-level loaders ---
+# HTMX mutations re-render only the rows they touch (see member_row.html,
+# role_row.html and invitation_item.html), so these load a single row's data
+# instead of the whole organization graph.
+
+
+def load_member_for_row(
+    session: Session, organization_id: int, member_id: int, user: User
+) -> tuple[Organization | None, MemberView | None, set[str]]:
+    """Load one member and the org roles needed for its row and edit modal."""
+    organization = session.exec(
+        select(Organization)
+        .where(Organization.id == organization_id)
+        .options(selectinload(cast(InstrumentedAttribute[Any], Organization.roles)))
+    ).first()
+    member = session.exec(
+        select(User)
+        .where(User.id == member_id)
+        .options(
+            selectinload(cast(InstrumentedAttribute[Any], User.account)),
+            selectinload(cast(InstrumentedAttribute[Any], User.roles)),
+        )
+    ).first()
+    user_permissions = user_permissions_for_org(user, organization_id)
+    return (
+        organization,
+        MemberView.from_user(member) if member else None,
+        user_permissions,
+    )
+
+
+def load_roles_for_rows(
+    session: Session, organization_id: int, role_ids: set[int | None], user: User
+) -> tuple[list[Role], dict[int, int], set[str]]:
+    """Load roles with permissions and per-role member counts, without role.users."""
+    roles = list(
+        session.exec(
+            select(Role)
+            .where(
+                col(Role.id).in_(role_ids),
+                Role.organization_id == organization_id,
+            )
+            .options(selectinload(cast(InstrumentedAttribute[Any], Role.permissions)))
+        ).all()
+    )
+    member_counts = count_role_members(
+        session, {role.id for role in roles if role.id is not None}
+    )
+    user_permissions = user_permissions_for_org(user, organization_id)
+    return roles, member_counts, user_permissions
+
+
+def count_role_members(session: Session, role_ids: set[int]) -> dict[int, int]:
+    """Member count per role in one GROUP BY, for role rows without role.users."""
+    member_counts = {role_id: 0 for role_id in role_ids}
+    if member_counts:
+        member_counts.update(
+            session.exec(
+                select(UserRoleLink.role_id, func.count())
+                .where(col(UserRoleLink.role_id).in_(member_counts))
+                .group_by(col(UserRoleLink.role_id))
+            ).all()
+        )
+    return member_counts
+
+
+def count_org_members(session: Session, organization_id: int) -> int:
+    """Count distinct users holding at least one role in the organization."""
+    return session.exec(
+        select(func.count(func.distinct(UserRoleLink.user_id)))
+        .join(Role, col(Role.id) == col(UserRoleLink.role_id))
+        .where(Role.organization_id == organization_id)
+    ).one()
+
+
+def count_pending_invitations(session: Session, organization_id: int) -> int:
+    return session.exec(
+        select(func.count())
+        .select_from(Invitation)
+        .where(
+            Invitation.organization_id == organization_id,
+            col(Invitation.used).is_(False),
+        )
+    ).one()
+
+
+# --- Organization deletion ---
+# Everything an organization owns references it, directly or through its
+# roles, with ON DELETE CASCADE, so a small org goes in a single DELETE. A
+# large one is marked deleting_at, which hides it from its members at once,
+# and a background task then empties it table by table in batches, so no
+# transaction loads or locks all of its rows.
+
+
+def sole_member_organization_ids(session: Session, user_id: int) -> list[int]:
+    """
+    Organizations where user_id is the only member, found with one GROUP BY
+    over the memberships of the orgs the user belongs to.
+    """
+    member_of = (
+        select(Role.organization_id)
+        .join(UserRoleLink, col(UserRoleLink.role_id) == col(Role.id))
+        .where(UserRoleLink.user_id == user_id)
+    )
+    return list(
+        session.exec(
+            select(Role.organization_id)
+            .join(UserRoleLink, col(UserRoleLink.role_id) == col(Role.id))
+            .where(col(Role.organization_id).in_(member_of))
+            .group_by(col(Role.organization_id))
+            .having(func.count(func.distinct(UserRoleLink.user_id)) == 1)
+        ).all()
+    )
+
+
+def _dependent_rows(
+    organization_ids: list[int],
+) -> list[tuple[Table, ColumnElement[bool]]]:
+    """
+    A (table, condition) pair for each set of rows that deleting the
+    organizations would cascade to: rows hanging off their roles first, then
+    rows referencing the organizations, children before parents.
+    """
+    organization_table = inspect(Organization).local_table
+    role_table = inspect(Role).local_table
+    role_ids = select(Role.id).where(col(Role.organization_id).in_(organization_ids))
+    by_role: list[tuple[Table, ColumnElement[bool]]] = []
+    by_organization: list[tuple[Table, ColumnElement[bool]]] = []
+    for table in reversed(SQLModel.metadata.sorted_tables):
+        for fk in table.foreign_keys:
+            if fk.column.table is role_table:
+                by_role.append((table, fk.parent.in_(role_ids)))
+            elif fk.column.table is organization_table:
+                by_organization.append((table, fk.parent.in_(organization_ids)))
+    return by_role + by_organization
+
+
+def is_large_organization_deletion(
+    session: Session,
+    organization_ids: list[int],
+    threshold: int = ORGANIZATION_DELETE_BATCH_SIZE,
+) -> bool:
+    """
+    Whether deleting the organizations would cascade to more than threshold
+    rows. Each count stops at threshold + 1 rows.
+    """
+    total = 0
+    for table, condition in _dependent_rows(organization_ids):
+        capped = (
+            select(literal(1))
+            .select_from(table)
+            .where(condition)
+            .limit(threshold + 1)
+            .subquery()
+        )
+        total += session.exec(select(func.count()).select_from(capped)).one()
+        if total > threshold:
+            return True
+    return False
+
+
+def mark_organizations_deleting(session: Session, organization_ids: list[int]) -> None:
+    """Hide the organizations from their members until they are deleted."""
+    session.exec(
+        update(Organization)
+        .where(col(Organization.id).in_(organization_ids))
+        .values(deleting_at=utc_now())
+    )
+
+
+def delete_organizations(
+    connection: Connection,
+    organization_ids: list[int],
+    batch_size: int = ORGANIZATION_DELETE_BATCH_SIZE,
+) -> int:
+    """
+    Delete the organizations' dependent rows batch_size at a time, children
+    first and committing after each batch, then the organizations themselves.
+    Returns how many organizations were deleted.
+    """
+    for table, condition in _dependent_rows(organization_ids):
+        delete_in_batches(connection, table, condition, batch_size)
+    result = connection.execute(
+        delete(Organization).where(col(Organization.id).in_(organization_ids))
+    )
+    connection.commit()
+    return result.rowcount
+
+
+def delete_organizations_task(organization_ids: list[int]) -> None:
+    """
+    Background-task wrapper around delete_organizations with its own engine,
+    since request-scoped sessions may be closed before the task runs. If it
+    fails, the maintenance scheduler picks the organizations up again.
+    """
+    engine = create_engine(get_connection_url())
+    try:
+        with engine.connect() as connection:
+            delete_organizations(connection, organization_ids)
+    except Exception:
+        logger.exception(f"Failed to delete organizations {organization_ids}")
+    finally:
+        engine.dispose()
+
+
+def resume_stalled_organization_deletions(connection: Connection, now: datetime) -> int:
+    """
+    Finish deleting organizations marked deleting_at more than
+    ORGANIZATION_DELETE_RETRY_AFTER ago, e.g. because the worker running the
+    background task exited. Returns how many were deleted.
+    """
+    stalled = connection.execute(
+        select(Organization.id).where(
+            col(Organization.deleting_at) < now - ORGANIZATION_DELETE_RETRY_AFTER
+        )
+    ).scalars()
+    organization_ids = [
+        organization_id for organization_id in stalled if organization_id
+    ]
+    connection.commit()
+    if not organization_ids:
+        return 0
+    return delete_organizations(connection, organization_ids)
+
+
+# --- Member pagination ---
+# The members table is paged with a keyset cursor over (lower(name), id), so
+# each page is a bounded index-ordered query however large the org grows.
+
+
+@dataclass
+class MemberPage:
+    members: list[MemberView]
+    next_cursor: str | None
+    search: str = ""
+    role_id: int | None = None
+    after: str | None = None
+    timed_out: bool = False
+
+    @property
+    def is_first_page(self) -> bool:
+        return self.after is None
+
+
+def _member_sort_key() -> Any:
+    return func.lower(func.coalesce(User.name, ""))
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def load_member_page(
+    session: Session,
+    organization_id: int,
+    search: str = "",
+    role_id: int | None = None,
+    after: str | None = None,
+    limit: int = MEMBERS_PAGE_SIZE,
+) -> MemberPage:
+    """
+    Load one page of organization members, optionally filtered by a name or
+    email search and by role. Membership is resolved with a DISTINCT subquery
+    on the role links, so each user appears once however many roles they hold,
+    and each member's roles in this organization are aggregated into the same
+    statement rather than loaded by a second query.
+
+    Searches run under the search latency budget; a search Postgres cancels
+    returns an empty page with timed_out set.
+    """
+    member_ids = (
+        select(UserRoleLink.user_id)
+        .join(Role, col(Role.id) == col(UserRoleLink.role_id))
+        .where(Role.organization_id == organization_id)
+    )
+    if role_id is not None:
+        member_ids = member_ids.where(col(UserRoleLink.role_id) == role_id)
+
+    member_roles = (
+        select(_json_array(func.jsonb_build_array(Role.id, Role.name), col(Role.id)))
+        .join(UserRoleLink, col(UserRoleLink.role_id) == col(Role.id))
+        .where(
+            col(UserRoleLink.user_id) == col(User.id),
+            Role.organization_id == organization_id,
+        )
+        .scalar_subquery()
+    )
+
+    sort_key = _member_sort_key()
+    statement = (
+        select(User, sort_key, member_roles)
+        .join(Account, col(Account.id) == col(User.account_id))
+        .where(col(User.id).in_(member_ids.distinct()))
+        .options(contains_eager(cast(InstrumentedAttribute[Any], User.account)))
+        .order_by(sort_key, col(User.id))
+        .limit(limit + 1)
+    )
+    search = search.strip()
+    if search:
+        pattern = f"%{_escape_like(search)}%"
+        statement = statement.where(
+            or_(
+                col(User.name).ilike(pattern, escape="\\"),
+                col(Account.email).ilike(pattern, escape="\\"),
+            )
+        )
+    if after:
+        after_key, after_id = decode_cursor(after, str, int)
+        statement = statement.where(
+            tuple_(sort_key, col(User.id))
+            > tuple_(literal(after_key), literal(after_id))
+        )
+
+    if search:
+        rows = run_with_latency_budget(session, lambda: session.exec(statement).all())
+        if rows is None:
+            return MemberPage(
+                members=[],
+                next_cursor=None,
+                search=search,
+                role_id=role_id,
+                after=after,
+                timed_out=True,
+            )
+    else:
+        rows = session.exec(statement).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_user, last_key, _ = rows[-1]
+        assert last_user.id is not None
+        next_cursor = encode_cursor(last_key, last_user.id)
+    return MemberPage(
+        members=[
+            MemberView.from_member_row(member, organization_id, roles)
+            for member, _, roles in rows
+        ],
+        next_cursor=next_cursor,
+        search=search,
+        role_id=role_id,
+        after=after,
+    )
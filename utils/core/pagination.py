@@ -0,0 +1,38 @@
+"""
+Opaque cursors for keyset pagination.
+
+A cursor holds the sort-key values of the last row on a page. The next page
+is the rows strictly after it in the same ORDER BY, which stays an index
+range scan however deep the client pages (unlike OFFSET). Cursors are
+URL-safe base64 JSON so they can go straight into hx-get query strings.
+"""
+
+import base64
+import binascii
+import json
+from typing import Any, Callable
+
+from exceptions.http_exceptions import InvalidPaginationCursorError
+
+
+def encode_cursor(*values: str | int) -> str:
+    raw = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *parsers: Callable[[Any], Any]) -> tuple[Any, ...]:
+    """
+    Decode a cursor from encode_cursor, applying one parser per value
+    (e.g. int, datetime.fromisoformat). Raises InvalidPaginationCursorError
+    for anything a client could have tampered with.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(parsers):
+            raise ValueError("cursor arity mismatch")
+        if not all(isinstance(value, (str, int)) for value in values):
+            raise ValueError("cursor values must be strings or integers")
+        return tuple(parse(value) for parse, value in zip(parsers, values))
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise InvalidPaginationCursorError()
@@ -0,0 +1,153 @@
+"""
+Hourly range partitions for the private.ratelimitattempt table.
+
+Rate-limit attempts only matter within the longest limiter window, so the
+table is partitioned by attempted_at and whole hours are dropped once they
+fall out of every window. DROP TABLE on a partition is O(1): no dead tuples,
+no vacuum debt and next to no WAL, unlike deleting the rows. Partitions are
+created ahead of time by the maintenance scheduler and on demand by an insert
+that finds none.
+"""
+
+import os
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import Connection, text
+from sqlmodel import func, select
+
+PARTITION_INTERVAL = timedelta(hours=1)
+PARTITIONS_AHEAD = 3
+PARTITION_SCHEMA = "private"
+PARTITION_PARENT = "ratelimitattempt"
+PARTITION_PREFIX = f"{PARTITION_PARENT}_p"
+PARTITION_SUFFIX_FORMAT = "%Y%m%d%H"
+
+# Arbitrary application-wide key serialising partition creation
+PARTITION_LOCK_ID = 7_310_042_953
+
+# Postgres raises check_violation when no partition accepts a row
+NO_PARTITION_SQLSTATE = "23514"
+
+UNPARTITIONED_WARNING = (
+    "private.ratelimitattempt is not partitioned; run "
+    "`python -m migrations.partition_rate_limit_attempts` "
+    "before using RATE_LIMIT_BACKEND=postgres"
+)
+
+
+def rate_limit_backend() -> str:
+    """Where rate-limit attempts are kept: "memory" (default) or "postgres"."""
+    return os.getenv("RATE_LIMIT_BACKEND", "memory").lower()
+
+
+def partitions_unlogged() -> bool:
+    """
+    Whether new partitions are UNLOGGED (RATE_LIMIT_UNLOGGED=1). Unlogged
+    writes skip the WAL; the trade-off is that attempts are emptied after a
+    crash and not replicated to standbys, which rate limiting can live with.
+    """
+    return os.getenv("RATE_LIMIT_UNLOGGED", "0") == "1"
+
+
+def partition_start(moment: datetime) -> datetime:
+    """The UTC hour containing moment, as an aware datetime."""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=UTC)
+    return moment.astimezone(UTC).replace(minute=0, second=0, microsecond=0)
+
+
+def partition_name(start: datetime) -> str:
+    return f"{PARTITION_PREFIX}{start.strftime(PARTITION_SUFFIX_FORMAT)}"
+
+
+def _bound(moment: datetime) -> str:
+    # attempted_at is stored as naive UTC
+    return moment.replace(tzinfo=None).isoformat(sep=" ")
+
+
+def is_partitioned(connection: Connection) -> bool:
+    relkind = connection.execute(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:name)"),
+        {"name": f"{PARTITION_SCHEMA}.{PARTITION_PARENT}"},
+    ).scalar()
+    return relkind == "p"
+
+
+def list_partitions(connection: Connection) -> dict[str, datetime]:
+    """Map each hourly partition's name to the start of its range."""
+    names = connection.execute(
+        text(
+            """
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE pg_inherits.inhparent = to_regclass(:parent)
+            """
+        ),
+        {"parent": f"{PARTITION_SCHEMA}.{PARTITION_PARENT}"},
+    ).scalars()
+    partitions = {}
+    for name in names:
+        if not name.startswith(PARTITION_PREFIX):
+            continue
+        suffix = name.removeprefix(PARTITION_PREFIX)
+        try:
+            start = datetime.strptime(suffix, PARTITION_SUFFIX_FORMAT)
+        except ValueError:
+            continue
+        partitions[name] = start.replace(tzinfo=UTC)
+    return partitions
+
+
+def create_partitions(
+    connection: Connection,
+    now: datetime | None = None,
+    ahead: int = PARTITIONS_AHEAD,
+    behind: int = 0,
+) -> list[str]:
+    """
+    Create the hourly partitions from behind hours before now to ahead hours
+    after it that don't exist yet, and return their names. Runs under a
+    transaction-level advisory lock so concurrent callers don't race; the
+    caller commits.
+    """
+    connection.execute(select(func.pg_advisory_xact_lock(PARTITION_LOCK_ID)))
+    existing = list_partitions(connection)
+    current = partition_start(now or datetime.now(UTC))
+    unlogged = "UNLOGGED " if partitions_unlogged() else ""
+    created = []
+    for offset in range(-behind, ahead + 1):
+        start = current + offset * PARTITION_INTERVAL
+        name = partition_name(start)
+        if name in existing:
+            continue
+        connection.execute(
+            text(
+                f"CREATE {unlogged}TABLE IF NOT EXISTS {PARTITION_SCHEMA}.{name} "
+                f"PARTITION OF {PARTITION_SCHEMA}.{PARTITION_PARENT} "
+                f"FOR VALUES FROM ('{_bound(start)}') "
+                f"TO ('{_bound(start + PARTITION_INTERVAL)}')"
+            )
+        )
+        created.append(name)
+    return created
+
+
+def drop_expired_partitions(
+    connection: Connection, retention: timedelta, now: datetime | None = None
+) -> list[str]:
+    """
+    Drop every partition whose whole range is older than now - retention and
+    return their names. The caller commits.
+    """
+    now = now or datetime.now(UTC)
+    if now.tzinfo is None:
+        now = now.replace(tzinfo=UTC)
+    cutoff = now - retention
+    dropped = []
+    for name, start in sorted(list_partitions(connection).items()):
+        if start + PARTITION_INTERVAL > cutoff:
+            continue
+        connection.execute(text(f"DROP TABLE IF EXISTS {PARTITION_SCHEMA}.{name}"))
+        dropped.append(name)
+    return dropped
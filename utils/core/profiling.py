@@ -0,0 +1,229 @@
+"""
+On-demand sampling profiler for individual requests.
+
+A request is profiled when it is picked by PROFILE_SAMPLE_RATE (a fraction
+of requests, 0 by default) or carries a valid X-Profile-Token header, a
+short-lived token signed with SECRET_KEY (see create_profile_token). While it
+runs, a sampler thread snapshots the stacks of the threads working on the
+request every PROFILE_INTERVAL_MS and counts them.
+
+The result is written in the collapsed ("folded") format read by
+flamegraph.pl, speedscope and inferno, one file per request under
+PROFILE_DIR/<route>/. Each stack is rooted at a category so the flamegraph's
+top level shows where the time went: [template] rendering, [orm] hydration,
+[sql] waiting on the database, [bcrypt] password hashing, or [app] anything
+else.
+"""
+
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import Any, Iterable, Literal, MutableMapping
+
+import jwt
+
+from utils.core.auth import ALGORITHM
+
+PROFILE_HEADER_NAME = "x-profile-token"
+DEFAULT_INTERVAL_MS = 5
+DEFAULT_MAX_SECONDS = 30
+DEFAULT_KEEP_PER_ROUTE = 20
+
+# Innermost match wins, so a query issued while rendering counts as [sql]
+_CATEGORIES = (
+    (
+        "bcrypt",
+        re.compile(
+            r"(^|/)bcrypt/|utils/core/auth\.py:(get_password_hash|verify_password)$"
+        ),
+    ),
+    ("sql", re.compile(r"sqlalchemy/engine/default\.py:do_execute|psycopg2/")),
+    ("orm", re.compile(r"sqlalchemy/orm/(loading|strategies)\.py:")),
+    ("template", re.compile(r"(^|/)jinja2/|\.html:|utils/core/templating\.py:render$")),
+)
+
+
+def profile_interval_seconds() -> float:
+    return float(os.getenv("PROFILE_INTERVAL_MS", DEFAULT_INTERVAL_MS)) / 1000
+
+
+def profile_sample_rate() -> float:
+    return float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+
+
+def profile_dir() -> Path:
+    return Path(
+        os.getenv("PROFILE_DIR") or Path(tempfile.gettempdir()) / "webapp-profiles"
+    )
+
+
+def create_profile_token(expires_delta: timedelta = timedelta(hours=1)) -> str:
+    """A token that, sent as X-Profile-Token, profiles the request."""
+    return jwt.encode(
+        {"type": "profile", "exp": datetime.now(UTC) + expires_delta},
+        os.getenv("SECRET_KEY"),
+        algorithm=ALGORITHM,
+    )
+
+
+def profile_token_valid(token: str | None) -> bool:
+    if not token:
+        return False
+    try:
+        decoded = jwt.decode(token, os.getenv("SECRET_KEY"), algorithms=[ALGORITHM])
+    except jwt.PyJWTError:
+        return False
+    return decoded.get("type") == "profile"
+
+
+def profile_trigger(headers: Any) -> Literal["token", "sampled"] | None:
+    """Why to profile a request with these headers, or None to leave it be."""
+    if profile_token_valid(headers.get(PROFILE_HEADER_NAME)):
+        return "token"
+    rate = profile_sample_rate()
+    if rate > 0 and random.random() < rate:
+        return "sampled"
+    return None
+
+
+def _frame_name(code: CodeType) -> str:
+    filename = code.co_filename
+    for prefix in (*sys.path[::-1], os.getcwd()):
+        if prefix and filename.startswith(prefix.rstrip("/") + "/"):
+            filename = filename[len(prefix.rstrip("/")) + 1 :]
+            break
+    return f"{filename}:{code.co_name}"
+
+
+def _categorize(names: list[str]) -> str:
+    for name in reversed(names):
+        for category, pattern in _CATEGORIES:
+            if pattern.search(name):
+                return category
+    return "app"
+
+
+class RequestProfiler:
+    """
+    Samples the stacks of threads running the request's endpoint or one of
+    its dependencies. The route is looked up in the ASGI scope on each tick,
+    since it is only known once routing has happened. Concurrent requests to
+    the same route run the same code, so their samples can mix.
+    """
+
+    def __init__(
+        self,
+        scope: MutableMapping[str, Any],
+        interval_seconds: float = DEFAULT_INTERVAL_MS / 1000,
+        max_seconds: float = DEFAULT_MAX_SECONDS,
+    ):
+        self.scope = scope
+        self._codes: frozenset[CodeType] | None = None
+        self.interval_seconds = interval_seconds
+        self.max_seconds = max_seconds
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _sample(self, codes: frozenset[CodeType]) -> None:
+        me = threading.get_ident()
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == me:
+                continue
+            stack: list[FrameType] = []
+            current: FrameType | None = frame
+            while current is not None:
+                stack.append(current)
+                current = current.f_back
+            if not any(f.f_code in codes for f in stack):
+                continue
+            names = [_frame_name(f.f_code) for f in reversed(stack)]
+            self.stacks[";".join([f"[{_categorize(names)}]", *names])] += 1
+            self.samples += 1
+
+    def _loop(self) -> None:
+        deadline = time.monotonic() + self.max_seconds
+        while not self._stop.wait(self.interval_seconds):
+            if self._codes is None and "route" in self.scope:
+                self._codes = route_codes(self.scope["route"])
+            if self._codes:
+                self._sample(self._codes)
+            if time.monotonic() > deadline:
+                return
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._loop, name="request-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def categories(self) -> dict[str, int]:
+        """Samples per category, e.g. {"template": 12, "sql": 30}."""
+        totals: Counter[str] = Counter()
+        for stack, count in self.stacks.items():
+            totals[stack.split(";", 1)[0].strip("[]")] += count
+        return dict(totals)
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.items())
+
+
+def route_codes(route: Any) -> frozenset[CodeType]:
+    """The code objects of a route's endpoint and all its dependencies."""
+    codes = set()
+    pending = [getattr(route, "dependant", None)]
+    while pending:
+        dependant = pending.pop()
+        if dependant is None:
+            continue
+        call = getattr(dependant, "call", None)
+        code = getattr(getattr(call, "__wrapped__", call), "__code__", None)
+        if code is not None:
+            codes.add(code)
+        pending.extend(dependant.dependencies)
+    return frozenset(codes)
+
+
+def _route_slug(route_template: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.{}-]+", "_", route_template).strip("_") or "root"
+
+
+def save_profile(
+    profiler: RequestProfiler,
+    route_template: str,
+    method: str,
+    status_code: int,
+    keep: int = DEFAULT_KEEP_PER_ROUTE,
+) -> Path:
+    """
+    Write the profile under PROFILE_DIR/<route>/ and prune that route's
+    directory to its newest keep profiles.
+    """
+    directory = profile_dir() / _route_slug(route_template)
+    directory.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now(UTC).strftime("%Y%m%dT%H%M%S%fZ")
+    path = directory / f"{stamp}-{method}-{status_code}.folded"
+    path.write_text(profiler.folded())
+    _prune(sorted(directory.glob("*.folded")), keep)
+    return path
+
+
+def _prune(paths: Iterable[Path], keep: int) -> None:
+    paths = list(paths)
+    for path in paths[: max(len(paths) - keep, 0)]:
+        path.unlink(missing_ok=True)
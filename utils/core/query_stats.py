@@ -0,0 +1,145 @@
+"""
+Per-request SQL statistics: statement count, total database time and
+repeated-statement fingerprints.
+
+Engine-wide SQLAlchemy hooks (every request opens its own engine, so they are
+registered on the Engine class) add each statement to the QueryStats of the
+current request, held in a context variable that the middleware in main.py
+sets. Sync routes and dependencies run in a threadpool with a copy of the
+request's context, so their statements land in the same QueryStats.
+
+A statement run again and again in one request with only its parameters
+changing is the signature of an N+1 query; fingerprints make those visible.
+capture_queries() records statements from every thread instead, for tests.
+"""
+
+import os
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
+from sqlalchemy import Engine, event
+
+DEFAULT_N_PLUS_ONE_THRESHOLD = 5
+
+_PARAMETER = re.compile(r"%\(\w+\)s")
+_PARAMETER_LIST = re.compile(r"\(\?(?:, \?)+\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """
+    The statement with bound parameters replaced by ? and expanded IN lists
+    collapsed to (?), so executions differing only in their values match.
+    """
+    normalized = _WHITESPACE.sub(" ", statement).strip()
+    normalized = _PARAMETER.sub("?", normalized)
+    return _PARAMETER_LIST.sub("(?)", normalized)
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    seconds: float = 0.0
+    fingerprints: Counter[str] = field(default_factory=Counter)
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        self.fingerprints[fingerprint(statement)] += 1
+
+    def repeated(
+        self, threshold: int = DEFAULT_N_PLUS_ONE_THRESHOLD
+    ) -> list[tuple[str, int]]:
+        """Fingerprints run at least threshold times, most frequent first."""
+        return [
+            (statement, times)
+            for statement, times in self.fingerprints.most_common()
+            if times >= threshold
+        ]
+
+    def server_timing(self) -> str:
+        """A Server-Timing header value for the database time."""
+        return f'db;dur={self.seconds * 1000:.1f};desc="{self.count} queries"'
+
+    def describe(self) -> str:
+        """Every fingerprint with its count, for assertion messages."""
+        return "\n".join(
+            f"{times}x {statement}"
+            for statement, times in self.fingerprints.most_common()
+        )
+
+
+_request_stats: ContextVar[QueryStats | None] = ContextVar(
+    "request_query_stats", default=None
+)
+_captures: list[QueryStats] = []
+_captures_lock = threading.Lock()
+
+
+def n_plus_one_threshold() -> int:
+    """Repeats of one statement in a request that get logged (N_PLUS_ONE_THRESHOLD)."""
+    return int(os.getenv("N_PLUS_ONE_THRESHOLD", DEFAULT_N_PLUS_ONE_THRESHOLD))
+
+
+def server_timing_enabled() -> bool:
+    return os.getenv("SERVER_TIMING_ENABLED", "0") == "1"
+
+
+@contextmanager
+def request_query_stats() -> Iterator[QueryStats]:
+    """Collect the statements run in this context (and copies of it)."""
+    stats = QueryStats()
+    token = _request_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _request_stats.reset(token)
+
+
+@contextmanager
+def capture_queries() -> Iterator[QueryStats]:
+    """Collect every statement run in the process, from any thread, until exit."""
+    stats = QueryStats()
+    with _captures_lock:
+        _captures.append(stats)
+    try:
+        yield stats
+    finally:
+        with _captures_lock:
+            _captures.remove(stats)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_timer(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, many: bool
+) -> None:
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_statement(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, many: bool
+) -> None:
+    seconds = time.perf_counter() - conn.info["query_started_at"].pop()
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.record(statement, seconds)
+    if _captures:
+        with _captures_lock:
+            for capture in _captures:
+                capture.record(statement, seconds)
+
+
+@event.listens_for(Engine, "handle_error")
+def _discard_timer(context: Any) -> None:
+    started = (
+        context.connection.info.get("query_started_at") if context.connection else None
+    )
+    if started:
+        started.pop()
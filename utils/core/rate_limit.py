@@ -10,10 +10,18 @@ from typing import Protocol, Tuple, runtime_checkable
 from fastapi import Request, Form
 from pydantic import EmailStr
 from dotenv import load_dotenv
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session, col, create_engine, delete, select
 
 from utils.core.db import get_connection_url
+from utils.core.metrics import RATE_LIMIT_REJECTIONS
 from utils.core.models import RateLimitAttempt
+from utils.core.partitions import (
+    NO_PARTITION_SQLSTATE,
+    create_partitions,
+    drop_expired_partitions,
+    rate_limit_backend,
+)
 
 logger = getLogger("uvicorn.error")
 load_dotenv()
@@ -251,12 +259,20 @@ class PostgresRateLimitWindow:
 
     def record(self, key: str) -> None:
         with Session(_get_rate_limit_engine()) as session:
-            session.add(
-                RateLimitAttempt(
-                    scope=self.scope, key=key, attempted_at=datetime.now(UTC)
-                )
+            attempt = RateLimitAttempt(
+                scope=self.scope, key=key, attempted_at=datetime.now(UTC)
             )
-            session.commit()
+            session.add(attempt)
+            try:
+                session.commit()
+            except IntegrityError as e:
+                if getattr(e.orig, "pgcode", None) != NO_PARTITION_SQLSTATE:
+                    raise
+                # No partition covers this hour yet (maintenance not running)
+                session.rollback()
+                create_partitions(session.connection())
+                session.add(attempt)
+                session.commit()
 
     def remaining(self, key: str) -> int:
         now = datetime.now(UTC)
@@ -275,15 +291,13 @@ class PostgresRateLimitWindow:
             session.commit()
 
     def prune(self) -> None:
-        cutoff = self._cutoff(datetime.now(UTC))
-        with Session(_get_rate_limit_engine()) as session:
-            session.exec(
-                delete(RateLimitAttempt).where(
-                    col(RateLimitAttempt.scope) == self.scope,
-                    col(RateLimitAttempt.attempted_at) <= cutoff,
-                )
-            )
-            session.commit()
+        """
+        Drop the hourly partitions outside every limiter's window. Attempts of
+        all scopes share partitions, so this prunes for every scope at once.
+        """
+        with _get_rate_limit_engine().connect() as connection:
+            drop_expired_partitions(connection, rate_limit_retention())
+            connection.commit()
 
     def clear(self) -> None:
         with Session(_get_rate_limit_engine()) as session:
@@ -310,14 +324,10 @@ def _int_env(name: str, default: int) -> int:
     return default
 
 
-def _rate_limit_backend() -> str:
-    return os.environ.get("RATE_LIMIT_BACKEND", "memory").lower()
-
-
 def _make_rate_limiter(
     scope: str, max_attempts: int, window_seconds: int
 ) -> RateLimiter:
-    if _rate_limit_backend() == "postgres":
+    if rate_limit_backend() == "postgres":
         return PostgresRateLimitWindow(scope, max_attempts, window_seconds)
     return RateLimitWindow(max_attempts=max_attempts, window_seconds=window_seconds)
 
@@ -359,6 +369,11 @@ _ALL_LIMITERS = (
 )
 
 
+def rate_limit_retention() -> timedelta:
+    """How long attempts must be kept: the longest configured window."""
+    return timedelta(seconds=max(limiter.window_seconds for limiter in _ALL_LIMITERS))
+
+
 def clear_all_rate_limiters() -> None:
     """Clear all rate limiter state for the active backend."""
     for limiter in _ALL_LIMITERS:
@@ -380,6 +395,7 @@ def _enforce_rate_limit(limiter: RateLimiter, key: str, scope: str) -> int:
     is_limited, retry_after = limiter.check(key)
     if is_limited:
         logger.warning(f"Rate limit exceeded: scope={scope} key={key}")
+        RATE_LIMIT_REJECTIONS.inc(scope)
         raise RateLimitError(retry_after=retry_after)
     limiter.record(key)
     return 0
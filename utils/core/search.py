@@ -0,0 +1,91 @@
+"""
+Search helpers: prefix full-text queries, a per-query latency budget, and the
+optional pg_trgm indexes behind member name/email search.
+"""
+
+import os
+import re
+from logging import getLogger
+from typing import Callable, TypeVar
+
+from sqlalchemy import Connection, text
+from sqlalchemy.exc import DBAPIError
+from sqlmodel import Session, func, select
+
+logger = getLogger("uvicorn.error")
+
+T = TypeVar("T")
+
+SEARCH_RESULT_LIMIT = 20
+DEFAULT_SEARCH_TIMEOUT_MS = 250
+MAX_QUERY_TERMS = 8
+QUERY_CANCELED_SQLSTATE = "57014"
+
+# Member search filters with ILIKE '%term%' on user.name and account.email;
+# these GIN trigram indexes let Postgres answer it without a sequential scan.
+TRIGRAM_INDEXES = {
+    "ix_user_name_trgm": 'public."user" USING gin (name gin_trgm_ops)',
+    "ix_account_email_trgm": "private.account USING gin (email gin_trgm_ops)",
+}
+
+
+def search_timeout_ms() -> int:
+    """Statement timeout for interactive search queries (SEARCH_TIMEOUT_MS)."""
+    return int(os.getenv("SEARCH_TIMEOUT_MS", DEFAULT_SEARCH_TIMEOUT_MS))
+
+
+def prefix_tsquery(query: str) -> str | None:
+    """
+    Turn free text into a to_tsquery() string matching every word as a prefix
+    ("quar rep" -> "quar:* & rep:*"), so results narrow as the user types.
+    Only word characters are kept, so the result is always valid tsquery syntax.
+    """
+    terms = re.findall(r"\w+", query.lower())[:MAX_QUERY_TERMS]
+    return " & ".join(f"{term}:*" for term in terms) or None
+
+
+def run_with_latency_budget(
+    session: Session, query: Callable[[], T], timeout_ms: int | None = None
+) -> T | None:
+    """
+    Run query() under a statement_timeout and return its result, or None if
+    Postgres cancelled it for exceeding the budget. The query runs in a
+    savepoint, so a cancellation only rolls that back: the request's
+    transaction and the objects it has already loaded are left intact.
+    Callers should only use this for read-only work.
+    """
+    timeout_ms = int(timeout_ms or search_timeout_ms())
+    previous = session.exec(select(func.current_setting("statement_timeout"))).one()
+    try:
+        with session.begin_nested():
+            session.connection().execute(
+                text(f"SET LOCAL statement_timeout = {timeout_ms}")
+            )
+            result = query()
+            # SET LOCAL outlives a released savepoint, so restore it
+            session.exec(select(func.set_config("statement_timeout", previous, True)))
+    except DBAPIError as e:
+        if getattr(e.orig, "pgcode", None) != QUERY_CANCELED_SQLSTATE:
+            raise
+        logger.warning(f"Search exceeded its {timeout_ms}ms budget and was cancelled")
+        return None
+    return result
+
+
+def create_trigram_indexes(connection: Connection) -> bool:
+    """
+    Create pg_trgm and the member search indexes if the server allows it.
+    Returns False (and leaves the schema untouched) where the extension isn't
+    installed or the role may not create it; search still works, unindexed.
+    """
+    try:
+        with connection.begin_nested():
+            connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    except DBAPIError as e:
+        logger.info(
+            f"pg_trgm unavailable; member search will not be indexed ({e.orig})"
+        )
+        return False
+    for name, definition in TRIGRAM_INDEXES.items():
+        connection.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}"))
+    return True
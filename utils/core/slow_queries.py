@@ -0,0 +1,369 @@
+"""
+Slow-query log with EXPLAIN capture and an index-advisor report.
+
+With SLOW_QUERY_MS set, every statement that runs longer is logged with its
+duration, the shape of its bound parameters (names and types, never values)
+and the route of the request that ran it. A sample of slow statements is
+also explained: a background thread re-runs the statement under
+EXPLAIN (ANALYZE, BUFFERS) on its own connection, so the request isn't kept
+waiting. Only plain SELECTs are analyzed, since ANALYZE executes the
+statement; writes get a plain EXPLAIN inside a rolled-back transaction.
+
+Overhead stays bounded: each statement fingerprint is explained at most once
+per SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS, only a SLOW_QUERY_EXPLAIN_RATE
+fraction of eligible statements is picked, and the queue drops work when
+full. With SLOW_QUERY_LOG set, each slow statement is appended to that file
+as a JSON line; `python -m utils.core.slow_queries <file>` reads it back and
+reports sequential scans that an index could replace.
+"""
+
+import argparse
+import json
+import os
+import queue
+import random
+import re
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from logging import getLogger
+from typing import Any, Iterator, MutableMapping
+
+from sqlalchemy import Engine, event
+
+from utils.core.db import create_engine, get_connection_url
+from utils.core.metrics import route_template
+from utils.core.models import utc_now
+from utils.core.query_stats import fingerprint
+
+logger = getLogger("uvicorn.error")
+
+DEFAULT_EXPLAIN_RATE = 1.0
+DEFAULT_EXPLAIN_INTERVAL_SECONDS = 300
+EXPLAIN_QUEUE_SIZE = 100
+EXPLAIN_STATEMENT_TIMEOUT_MS = 10_000
+EXPLAIN_LOCK_TIMEOUT_MS = 1_000
+
+_EXPLAINABLE = re.compile(r"^\s*(SELECT|WITH|INSERT|UPDATE|DELETE)\b", re.IGNORECASE)
+_WRITES = re.compile(
+    r"\b(INSERT|UPDATE|DELETE|FOR\s+(NO\s+KEY\s+)?UPDATE|FOR\s+(KEY\s+)?SHARE)\b",
+    re.IGNORECASE,
+)
+
+
+def slow_query_threshold_ms() -> float | None:
+    """SLOW_QUERY_MS, or None when the slow-query log is off."""
+    value = float(os.getenv("SLOW_QUERY_MS", "0"))
+    return value if value > 0 else None
+
+
+def explain_rate() -> float:
+    return float(os.getenv("SLOW_QUERY_EXPLAIN_RATE", DEFAULT_EXPLAIN_RATE))
+
+
+def explain_interval_seconds() -> float:
+    return float(
+        os.getenv(
+            "SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS", DEFAULT_EXPLAIN_INTERVAL_SECONDS
+        )
+    )
+
+
+def slow_query_log_path() -> str | None:
+    return os.getenv("SLOW_QUERY_LOG") or None
+
+
+def parameter_shape(parameters: Any) -> dict[str, str] | list[str]:
+    """Bound parameter names and types, e.g. {"name_1": "str"}, without values."""
+    if isinstance(parameters, dict):
+        return {name: type(value).__name__ for name, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return []
+
+
+def analyzable(statement: str) -> bool:
+    """Whether EXPLAIN ANALYZE may run the statement: a read without row locks."""
+    return bool(_EXPLAINABLE.match(statement)) and not _WRITES.search(statement)
+
+
+@dataclass
+class SlowQuery:
+    statement: str
+    fingerprint: str
+    parameters: dict[str, str] | list[str]
+    route: str | None
+    duration_ms: float
+    at: datetime = field(default_factory=utc_now)
+    plan: list[dict[str, Any]] | None = None
+    analyzed: bool = False
+
+    def to_json(self) -> str:
+        return json.dumps({**asdict(self), "at": self.at.isoformat()})
+
+
+_request_scope: ContextVar[MutableMapping[str, Any] | None] = ContextVar(
+    "slow_query_request_scope", default=None
+)
+
+
+@contextmanager
+def slow_query_request(scope: MutableMapping[str, Any]) -> Iterator[None]:
+    """Attribute slow statements run in this context to the request's route."""
+    token = _request_scope.set(scope)
+    try:
+        yield
+    finally:
+        _request_scope.reset(token)
+
+
+def _write_record(slow: SlowQuery) -> None:
+    path = slow_query_log_path()
+    if path is None:
+        return
+    try:
+        with open(path, "a") as log:
+            log.write(slow.to_json() + "\n")
+    except OSError:
+        logger.exception(f"Failed to write slow query log {path}")
+
+
+class ExplainWorker:
+    """
+    Explains queued slow statements one at a time on a daemon thread, using
+    its own engine so it never borrows a request's connection.
+    """
+
+    def __init__(self, maxsize: int = EXPLAIN_QUEUE_SIZE):
+        self._queue: queue.Queue[tuple[SlowQuery, Any]] = queue.Queue(maxsize)
+        self._last_explained: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self.engine: Engine | None = None
+
+    def submit(self, slow: SlowQuery, parameters: Any) -> bool:
+        """
+        Queue the statement for EXPLAIN if it's sampled and its fingerprint
+        wasn't explained recently. Returns whether it was queued.
+        """
+        if not _EXPLAINABLE.match(slow.statement) or random.random() >= explain_rate():
+            return False
+        now = time.monotonic()
+        with self._lock:
+            last = self._last_explained.get(slow.fingerprint)
+            if last is not None and now - last < explain_interval_seconds():
+                return False
+            try:
+                self._queue.put_nowait((slow, parameters))
+            except queue.Full:
+                return False
+            self._last_explained[slow.fingerprint] = now
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._loop, name="slow-query-explain", daemon=True
+                )
+                self._thread.start()
+        return True
+
+    def join(self) -> None:
+        """Wait until every queued statement has been explained."""
+        self._queue.join()
+
+    def _loop(self) -> None:
+        while True:
+            slow, parameters = self._queue.get()
+            try:
+                self.explain(slow, parameters)
+            except Exception:
+                logger.exception(f"Failed to explain slow query: {slow.statement}")
+                _write_record(slow)
+            finally:
+                self._queue.task_done()
+
+    def explain(self, slow: SlowQuery, parameters: Any) -> None:
+        if self.engine is None:
+            self.engine = create_engine(get_connection_url())
+        slow.analyzed = analyzable(slow.statement)
+        options = "ANALYZE, BUFFERS, FORMAT JSON" if slow.analyzed else "FORMAT JSON"
+        with self.engine.connect() as connection:
+            connection.exec_driver_sql(
+                f"SET LOCAL statement_timeout = {EXPLAIN_STATEMENT_TIMEOUT_MS}"
+            )
+            connection.exec_driver_sql(
+                f"SET LOCAL lock_timeout = {EXPLAIN_LOCK_TIMEOUT_MS}"
+            )
+            slow.plan = connection.exec_driver_sql(
+                f"EXPLAIN ({options}) {slow.statement}", parameters
+            ).scalar()
+            connection.rollback()
+        findings = sequential_scans(slow.plan or [])
+        logger.warning(
+            f"Plan for slow query in {slow.route or 'no request'}: "
+            + (
+                "; ".join(
+                    f"Seq Scan on {table} filtering {cols}"
+                    for table, cols, _ in findings
+                )
+                or "no sequential scans"
+            )
+        )
+        _write_record(slow)
+
+
+explain_worker = ExplainWorker()
+
+
+# Own timer key so the hooks work independently of utils.core.query_stats
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_slow_query_timer(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, many: bool
+) -> None:
+    if slow_query_threshold_ms() is not None:
+        conn.info.setdefault("slow_query_started_at", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _check_slow_query(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, many: bool
+) -> None:
+    started = conn.info.get("slow_query_started_at")
+    if not started:
+        return
+    duration_ms = (time.perf_counter() - started.pop()) * 1000
+    threshold = slow_query_threshold_ms()
+    if (
+        threshold is None
+        or duration_ms < threshold
+        or conn.engine is explain_worker.engine
+    ):
+        return
+    scope = _request_scope.get()
+    slow = SlowQuery(
+        statement=statement,
+        fingerprint=fingerprint(statement),
+        parameters=parameter_shape(parameters),
+        route=route_template(scope) if scope is not None else None,
+        duration_ms=round(duration_ms, 3),
+    )
+    logger.warning(
+        f"Slow query ({slow.duration_ms} ms) in {slow.route or 'no request'}: "
+        f"{slow.fingerprint} parameters={slow.parameters}"
+    )
+    if many or not explain_worker.submit(slow, parameters):
+        _write_record(slow)
+
+
+@event.listens_for(Engine, "handle_error")
+def _discard_slow_query_timer(context: Any) -> None:
+    started = (
+        context.connection.info.get("slow_query_started_at")
+        if context.connection
+        else None
+    )
+    if started:
+        started.pop()
+
+
+# --- Index advisor ---
+
+# Columns compared in a Filter, e.g. "((name)::text = 'x'::text)", and boolean
+# columns tested on their own, e.g. "(NOT used)"
+_COMPARED_COLUMN = re.compile(
+    r"(?<![:'\w.$])(\w+)\)*(?:::[\w ]+?)?\)*\s*(?:=|<>|<=|>=|<|>|~~\*?|IS\b)"
+)
+_BOOLEAN_COLUMN = re.compile(r"\((?:NOT )?(\w+)\)(?!::)")
+_KEYWORDS = {"AND", "OR", "NOT", "ANY", "ALL", "NULL", "TRUE", "FALSE"}
+
+
+def _filter_columns(condition: str) -> tuple[str, ...]:
+    found = _COMPARED_COLUMN.findall(condition) + _BOOLEAN_COLUMN.findall(condition)
+    columns = [
+        column
+        for column in found
+        if column.upper() not in _KEYWORDS and not column.isdigit()
+    ]
+    return tuple(dict.fromkeys(columns))
+
+
+def sequential_scans(
+    plan: list[dict[str, Any]],
+) -> list[tuple[str, tuple[str, ...], float]]:
+    """
+    (table, filtered columns, time in ms) for each filtered Seq Scan in an
+    EXPLAIN (FORMAT JSON) plan. Time is 0 when the plan wasn't analyzed.
+    """
+    findings = []
+    pending = [entry["Plan"] for entry in plan if "Plan" in entry]
+    while pending:
+        node = pending.pop()
+        pending.extend(node.get("Plans", []))
+        if node.get("Node Type") != "Seq Scan" or "Filter" not in node:
+            continue
+        columns = _filter_columns(node["Filter"])
+        if columns:
+            elapsed = node.get("Actual Total Time", 0.0) * node.get("Actual Loops", 1)
+            findings.append((node["Relation Name"], columns, elapsed))
+    return findings
+
+
+def index_advice(records: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """
+    Group the sequential scans in slow-query records by table and filtered
+    columns, most expensive first.
+    """
+    groups: dict[tuple[str, tuple[str, ...]], dict[str, Any]] = defaultdict(
+        lambda: {"count": 0, "scan_ms": 0.0, "query_ms": 0.0, "routes": set()}
+    )
+    for record in records:
+        for table, columns, elapsed in sequential_scans(record.get("plan") or []):
+            group = groups[(table, columns)]
+            group["count"] += 1
+            group["scan_ms"] += elapsed
+            group["query_ms"] += record["duration_ms"]
+            if record.get("route"):
+                group["routes"].add(record["route"])
+    advice = [
+        {
+            "table": table,
+            "columns": list(columns),
+            "suggestion": f"CREATE INDEX ON {table} ({', '.join(columns)})",
+            **group,
+            "routes": sorted(group["routes"]),
+        }
+        for (table, columns), group in groups.items()
+    ]
+    return sorted(advice, key=lambda a: (a["query_ms"], a["count"]), reverse=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Report sequential scans in a SLOW_QUERY_LOG file that an index "
+            "could replace. Scans of small tables are normal; check the "
+            "table's size and existing indexes before adding one."
+        )
+    )
+    parser.add_argument("log", help="Path to the SLOW_QUERY_LOG JSON lines file")
+    args = parser.parse_args()
+
+    with open(args.log) as log:
+        records = [json.loads(line) for line in log if line.strip()]
+    advice = index_advice(records)
+    if not advice:
+        print(f"No filtered sequential scans in {len(records)} slow queries.")
+        return
+    for item in advice:
+        print(
+            f"{item['suggestion']}\n"
+            f"    {item['count']} slow queries, {item['query_ms']:.1f} ms total, "
+            f"{item['scan_ms']:.1f} ms in the scan; routes: "
+            f"{', '.join(item['routes']) or 'none'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
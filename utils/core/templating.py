@@ -0,0 +1,61 @@
+"""
+Jinja2 templates with an optional strict render mode.
+
+Templates that walk ORM relationships (member.roles, user.avatar) make the
+ORM issue lazy-load queries while the page renders: N+1s and BLOB fetches
+that never show up in the route's code. With STRICT_RENDER=1 every template
+renders with a flag set, and any relationship or expired-column load during
+that time raises LazyLoadDuringRenderError instead of querying, so routes must
+eager-load (or pass a view object for) everything their templates read. The
+test suite runs in strict mode; production leaves it off.
+"""
+
+import os
+import time
+from contextvars import ContextVar
+from typing import Any
+
+from fastapi.templating import Jinja2Templates
+from jinja2 import Template
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from exceptions.exceptions import LazyLoadDuringRenderError
+from utils.core.metrics import TEMPLATE_RENDER_DURATION
+
+_rendering: ContextVar[bool] = ContextVar("rendering", default=False)
+
+
+def strict_render_enabled() -> bool:
+    return os.getenv("STRICT_RENDER", "0") == "1"
+
+
+class StrictRenderTemplate(Template):
+    """
+    A template that, in strict render mode, forbids lazy loads while rendering.
+    Render times are recorded in the template_render_seconds metric.
+    """
+
+    def render(self, *args: Any, **kwargs: Any) -> str:
+        started = time.perf_counter()
+        token = _rendering.set(True) if strict_render_enabled() else None
+        try:
+            return super().render(*args, **kwargs)
+        finally:
+            if token is not None:
+                _rendering.reset(token)
+            TEMPLATE_RENDER_DURATION.observe(
+                time.perf_counter() - started, self.name or "<string>"
+            )
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _forbid_lazy_loads_while_rendering(state: ORMExecuteState) -> None:
+    if _rendering.get() and (state.is_relationship_load or state.is_column_load):
+        raise LazyLoadDuringRenderError(str(state.statement))
+
+
+def create_templates(directory: str = "templates") -> Jinja2Templates:
+    templates = Jinja2Templates(directory=directory)
+    templates.env.template_class = StrictRenderTemplate
+    return templates